@@ -2,16 +2,13 @@
 """
 FastAPI router exposing endpoints for College Football input generation and deterministic model execution.
 Version 2: Updated to use cfb_spread_model_v2.py (root-level) with enhanced metrics, variance, and confidence output.
+The model runs in-process through modules.model_service (no subprocess / temp files).
 """
 
 from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import JSONResponse
 from bridges import cfb_to_model
-
-import json
-from pathlib import Path
-from subprocess import run
-import tempfile
+from modules import model_service
 
 router = APIRouter(prefix="/cfb", tags=["College Football V2"])
 
@@ -53,10 +50,11 @@ def run_model(
     year: int = Query(..., description="Season year"),
     week: int = Query(..., description="Week number"),
     validate: bool = Query(default=True, description="Run validation before model"),
+    offload: bool = Query(default=False, description="Run the model on the warm process pool"),
 ):
     """
     Build model inputs, optionally validate, then execute the deterministic
-    cfb_spread_model_v2.py and return its predictions.
+    cfb_spread_model_v2 in-process and return its predictions.
 
     Example:
         POST /cfb/run_model?home=Georgia&away=Alabama&year=2025&week=10
@@ -72,30 +70,34 @@ def run_model(
                     content={"status": "validation_failed", "data": data},
                 )
 
-        # Write temp input JSON
-        tmp_input = Path(tempfile.gettempdir()) / "cfb_input.json"
-        tmp_output = Path(tempfile.gettempdir()) / "cfb_output.json"
-        tmp_input.write_text(json.dumps(data, indent=2))
-
         # Run deterministic model (v2)
-        cmd = ["python", "cfb_spread_model_v2.py", "--input", str(tmp_input), "--out", str(tmp_output)]
-        result = run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            raise RuntimeError(f"Model execution failed:\n{result.stderr}")
-
-        if not tmp_output.exists():
-            raise FileNotFoundError("Model output file not found after run.")
-
-        output_data = json.loads(tmp_output.read_text())
+        output_data = model_service.run_model(data, offload=offload)
 
         return JSONResponse(
             content={
                 "status": "ok",
                 "model_output": output_data,
-                "stderr": result.stderr,
             }
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model run failed: {e}")
+
+
+@router.get("/slate")
+def slate(
+    year: int = Query(..., description="Season year"),
+    week: int = Query(..., description="Week number"),
+    offload: bool = Query(default=False, description="Run the model on the warm process pool"),
+):
+    """
+    Build inputs for every game of the week (shared tables fetched once) and
+    price the whole slate in one vectorized model pass.
+
+    Example:
+        GET /cfb/slate?year=2025&week=10
+    """
+    try:
+        return JSONResponse(content={"status": "ok", **cfb_to_model.price_slate(year, week, offload=offload)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Slate run failed: {e}")
@@ -0,0 +1 @@
+"""Offline benchmark suite: fake upstream server, fixtures and runner (see bench/run.py)."""
@@ -0,0 +1,86 @@
+# bench/compare.py
+"""
+Diff two bench/run.py result files.
+
+    python -m bench.compare bench/results/<base>.json bench/results/<head>.json [--threshold 0.15]
+
+Prints p50 / p95 / p99 and throughput for every case present in both runs
+with the head/base ratio, and exits 1 when any case's p50 or p95 grew by
+more than `threshold` (0.15 = 15% slower), so it can gate CI.
+"""
+import sys
+import json
+import argparse
+from typing import Any, Dict, List
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s")
+GATED = ("p50_ms", "p95_ms")
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ratio(base, head):
+    if not isinstance(base, (int, float)) or not isinstance(head, (int, float)) or base <= 0:
+        return None
+    return head / base
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float = 0.15) -> Dict[str, Any]:
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    for name, h in head["results"].items():
+        b = base["results"].get(name)
+        if b is None:
+            continue
+        row = {"case": name}
+        for m in METRICS:
+            row[m] = (b.get(m), h.get(m), _ratio(b.get(m), h.get(m)))
+        if any(row[m][2] is not None and row[m][2] > 1 + threshold for m in GATED):
+            regressions.append(name)
+        if h.get("errors", 0) > b.get("errors", 0):
+            regressions.append(f"{name} (errors {b.get('errors', 0)} -> {h['errors']})")
+        rows.append(row)
+    return {"rows": rows, "regressions": regressions,
+            "only_base": sorted(set(base["results"]) - set(head["results"])),
+            "only_head": sorted(set(head["results"]) - set(base["results"]))}
+
+
+def _fmt(cell) -> str:
+    b, h, r = cell
+    if r is None:
+        return f"{b} -> {h}"
+    return f"{b:.2f} -> {h:.2f} ({r:.2f}x)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed relative p50/p95 slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    base, head = _load(args.base), _load(args.head)
+    report = compare(base, head, args.threshold)
+
+    print(f"base {(base['meta'].get('commit') or '?')[:10]}  head {(head['meta'].get('commit') or '?')[:10]}")
+    for row in report["rows"]:
+        print(f"{row['case']:<70} " + "  ".join(f"{m}={_fmt(row[m])}" for m in METRICS))
+    for name in report["only_base"]:
+        print(f"{name:<70} removed")
+    for name in report["only_head"]:
+        print(f"{name:<70} new")
+
+    if report["regressions"]:
+        print(f"\n{len(report['regressions'])} regression(s) over {args.threshold:.0%}:")
+        for name in report["regressions"]:
+            print(f"  - {name}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# bench/fake_upstream.py
+"""
+Local stand-in for every upstream the service calls (CFBD, The Odds API,
+Open-Meteo, ESPN, masseyratings.com).
+
+http_client rewrites https://<host>/<path> to <UPSTREAM_OVERRIDE>/<host>/<path>
+when UPSTREAM_OVERRIDE is set, so the first path segment here is the original
+host. Responses come from bench/fixtures.py (recorded files first, then the
+seeded synthetic league). Each response is delayed by a configurable latency
+(base + uniform jitter, optionally per host) to mimic a remote API.
+
+Standalone:
+    python -m bench.fake_upstream --port 8765 --latency-ms 40 --jitter-ms 20
+    UPSTREAM_OVERRIDE=http://127.0.0.1:8765 python main.py
+"""
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from bench.fixtures import Fixtures, recorded
+
+CFBD_HOST = "api.collegefootballdata.com"
+ODDS_HOST = "api.the-odds-api.com"
+METEO_HOST = "api.open-meteo.com"
+ESPN_HOST = "www.espn.com"
+MASSEY_HOST = "masseyratings.com"
+
+ODDS_PREFIX = "v4/sports/americanfootball_ncaaf/"
+ESPN_INJURIES = "college-football/team/injuries/_/name/"
+
+
+class FakeUpstream:
+    """
+    Threaded HTTP server on 127.0.0.1 serving fixtures with latency.
+    `host_latency_ms` overrides `latency_ms` per upstream host.
+    """
+
+    def __init__(self, fixtures: Optional[Fixtures] = None, port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 host_latency_ms: Optional[Dict[str, float]] = None, seed: int = 0):
+        self.fixtures = fixtures or Fixtures()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.host_latency_ms = dict(host_latency_ms or {})
+        self.requests: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._odds_tick = 0
+        self._body_cache: Dict[str, tuple] = {}
+
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real upstreams
+
+            def do_GET(self):
+                outer._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeUpstream":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --------------------------------------------------------
+    # Dispatch
+    # --------------------------------------------------------
+    def _delay(self, host: str):
+        base = self.host_latency_ms.get(host, self.latency_ms)
+        with self._lock:
+            jitter = self._rng.uniform(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+        if base + jitter > 0:
+            time.sleep((base + jitter) / 1000.0)
+
+    def _route(self, host: str, path: str, q: Dict[str, str]):
+        """(status, content_type, body_obj_or_text, cacheable) for one request."""
+        fx = self.fixtures
+        if host == CFBD_HOST:
+            data = fx.cfbd(path, q)
+            return (404, "application/json", {"error": "unknown endpoint"}, False) if data is None \
+                else (200, "application/json", data, True)
+        if host == ODDS_HOST and path.startswith(ODDS_PREFIX):
+            endpoint = path[len(ODDS_PREFIX):].strip("/")
+            if endpoint == "odds":
+                with self._lock:
+                    self._odds_tick += 1
+                    tick = self._odds_tick
+                return 200, "application/json", fx.odds_board(tick=tick), False
+            if endpoint == "odds-history":
+                return 200, "application/json", fx.odds_history(q.get("date", "2025-11-01")), True
+        if host == METEO_HOST and path == "v1/forecast":
+            return 200, "application/json", fx.forecast(q), True
+        if host == ESPN_HOST and path.startswith(ESPN_INJURIES):
+            return 200, "text/html; charset=utf-8", fx.espn_injuries(path[len(ESPN_INJURIES):]), True
+        if host == MASSEY_HOST:
+            return 200, "text/html; charset=utf-8", fx.massey_compare(), True
+        return 404, "application/json", {"error": f"no fixture for {host}/{path}"}, False
+
+    def _body(self, host: str, path: str, query: str):
+        """Encoded body (memoized for deterministic payloads, so serving stays cheap)."""
+        key = f"{host}/{path}?{query}"
+        hit = self._body_cache.get(key)
+        if hit is not None:
+            return hit
+        raw = recorded(host, path)
+        if raw is not None:
+            ctype = "text/html; charset=utf-8" if raw.lstrip()[:1] == b"<" else "application/json"
+            out = (200, ctype, raw)
+            cacheable = True
+        else:
+            status, ctype, obj, cacheable = self._route(host, path, dict(parse_qsl(query)))
+            body = obj if isinstance(obj, str) else json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+            out = (status, ctype, body.encode("utf-8"))
+        if cacheable:
+            self._body_cache[key] = out
+        return out
+
+    def _handle(self, req: BaseHTTPRequestHandler):
+        parts = urlsplit(req.path)
+        host, _, path = parts.path.lstrip("/").partition("/")
+        with self._lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+        self._delay(host)
+
+        try:
+            status, ctype, body = self._body(host, path, parts.query)
+        except Exception as e:  # a fixture bug should surface as an upstream 500, not a hang
+            status, ctype, body = 500, "application/json", json.dumps({"error": str(e)}).encode("utf-8")
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if status == 200 and req.headers.get("If-None-Match") == etag:
+            req.send_response(304)
+            req.send_header("ETag", etag)
+            req.send_header("Content-Length", "0")
+            req.end_headers()
+            return
+        req.send_response(status)
+        req.send_header("Content-Type", ctype)
+        req.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            req.send_header("ETag", etag)
+        req.end_headers()
+        req.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve benchmark fixtures as a fake upstream.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--teams", type=int, default=134)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    server = FakeUpstream(Fixtures(args.teams, args.seed), port=args.port,
+                          latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    print(f"[bench] fake upstream on {server.url} (set UPSTREAM_OVERRIDE={server.url})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+# bench/fixtures.py
+"""
+Upstream payloads for the benchmark's fake server.
+
+Recorded responses win: a file bench/fixtures/<host>/<path>.json (or .html)
+is served verbatim for that path, e.g.
+
+    bench/fixtures/api.collegefootballdata.com/ratings/spplus.json
+    bench/fixtures/www.espn.com/college-football/team/injuries/_/name/georgia.html
+
+Everything else is synthesized by Fixtures from a seeded RNG, so every run of
+the suite sees the same league (n_teams schools, a full regular season of
+games, drives, lines and odds boards) in the shapes the modules parse.
+"""
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (school, mascot, abbreviation, conference); padded with synthetic schools up to n_teams
+SCHOOLS = [
+    ("Georgia", "Bulldogs", "UGA", "SEC"), ("Alabama", "Crimson Tide", "ALA", "SEC"),
+    ("Texas", "Longhorns", "TEX", "SEC"), ("LSU", "Tigers", "LSU", "SEC"),
+    ("Tennessee", "Volunteers", "TENN", "SEC"), ("Ole Miss", "Rebels", "MISS", "SEC"),
+    ("Texas A&M", "Aggies", "TA&M", "SEC"), ("Missouri", "Tigers", "MIZ", "SEC"),
+    ("Oklahoma", "Sooners", "OU", "SEC"), ("Florida", "Gators", "FLA", "SEC"),
+    ("Auburn", "Tigers", "AUB", "SEC"), ("Kentucky", "Wildcats", "UK", "SEC"),
+    ("Ohio State", "Buckeyes", "OSU", "Big Ten"), ("Michigan", "Wolverines", "MICH", "Big Ten"),
+    ("Penn State", "Nittany Lions", "PSU", "Big Ten"), ("Oregon", "Ducks", "ORE", "Big Ten"),
+    ("USC", "Trojans", "USC", "Big Ten"), ("Washington", "Huskies", "WASH", "Big Ten"),
+    ("Wisconsin", "Badgers", "WIS", "Big Ten"), ("Iowa", "Hawkeyes", "IOWA", "Big Ten"),
+    ("Nebraska", "Cornhuskers", "NEB", "Big Ten"), ("Minnesota", "Golden Gophers", "MINN", "Big Ten"),
+    ("Illinois", "Fighting Illini", "ILL", "Big Ten"), ("UCLA", "Bruins", "UCLA", "Big Ten"),
+    ("Clemson", "Tigers", "CLEM", "ACC"), ("Florida State", "Seminoles", "FSU", "ACC"),
+    ("Miami", "Hurricanes", "MIA", "ACC"), ("Louisville", "Cardinals", "LOU", "ACC"),
+    ("NC State", "Wolfpack", "NCST", "ACC"), ("North Carolina", "Tar Heels", "UNC", "ACC"),
+    ("SMU", "Mustangs", "SMU", "ACC"), ("Virginia Tech", "Hokies", "VT", "ACC"),
+    ("Georgia Tech", "Yellow Jackets", "GT", "ACC"), ("Pittsburgh", "Panthers", "PITT", "ACC"),
+    ("Syracuse", "Orange", "SYR", "ACC"), ("Duke", "Blue Devils", "DUKE", "ACC"),
+    ("Utah", "Utes", "UTAH", "Big 12"), ("Kansas State", "Wildcats", "KSU", "Big 12"),
+    ("Oklahoma State", "Cowboys", "OKST", "Big 12"), ("Arizona", "Wildcats", "ARIZ", "Big 12"),
+    ("BYU", "Cougars", "BYU", "Big 12"), ("TCU", "Horned Frogs", "TCU", "Big 12"),
+    ("Iowa State", "Cyclones", "ISU", "Big 12"), ("Colorado", "Buffaloes", "COLO", "Big 12"),
+    ("UCF", "Knights", "UCF", "Big 12"), ("Texas Tech", "Red Raiders", "TTU", "Big 12"),
+    ("Baylor", "Bears", "BAY", "Big 12"), ("West Virginia", "Mountaineers", "WVU", "Big 12"),
+    ("Boise State", "Broncos", "BSU", "Mountain West"), ("UNLV", "Rebels", "UNLV", "Mountain West"),
+    ("San José State", "Spartans", "SJSU", "Mountain West"), ("Fresno State", "Bulldogs", "FRES", "Mountain West"),
+    ("Tulane", "Green Wave", "TULN", "American Athletic"), ("Memphis", "Tigers", "MEM", "American Athletic"),
+    ("Army", "Black Knights", "ARMY", "American Athletic"), ("Navy", "Midshipmen", "NAVY", "American Athletic"),
+    ("Liberty", "Flames", "LIB", "Conference USA"), ("Western Kentucky", "Hilltoppers", "WKU", "Conference USA"),
+    ("App State", "Mountaineers", "APP", "Sun Belt"), ("James Madison", "Dukes", "JMU", "Sun Belt"),
+    ("Louisiana", "Ragin' Cajuns", "ULL", "Sun Belt"), ("Texas State", "Bobcats", "TXST", "Sun Belt"),
+    ("Toledo", "Rockets", "TOL", "Mid-American"), ("Miami (OH)", "RedHawks", "M-OH", "Mid-American"),
+]
+
+BOOKS = ["draftkings", "fanduel", "betmgm", "caesars", "pointsbetus", "bovada"]
+REGULAR_WEEKS = 14
+INJURY_STATUSES = ["Out", "Questionable", "Doubtful", "Out for season"]
+POSITIONS = ["QB", "RB", "WR", "TE", "OL", "DL", "LB", "CB", "S"]
+
+
+def recorded(host: str, path: str) -> Optional[bytes]:
+    """Raw bytes of a recorded fixture for host + path, if one was dropped in."""
+    base = os.path.join(FIXTURE_DIR, host, path.strip("/") or "index")
+    for ext in (".json", ".html", ""):
+        if os.path.isfile(base + ext):
+            with open(base + ext, "rb") as f:
+                return f.read()
+    return None
+
+
+def _iso(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class Fixtures:
+    """A seeded synthetic league: every payload is a pure function of (seed, request)."""
+
+    def __init__(self, n_teams: int = 134, seed: int = 2025, drives_per_game: int = 12):
+        rng = random.Random(seed)
+        schools = list(SCHOOLS[:n_teams])
+        for i in range(len(schools), n_teams):
+            schools.append((f"Bench State {i + 1}", "Benchers", f"BS{i + 1}", "Independent"))
+        self.seed = seed
+        self.drives_per_game = drives_per_game
+        self.teams = [
+            {"id": i + 1, "school": s, "mascot": m, "abbreviation": a, "conference": c,
+             "classification": "fbs", "alternateNames": [a, s],
+             "rating": rng.gauss(0.0, 12.0), "tempo": rng.uniform(60.0, 80.0),
+             "pass_rate": rng.uniform(0.40, 0.60)}
+            for i, (s, m, a, c) in enumerate(schools)
+        ]
+        self.by_school = {t["school"]: t for t in self.teams}
+        self.venues = [
+            {"id": 1000 + t["id"], "name": f"{t['school']} Stadium",
+             "location": {"x": round(rng.uniform(25.0, 48.0), 4), "y": round(rng.uniform(-122.0, -70.0), 4)}}
+            for t in self.teams
+        ]
+        self._schedule: Dict[int, List[Dict[str, Any]]] = {}
+
+    # --------------------------------------------------------
+    # League
+    # --------------------------------------------------------
+    def _rng(self, *key) -> random.Random:
+        return random.Random(f"{self.seed}:" + ":".join(str(k) for k in key))
+
+    def season(self, year: int) -> List[Dict[str, Any]]:
+        """Every regular-season game of `year` (teams paired at random each week)."""
+        if year not in self._schedule:
+            rng = self._rng("schedule", year)
+            games = []
+            opener = datetime(year, 8, 30, 16, tzinfo=timezone.utc)
+            for week in range(1, REGULAR_WEEKS + 1):
+                order = self.teams[:]
+                rng.shuffle(order)
+                for i in range(0, len(order) - 1, 2):
+                    home, away = order[i], order[i + 1]
+                    margin = home["rating"] - away["rating"] + 2.5 + rng.gauss(0.0, 14.0)
+                    total = rng.uniform(38.0, 66.0)
+                    kickoff = opener + timedelta(days=7 * (week - 1), hours=rng.choice([0, 3, 4, 7]))
+                    games.append({
+                        "id": year * 10000 + week * 100 + i // 2,
+                        "season": year, "week": week, "seasonType": "regular",
+                        "startDate": _iso(kickoff),
+                        "neutralSite": rng.random() < 0.03,
+                        "venueId": 1000 + home["id"],
+                        "homeTeam": home["school"], "awayTeam": away["school"],
+                        "homePoints": max(0, round((total + margin) / 2)),
+                        "awayPoints": max(0, round((total - margin) / 2)),
+                        "_spread": round((away["rating"] - home["rating"] - 2.5) * 2) / 2,
+                        "_total": round(total * 2) / 2,
+                    })
+            self._schedule[year] = games
+        return self._schedule[year]
+
+    def week_games(self, year: int, week: Optional[int]) -> List[Dict[str, Any]]:
+        return [g for g in self.season(year) if week is None or g["week"] == week]
+
+    @staticmethod
+    def _public(g: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in g.items() if not k.startswith("_")}
+
+    # --------------------------------------------------------
+    # CFBD
+    # --------------------------------------------------------
+    def cfbd(self, path: str, q: Dict[str, str]) -> Any:
+        year = int(q.get("year", 2025))
+        week = int(q["week"]) if q.get("week") else None
+        team = q.get("team")
+        pick = (lambda rows: [r for r in rows if r.get("team") == team]) if team else (lambda rows: rows)
+
+        if path in ("teams", "teams/fbs"):
+            keep = ("id", "school", "mascot", "abbreviation", "conference", "classification", "alternateNames")
+            return [{k: t[k] for k in keep} for t in self.teams]
+        if path == "venues":
+            return self.venues
+        if path == "games":
+            return [self._public(g) for g in self.week_games(year, week)]
+        if path == "lines":
+            return [self._lines(g) for g in self.week_games(year, week)]
+        if path == "stats/season/advanced":
+            return pick([self._advanced(t, year) for t in self.teams])
+        if path == "stats/season":
+            return pick([row for t in self.teams for row in self._season_stats(t, year)])
+        if path == "ratings/spplus":
+            return [self._spplus(t, year) for t in self.teams]
+        if path == "ppa/teams":
+            return [self._ppa(t, year) for t in self.teams]
+        if path == "injuries":
+            return [row for t in self.teams for row in self._injuries(t)]
+        if path == "drives":
+            return self._drives(year, team)
+        if path == "teams/matchup":
+            return self._matchup(q.get("team1", ""), q.get("team2", ""))
+        return None
+
+    def _lines(self, g: Dict[str, Any]) -> Dict[str, Any]:
+        rng = self._rng("lines", g["id"])
+        books = []
+        for provider in BOOKS[: rng.randint(2, len(BOOKS))]:
+            close = g["_spread"] + rng.choice([-1.0, -0.5, 0.0, 0.0, 0.5, 1.0])
+            books.append({
+                "provider": provider,
+                "spread": close,
+                "formattedSpread": f"{g['homeTeam']} {close}",
+                "spreadOpen": close + rng.choice([-1.5, -0.5, 0.0, 0.5, 1.5]),
+                "overUnder": g["_total"],
+                "overUnderOpen": g["_total"] + rng.choice([-1.0, 0.0, 1.0]),
+                "homeMoneyline": -150 if close < 0 else 130,
+                "awayMoneyline": 130 if close < 0 else -150,
+            })
+        return {
+            "id": g["id"], "season": g["season"], "seasonType": "regular", "week": g["week"],
+            "startDate": g["startDate"], "homeTeam": g["homeTeam"], "awayTeam": g["awayTeam"],
+            "homeScore": g["homePoints"], "awayScore": g["awayPoints"], "lines": books,
+        }
+
+    def _advanced(self, t: Dict[str, Any], year: int) -> Dict[str, Any]:
+        rng = self._rng("advanced", t["school"], year)
+        edge = t["rating"] / 100.0
+        side = lambda sign: {
+            "plays": rng.randint(700, 950),
+            "ppa": round(0.15 + sign * edge + rng.gauss(0, 0.03), 4),
+            "successRate": round(0.42 + sign * edge / 2 + rng.gauss(0, 0.02), 4),
+            "explosiveness": round(1.2 + rng.gauss(0, 0.08), 4),
+        }
+        return {"season": year, "team": t["school"], "conference": t["conference"],
+                "offense": side(1), "defense": side(-1)}
+
+    def _season_stats(self, t: Dict[str, Any], year: int) -> List[Dict[str, Any]]:
+        plays = int(t["tempo"] * 12)
+        passes = int(plays * t["pass_rate"])
+        return [
+            {"season": year, "team": t["school"], "conference": t["conference"],
+             "statName": "passAttempts", "statValue": passes},
+            {"season": year, "team": t["school"], "conference": t["conference"],
+             "statName": "rushingAttempts", "statValue": plays - passes},
+        ]
+
+    def _spplus(self, t: Dict[str, Any], year: int) -> Dict[str, Any]:
+        rng = self._rng("spplus", t["school"], year)
+        return {"year": year, "team": t["school"], "conference": t["conference"],
+                "rating": round(t["rating"], 1),
+                "offense": {"rating": round(30 + t["rating"] / 2 + rng.gauss(0, 2), 1)},
+                "defense": {"rating": round(25 - t["rating"] / 2 + rng.gauss(0, 2), 1)}}
+
+    def _ppa(self, t: Dict[str, Any], year: int) -> Dict[str, Any]:
+        rng = self._rng("ppa", t["school"], year)
+        return {"season": year, "team": t["school"], "conference": t["conference"],
+                "offense": {"overall": round(0.2 + t["rating"] / 60 + rng.gauss(0, 0.03), 3)},
+                "defense": {"overall": round(0.2 - t["rating"] / 60 + rng.gauss(0, 0.03), 3)}}
+
+    def _injuries(self, t: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rng = self._rng("injuries", t["school"])
+        return [{"team": t["school"], "player": f"{t['abbreviation']} Player {i + 1}",
+                 "position": rng.choice(POSITIONS), "status": rng.choice(INJURY_STATUSES)}
+                for i in range(rng.randint(0, 5))]
+
+    def _drives(self, year: int, team: Optional[str]) -> List[Dict[str, Any]]:
+        out = []
+        for g in self.season(year):
+            if team and team not in (g["homeTeam"], g["awayTeam"]):
+                continue
+            rng = self._rng("drives", g["id"])
+            for n in range(self.drives_per_game * 2):
+                offense = g["homeTeam"] if n % 2 == 0 else g["awayTeam"]
+                if team and offense != team:
+                    continue
+                plays = max(1, int(rng.gauss(self.by_school[offense]["tempo"] / 12, 2.5)))
+                seconds = int(plays * rng.uniform(20, 34))
+                out.append({"gameId": g["id"], "offense": offense,
+                            "defense": g["awayTeam"] if offense == g["homeTeam"] else g["homeTeam"],
+                            "driveNumber": n + 1, "plays": plays,
+                            "driveTime": f"{seconds // 60}:{seconds % 60:02d}",
+                            "elapsed": {"minutes": seconds // 60, "seconds": seconds % 60}})
+        return out
+
+    def _matchup(self, team1: str, team2: str) -> Dict[str, Any]:
+        rng = self._rng("matchup", team1, team2)
+        games = []
+        for k in range(rng.randint(0, 6)):
+            a, b = rng.randint(0, 45), rng.randint(0, 45)
+            games.append({"season": 2024 - k, "week": rng.randint(1, 14), "seasonType": "regular",
+                          "neutralSite": False, "homeTeam": team1 if k % 2 == 0 else team2,
+                          "homeScore": a, "awayTeam": team2 if k % 2 == 0 else team1, "awayScore": b,
+                          "winner": team1 if (a > b) == (k % 2 == 0) else team2})
+        wins1 = sum(1 for g in games if g["winner"] == team1)
+        return {"team1": team1, "team2": team2, "team1Wins": wins1,
+                "team2Wins": len(games) - wins1, "ties": 0, "games": games}
+
+    # --------------------------------------------------------
+    # The Odds API
+    # --------------------------------------------------------
+    def odds_board(self, year: int = 2025, week: int = 10, tick: int = 0) -> List[Dict[str, Any]]:
+        """The upcoming board; `tick` nudges lines so consecutive boards differ like live ones."""
+        board = []
+        for g in self.week_games(year, week):
+            home = self.by_school[g["homeTeam"]]
+            away = self.by_school[g["awayTeam"]]
+            home_name, away_name = f"{home['school']} {home['mascot']}", f"{away['school']} {away['mascot']}"
+            rng = self._rng("odds", g["id"], tick)
+            books = []
+            for key in BOOKS:
+                spread = g["_spread"] + rng.choice([-0.5, 0.0, 0.0, 0.5])
+                books.append({
+                    "key": key, "title": key.title(),
+                    "last_update": _iso(datetime(year, 11, 1, tzinfo=timezone.utc) + timedelta(minutes=5 * tick)),
+                    "markets": [
+                        {"key": "h2h", "outcomes": [
+                            {"name": home_name, "price": -150 if spread < 0 else 130},
+                            {"name": away_name, "price": 130 if spread < 0 else -150}]},
+                        {"key": "spreads", "outcomes": [
+                            {"name": home_name, "price": rng.choice([-115, -110, -105]), "point": spread},
+                            {"name": away_name, "price": rng.choice([-115, -110, -105]), "point": -spread}]},
+                        {"key": "totals", "outcomes": [
+                            {"name": "Over", "price": -110, "point": g["_total"]},
+                            {"name": "Under", "price": -110, "point": g["_total"]}]},
+                    ],
+                })
+            board.append({"id": f"{g['id']:x}", "sport_key": "americanfootball_ncaaf",
+                          "commence_time": g["startDate"][:19] + "Z",
+                          "home_team": home_name, "away_team": away_name, "bookmakers": books})
+        return board
+
+    def odds_history(self, date: str) -> Dict[str, Any]:
+        day = datetime.fromisoformat(date[:10]).replace(tzinfo=timezone.utc)
+        week = max(1, min(REGULAR_WEEKS, (day - datetime(day.year, 8, 30, tzinfo=timezone.utc)).days // 7 + 1))
+        return {"timestamp": _iso(day), "previous_timestamp": _iso(day - timedelta(minutes=5)),
+                "next_timestamp": _iso(day + timedelta(minutes=5)),
+                "data": self.odds_board(day.year, week, tick=day.toordinal() % 7)}
+
+    # --------------------------------------------------------
+    # Open-Meteo
+    # --------------------------------------------------------
+    def forecast(self, q: Dict[str, str]) -> Any:
+        lats = [float(v) for v in q.get("latitude", "0").split(",")]
+        lons = [float(v) for v in q.get("longitude", "0").split(",")]
+        start = datetime.fromisoformat(q["start_hour"]) if q.get("start_hour") else datetime(2025, 11, 1)
+        end = datetime.fromisoformat(q["end_hour"]) if q.get("end_hour") else start + timedelta(hours=167)
+        hours = int((end - start).total_seconds() // 3600) + 1
+        out = []
+        for lat, lon in zip(lats, lons):
+            rng = self._rng("wx", lat, lon, start.isoformat())
+            times = [(start + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(hours)]
+            out.append({
+                "latitude": lat, "longitude": lon, "timezone": "UTC", "utc_offset_seconds": 0,
+                "hourly_units": {"time": "iso8601", "temperature_2m": "°C",
+                                 "precipitation": "mm", "wind_speed_10m": "mp/h"},
+                "hourly": {
+                    "time": times,
+                    "temperature_2m": [round(rng.uniform(-2, 30), 1) for _ in times],
+                    "precipitation": [round(max(0.0, rng.gauss(0, 0.6)), 1) for _ in times],
+                    "wind_speed_10m": [round(rng.uniform(0, 22), 1) for _ in times],
+                },
+            })
+        return out[0] if len(out) == 1 else out
+
+    # --------------------------------------------------------
+    # HTML pages
+    # --------------------------------------------------------
+    def espn_injuries(self, slug: str) -> str:
+        t = next((t for t in self.teams if t["school"].lower().replace(" ", "-") == slug), None)
+        rows = "".join(
+            f'<tr class="Table__TR"><td>{r["player"]}</td><td>{r["position"]}</td>'
+            f'<td>Nov 1</td><td>{r["status"]}</td></tr>'
+            for r in (self._injuries(t) if t else [])
+        )
+        return f'<html><body><table class="Table"><tbody>{rows}</tbody></table></body></html>'
+
+    def massey_compare(self) -> str:
+        ranked = sorted(self.teams, key=lambda t: -t["rating"])
+        rows = "".join(f"<tr><td>{i + 1}</td><td>{t['school']}</td><td>{t['rating']:.2f}</td></tr>"
+                       for i, t in enumerate(ranked))
+        return f"<html><body><table>{rows}</table></body></html>"
+
@@ -0,0 +1,324 @@
+# bench/run.py
+"""
+Offline benchmark suite.
+
+Starts bench/fake_upstream.py on a free local port, routes every upstream
+call to it (UPSTREAM_OVERRIDE), runs the service from a scratch working
+directory (caches, week files and stores never touch the repo) and times:
+
+- fetch:  cfb_batch.fetch_all_teams_metrics (bulk and per-team)
+- bridge: build_inputs / build_slate_inputs, cold (all caches dropped before
+          every call) and warm
+- model:  cfb_spread_model_v2 build_report / build_slate_report
+- routes: every Flask route in main.py through the test client, with the
+          example query strings the index route advertises
+
+Each case reports p50 / p95 / p99 / mean / max latency (ms), throughput
+(calls per second of wall time) and errors, written as JSON so runs from
+different commits can be diffed with bench/compare.py.
+
+    python -m bench.run --iterations 30 --latency-ms 25 --jitter-ms 10
+    python -m bench.run --only "route " --concurrency 8
+    python -m bench.compare bench/results/<old>.json bench/results/<new>.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(REPO_DIR, "bench", "results")
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from bench.fake_upstream import FakeUpstream  # noqa: E402
+from bench.fixtures import Fixtures  # noqa: E402
+
+YEAR, WEEK = 2025, 10
+HOME, AWAY = "Georgia", "Alabama"
+
+# routes that must run first (they produce what later routes read)
+ROUTE_ORDER = ["/admin/cfb/update"]
+
+
+# ------------------------------------------------------------
+# Environment
+# ------------------------------------------------------------
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _isolate(upstream_url: str) -> str:
+    """
+    Point the service at the fake upstream and a scratch directory. Must run
+    before any service module is imported (several read cwd / env at import).
+    """
+    workdir = tempfile.mkdtemp(prefix="cfb-bench-")
+    os.chdir(workdir)
+    os.environ["UPSTREAM_OVERRIDE"] = upstream_url
+    os.environ.setdefault("CFBD_API_KEY", "bench")
+    os.environ.setdefault("ODDS_API_KEY", "bench")
+
+    from modules import backtest, massey_scraper, odds_store
+    odds_store.STORE_DIR = os.path.join(workdir, "data", "odds_store")
+    backtest.STORE_DIR = os.path.join(workdir, "data", "backtest")
+    massey_scraper.CACHE_FILE = os.path.join(workdir, "data", "massey_cache.json")
+    return workdir
+
+
+def reset_caches():
+    """Drop every cache layer so the next call pays for its upstream fetches."""
+    from modules import cache_utils, cfb_extended, injuries_scraper, odds_totals
+    cache_utils.clear_memory_cache()
+    shutil.rmtree(cache_utils.CACHE_DIR, ignore_errors=True)
+    cfb_extended._RATINGS.clear()
+    odds_totals._SNAPSHOTS.clear()
+    injuries_scraper._espn_blocked_until = 0.0
+
+
+# ------------------------------------------------------------
+# Timing
+# ------------------------------------------------------------
+def _summary(latencies_ms: List[float], wall_s: float, errors: List[str],
+             statuses: Dict[str, int]) -> Dict[str, Any]:
+    lat = np.array(latencies_ms, dtype=float)
+    out: Dict[str, Any] = {"n": int(lat.size), "errors": len(errors)}
+    if lat.size:
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        out.update({
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "mean_ms": round(float(lat.mean()), 3),
+            "min_ms": round(float(lat.min()), 3),
+            "max_ms": round(float(lat.max()), 3),
+            "throughput_per_s": round(lat.size / wall_s, 3) if wall_s > 0 else None,
+        })
+    if statuses:
+        out["status"] = statuses
+    if errors:
+        out["first_error"] = errors[0][:300]
+    return out
+
+
+def time_case(fn: Callable[[], Any], iterations: int, warmup: int = 1, concurrency: int = 1,
+              before_each: Optional[Callable[[], None]] = None,
+              check: Optional[Callable[[Any], Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Call fn() `iterations` times (after `warmup` untimed calls) and summarize.
+    `before_each` runs untimed before every call (forces concurrency 1);
+    `check` maps a result to an error string (or None) and tallies statuses.
+    """
+    errors: List[str] = []
+    statuses: Dict[str, int] = {}
+
+    def one() -> float:
+        if before_each:
+            before_each()
+        t0 = time.perf_counter()
+        try:
+            result = fn()
+        except (Exception, SystemExit) as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            return (time.perf_counter() - t0) * 1000.0
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        if check:
+            status = check(result)
+            if status is not None:
+                statuses[status] = statuses.get(status, 0) + 1
+                if not status.startswith("2"):
+                    body = result.get_data(as_text=True)[:200] if hasattr(result, "get_data") else ""
+                    errors.append(f"status {status} {body}".strip())
+        return elapsed
+
+    for _ in range(warmup):
+        one()
+    errors.clear()
+    statuses.clear()
+
+    if before_each is not None or concurrency <= 1:
+        started = time.perf_counter()
+        lat = [one() for _ in range(iterations)]
+        wall = time.perf_counter() - started
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as ex:
+            started = time.perf_counter()
+            lat = list(ex.map(lambda _: one(), range(iterations)))
+            wall = time.perf_counter() - started
+    return _summary(lat, wall, errors, statuses)
+
+
+# ------------------------------------------------------------
+# Cases
+# ------------------------------------------------------------
+def function_cases() -> List[Dict[str, Any]]:
+    from bridges import cfb_to_model
+    from modules import cfb_batch
+    import cfb_spread_model_v2 as model
+
+    cfg = cfb_to_model.build_inputs(HOME, AWAY, YEAR, WEEK)
+    cfg = {"inputs": cfg["inputs"], "market": cfg["market"]}
+    slate = [g["cfg"] for g in cfb_to_model.build_slate_inputs(YEAR, WEEK)["games"]]
+
+    return [
+        {"name": "fetch fetch_all_teams_metrics bulk",
+         "fn": lambda: cfb_batch.fetch_all_teams_metrics(YEAR, WEEK, bulk=True)},
+        # rate limit lifted: the per-team path is measured, not the token bucket
+        {"name": "fetch fetch_all_teams_metrics per_team",
+         "fn": lambda: cfb_batch.fetch_all_teams_metrics(YEAR, WEEK, rate_per_sec=1e6, bulk=False)},
+        {"name": "bridge build_inputs cold", "cold": True,
+         "fn": lambda: cfb_to_model.build_inputs(HOME, AWAY, YEAR, WEEK)},
+        {"name": "bridge build_inputs warm",
+         "fn": lambda: cfb_to_model.build_inputs(HOME, AWAY, YEAR, WEEK)},
+        {"name": "bridge build_slate_inputs cold", "cold": True,
+         "fn": lambda: cfb_to_model.build_slate_inputs(YEAR, WEEK)},
+        {"name": "bridge build_slate_inputs warm",
+         "fn": lambda: cfb_to_model.build_slate_inputs(YEAR, WEEK)},
+        {"name": "model compute_expected_margin",
+         "fn": lambda: model.compute_expected_margin(cfg)},
+        {"name": "model build_report",
+         "fn": lambda: model.build_report(cfg)},
+        {"name": f"model build_slate_report ({len(slate)} games)",
+         "fn": lambda: model.build_slate_report(slate)},
+    ]
+
+
+def _route_examples(client) -> Dict[str, List[str]]:
+    """Example URLs per route path, taken from the index route's endpoint list."""
+    examples: Dict[str, List[str]] = {}
+    for url in client.get("/").get_json().get("endpoints", {}).values():
+        examples.setdefault(urlsplit(url).path, []).append(url)
+    return examples
+
+
+def route_cases(app, fixtures: Fixtures) -> List[Dict[str, Any]]:
+    client = app.test_client()
+    app.logger.disabled = True  # failing routes are counted, not logged
+    examples = _route_examples(client)
+    # the index example names a game the fixture slate may not have; add one it does
+    g = fixtures.week_games(YEAR, WEEK)[0]
+    examples.setdefault("/cfb/odds/movement", []).append(
+        f"/cfb/odds/movement?home={g['homeTeam']}&away={g['awayTeam']}&market=spreads")
+    paths = sorted({r.rule for r in app.url_map.iter_rules()
+                    if "GET" in r.methods and not r.rule.startswith("/static")},
+                   key=lambda p: (p not in ROUTE_ORDER, p))
+
+    def call(url: str):
+        def fn():
+            resp = client.get(url)
+            resp.get_data()  # drain streamed (NDJSON) bodies
+            return resp
+        return fn
+
+    cases = []
+    for path in paths:
+        for url in examples.get(path, [path]):
+            cases.append({"name": f"route GET {url}", "fn": call(url),
+                          "check": lambda resp: str(resp.status_code)})
+    return cases
+
+
+# ------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------
+def run(args) -> Dict[str, Any]:
+    fixtures = Fixtures(n_teams=args.teams, seed=args.seed)
+    cwd = os.getcwd()
+    with FakeUpstream(fixtures, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed) as upstream:
+        workdir = _isolate(upstream.url)
+        try:
+            from main import app
+
+            cases = function_cases() + route_cases(app, fixtures)
+            if args.only:
+                cases = [c for c in cases if args.only in c["name"]]
+
+            results: Dict[str, Any] = {}
+            for case in cases:
+                cold = case.get("cold", False)
+                iterations = args.cold_iterations if cold else args.iterations
+                started = time.perf_counter()
+                results[case["name"]] = time_case(
+                    case["fn"], iterations,
+                    warmup=0 if cold else args.warmup,
+                    concurrency=args.concurrency,
+                    before_each=reset_caches if cold else None,
+                    check=case.get("check"),
+                )
+                r = results[case["name"]]
+                print(f"[bench] {case['name']:<70} p50={r.get('p50_ms', '-'):>9} ms  "
+                      f"p95={r.get('p95_ms', '-'):>9} ms  errors={r['errors']}  "
+                      f"({time.perf_counter() - started:.1f}s)", flush=True)
+            upstream_requests = dict(upstream.requests)
+        finally:
+            os.chdir(cwd)
+            if not args.keep_workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {
+                "iterations": args.iterations,
+                "cold_iterations": args.cold_iterations,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "teams": args.teams,
+                "seed": args.seed,
+                "only": args.only,
+            },
+            "upstream_requests": upstream_requests,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the service against a local fake upstream.")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--cold-iterations", type=int, default=5,
+                        help="iterations for cold cases (every cache dropped before each call)")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="client threads for warm cases (throughput under load)")
+    parser.add_argument("--latency-ms", type=float, default=25.0, help="fake upstream base latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="extra uniform latency, 0..jitter")
+    parser.add_argument("--teams", type=int, default=134)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--only", default=None, help="run only cases whose name contains this")
+    parser.add_argument("--out", default=None, help="results file (default bench/results/<commit>.json)")
+    parser.add_argument("--keep-workdir", action="store_true", help="keep the scratch directory")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    out = args.out or os.path.join(RESULTS_DIR, f"{(report['meta']['commit'] or 'nogit')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"[bench] wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
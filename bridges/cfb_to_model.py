@@ -7,24 +7,64 @@ Usage:
     python bridges/cfb_to_model.py --home "Georgia" --away "Alabama" --year 2025 --week 10
 """
 
-import json, math, sys, traceback
+import json, math, sys, time, traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from pathlib import Path
 from typing import Dict, Any
 
 # Scraper imports
 from modules import (
+    cfb_data,
     cfb_matchup,
     cfb_extended,
-    massey_scraper,
-    normalization,
     odds_totals,
     injuries_scraper,
+    model_service,
     weather_openmeteo,
     tempo_plays,
 )
+from modules.cache_utils import load_or_fetch
+from modules.teams import team_key
 
-# Validation script
-import validate_input
+
+# Per-source budgets (seconds, measured from the start of the fan-out).
+# A source that misses its budget falls back to its default and is reported
+# under meta.timed_out. Weather's budget includes waiting for the matchup.
+SOURCE_TIMEOUTS = {
+    "matchup": 12,
+    "spplus": 25,
+    "ppa": 25,
+    "odds": 12,
+    "injuries_home": 12,
+    "injuries_away": 12,
+    "weather": 24,
+    "tempo_home": 18,
+    "tempo_away": 18,
+}
+
+# Slate-wide tables: one fetch each for the whole week.
+SLATE_TIMEOUTS = {
+    "games": 20,
+    "venues": 20,
+    "spplus": 25,
+    "ppa": 25,
+    "odds": 15,
+    "injuries": 15,
+    "tempo": 45,
+    "weather": 30,
+}
+VENUES_TTL = 7 * 24 * 3600
+
+# Fields _assemble emits and validate_inputs checks.
+INPUT_FIELDS = (
+    "offense_home", "defense_home", "offense_away", "defense_away",
+    "home_field_points", "rest_diff_days", "away_travel_miles",
+    "qb_home_delta", "qb_away_delta", "key_injuries_home", "key_injuries_away",
+    "wind_mph", "pass_rate_home", "pass_rate_away",
+)
+MARKET_FIELDS = ("spread", "odds_home", "odds_away")
+
+_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="build-inputs")
 
 
 # ------------------------------------------------------------
@@ -47,81 +87,167 @@ def _safe_get(d: Dict, key: str, default=0.0):
     return d[key] if key in d and isinstance(d[key], (int, float)) else default
 
 
+def _as_dict(v) -> Dict:
+    return v if isinstance(v, dict) else {}
+
+
+# ------------------------------------------------------------
+# Concurrent fetch graph
+# ------------------------------------------------------------
+def _fetch_sources(team_home: str, team_away: str, year: int, week: int) -> Dict[str, Any]:
+    """
+    Fire every upstream call at once. Only weather depends on another source
+    (the matchup venue); everything else is independent.
+    Returns {"results": {...}, "meta": {"latency_ms", "total_ms", "timed_out"}}.
+    """
+    started = time.perf_counter()
+    latency_ms: Dict[str, float] = {}
+    timed = lambda name, fn, *args: _timed(latency_ms, name, fn, *args)
+
+    futures = {
+        "matchup": _POOL.submit(timed, "matchup", cfb_matchup.get_team_matchup, team_home, team_away, year),
+        "spplus": _POOL.submit(timed, "spplus", cfb_extended.spplus_index, year),
+        "ppa": _POOL.submit(timed, "ppa", cfb_extended.ppa_index, year),
+        "odds": _POOL.submit(timed, "odds", odds_totals.get_game_odds, team_home, team_away, year, week),
+        "injuries_home": _POOL.submit(timed, "injuries_home", injuries_scraper.get_injuries, team_home),
+        "injuries_away": _POOL.submit(timed, "injuries_away", injuries_scraper.get_injuries, team_away),
+        "tempo_home": _POOL.submit(timed, "tempo_home", tempo_plays.get_tempo, team_home, year),
+        "tempo_away": _POOL.submit(timed, "tempo_away", tempo_plays.get_tempo, team_away, year),
+    }
+
+    def weather_after_matchup():
+        matchup = futures["matchup"].result(timeout=SOURCE_TIMEOUTS["matchup"])
+        venue = matchup.get("venue", {})
+        kickoff = venue.get("kickoff") or matchup.get("start_date")
+        return timed("weather", weather_openmeteo.get_weather, venue.get("lat", 0), venue.get("lon", 0), kickoff)
+
+    futures["weather"] = _POOL.submit(weather_after_matchup)
+
+    return _collect(futures, SOURCE_TIMEOUTS, started, latency_ms)
+
+
+def _timed(latency_ms: Dict[str, float], name: str, fn, *args):
+    t0 = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        latency_ms[name] = round((time.perf_counter() - t0) * 1000.0, 1)
+
+
+def _collect(futures: Dict[str, Any], budgets: Dict[str, float], started: float,
+             latency_ms: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Wait for each future within its budget. A miss yields {} and is listed in
+    timed_out; a source that raised yields {} and its message under errors.
+    """
+    results: Dict[str, Any] = {}
+    timed_out, errors = [], {}
+    for name, fut in futures.items():
+        remaining = budgets[name] - (time.perf_counter() - started)
+        try:
+            results[name] = fut.result(timeout=max(0.0, remaining))
+        except FutureTimeout:
+            results[name] = {}
+            timed_out.append(name)
+        except Exception as e:
+            results[name] = {}
+            errors[name] = str(e)
+
+    return {
+        "results": results,
+        "meta": {
+            "latency_ms": dict(latency_ms),
+            "total_ms": round((time.perf_counter() - started) * 1000.0, 1),
+            "timed_out": timed_out,
+            "errors": errors,
+        },
+    }
+
+
 # ------------------------------------------------------------
 # Core Builder
 # ------------------------------------------------------------
+def _assemble(team_home: str, team_away: str, src: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn fetched source payloads into the model's {"inputs", "market"} config."""
+    # --- matchup ---
+    matchup = src["matchup"]
+    venue = matchup.get("venue", {})
+    neutral = bool(venue.get("neutral", False))
+    home_field_points = 0.0 if neutral else 1.2
+
+    # --- efficiency metrics (season tables are memoized, lookups are O(1)) ---
+    spplus = src["spplus"]
+    ppa = src["ppa"]
+    k_home, k_away = team_key(team_home), team_key(team_away)
+    sp_h, sp_a = spplus.get(k_home, {}), spplus.get(k_away, {})
+    ppa_h, ppa_a = ppa.get(k_home, {}), ppa.get(k_away, {})
+
+    offense_home = _median([sp_h.get("sp_off"), ppa_h.get("ppa_off")])
+    defense_home = _median([sp_h.get("sp_def"), ppa_h.get("ppa_def")])
+    offense_away = _median([sp_a.get("sp_off"), ppa_a.get("ppa_off")])
+    defense_away = _median([sp_a.get("sp_def"), ppa_a.get("ppa_def")])
+
+    # --- odds (consensus across books from the slate snapshot) ---
+    # The board quotes the home line (-7 = home favoured by 7); the model's
+    # spread is the home margin the home side must beat, hence the sign flip.
+    odds = src["odds"]
+    spread = -_safe_get(odds, "median_spread_home", 0)
+    odds_home = _safe_get(odds, "median_odds_home", -110)
+    odds_away = _safe_get(odds, "median_odds_away", -110)
+
+    # --- injuries ---
+    # ESPN/league lookups can come back as a list of rows or a message dict
+    inj_home = _as_dict(src["injuries_home"])
+    inj_away = _as_dict(src["injuries_away"])
+    qb_home_delta = _safe_get(inj_home, "qb_delta", 0)
+    qb_away_delta = _safe_get(inj_away, "qb_delta", 0)
+    key_injuries_home = int(inj_home.get("starters_out_non_qb", 0))
+    key_injuries_away = int(inj_away.get("starters_out_non_qb", 0))
+
+    # --- weather ---
+    weather = src["weather"]
+    wind_mph = _median([w.get("wind") for w in weather.get("weather_window", [])])
+
+    # --- tempo / pass rate ---
+    t_h = _as_dict(src["tempo_home"])
+    t_a = _as_dict(src["tempo_away"])
+    pass_rate_home = _safe_get(t_h, "pass_rate", 0.52)
+    pass_rate_away = _safe_get(t_a, "pass_rate", 0.48)
+
+    # --- rest / travel (temporary placeholders) ---
+    rest_diff_days = matchup.get("rest_diff_days", 0)
+    away_travel_miles = venue.get("travel_miles", 0)
+
+    return {
+        "inputs": {
+            "offense_home": offense_home,
+            "defense_home": defense_home,
+            "offense_away": offense_away,
+            "defense_away": defense_away,
+            "home_field_points": home_field_points,
+            "rest_diff_days": rest_diff_days,
+            "away_travel_miles": away_travel_miles,
+            "qb_home_delta": qb_home_delta,
+            "qb_away_delta": qb_away_delta,
+            "key_injuries_home": key_injuries_home,
+            "key_injuries_away": key_injuries_away,
+            "wind_mph": wind_mph,
+            "pass_rate_home": pass_rate_home,
+            "pass_rate_away": pass_rate_away,
+        },
+        "market": {
+            "spread": spread,
+            "odds_home": odds_home,
+            "odds_away": odds_away,
+        },
+    }
+
+
 def build_inputs(team_home: str, team_away: str, year: int, week: int) -> Dict[str, Any]:
-    """Collects data from all scrapers and formats it for the deterministic model."""
+    """Collects data from all scrapers (concurrently) and formats it for the deterministic model."""
     try:
-        # --- matchup ---
-        matchup = cfb_matchup.get_team_matchup(team_home, team_away, year)
-        venue = matchup.get("venue", {})
-        lat, lon = venue.get("lat", 0), venue.get("lon", 0)
-        neutral = bool(venue.get("neutral", False))
-        home_field_points = 0.0 if neutral else 1.2
-
-        # --- efficiency metrics ---
-        spplus = cfb_extended.get_spplus(year)
-        ppa = cfb_extended.get_ppa(year)
-        sp_h, sp_a = spplus.get(team_home, {}), spplus.get(team_away, {})
-        ppa_h, ppa_a = ppa.get(team_home, {}), ppa.get(team_away, {})
-
-        offense_home = _median([sp_h.get("sp_off"), ppa_h.get("ppa_off")])
-        defense_home = _median([sp_h.get("sp_def"), ppa_h.get("ppa_def")])
-        offense_away = _median([sp_a.get("sp_off"), ppa_a.get("ppa_off")])
-        defense_away = _median([sp_a.get("sp_def"), ppa_a.get("ppa_def")])
-
-        # --- odds ---
-        odds = odds_totals.get_odds_totals(week=week, year=year)
-        spread = _safe_get(odds, "median_spread_home", 0)
-        odds_home = _safe_get(odds, "median_odds_home", -110)
-        odds_away = _safe_get(odds, "median_odds_away", -110)
-
-        # --- injuries ---
-        inj_home = injuries_scraper.get_injuries(team_home)
-        inj_away = injuries_scraper.get_injuries(team_away)
-        qb_home_delta = _safe_get(inj_home, "qb_delta", 0)
-        qb_away_delta = _safe_get(inj_away, "qb_delta", 0)
-        key_injuries_home = int(inj_home.get("starters_out_non_qb", 0))
-        key_injuries_away = int(inj_away.get("starters_out_non_qb", 0))
-
-        # --- weather ---
-        weather = weather_openmeteo.get_weather(lat, lon)
-        wind_mph = _median([w.get("avg_wind") for w in weather.get("weather_window", [])])
-
-        # --- tempo / pass rate ---
-        t_h = tempo_plays.get_tempo(team_home)
-        t_a = tempo_plays.get_tempo(team_away)
-        pass_rate_home = _safe_get(t_h, "pass_rate", 0.52)
-        pass_rate_away = _safe_get(t_a, "pass_rate", 0.48)
-
-        # --- rest / travel (temporary placeholders) ---
-        rest_diff_days = matchup.get("rest_diff_days", 0)
-        away_travel_miles = venue.get("travel_miles", 0)
-
-        return {
-            "inputs": {
-                "offense_home": offense_home,
-                "defense_home": defense_home,
-                "offense_away": offense_away,
-                "defense_away": defense_away,
-                "home_field_points": home_field_points,
-                "rest_diff_days": rest_diff_days,
-                "away_travel_miles": away_travel_miles,
-                "qb_home_delta": qb_home_delta,
-                "qb_away_delta": qb_away_delta,
-                "key_injuries_home": key_injuries_home,
-                "key_injuries_away": key_injuries_away,
-                "wind_mph": wind_mph,
-                "pass_rate_home": pass_rate_home,
-                "pass_rate_away": pass_rate_away,
-            },
-            "market": {
-                "spread": spread,
-                "odds_home": odds_home,
-                "odds_away": odds_away,
-            },
-        }
+        fetched = _fetch_sources(team_home, team_away, year, week)
+        return {**_assemble(team_home, team_away, fetched["results"]), "meta": fetched["meta"]}
 
     except Exception as e:
         print(f"\n[ERROR] Failed to build input JSON: {e}\n")
@@ -129,25 +255,137 @@ def build_inputs(team_home: str, team_away: str, year: int, week: int) -> Dict[s
         sys.exit(1)
 
 
+# ------------------------------------------------------------
+# Slate Builder
+# ------------------------------------------------------------
+def _pick(row: Dict, *names, default=None):
+    """First present field; CFBD has served both camelCase and snake_case keys."""
+    for n in names:
+        if row.get(n) is not None:
+            return row[n]
+    return default
+
+
+def _fetch_games(year: int, week: int, season_type: str = "regular"):
+    games = cfb_data.fetch_cfbd("games", {"year": year, "week": week, "seasonType": season_type})
+    if isinstance(games, dict):
+        raise RuntimeError(games.get("error", "games fetch failed"))
+    return games
+
+
+def _fetch_venues():
+    venues = cfb_data.fetch_cfbd("venues")
+    if isinstance(venues, dict):
+        return venues
+    index = {}
+    for v in venues:
+        loc = v.get("location") or {}
+        lat, lon = _pick(loc, "x", default=v.get("latitude")), _pick(loc, "y", default=v.get("longitude"))
+        if v.get("id") is not None and lat is not None and lon is not None:
+            index[str(v["id"])] = {"lat": lat, "lon": lon}
+    return index
+
+
+def build_slate_inputs(year: int, week: int, season_type: str = "regular") -> Dict[str, Any]:
+    """
+    Model configs for every game of a week. Each shared table (games, venues,
+    SP+, PPA, odds board, league injuries, tempo) is fetched once, weather for
+    all venues goes out as one batched request, and games are then assembled
+    from in-memory lookups.
+    Returns {"year", "week", "games": [{"id", "home_team", "away_team",
+    "start_date", "cfg"}], "meta": {...}}.
+    """
+    started = time.perf_counter()
+    latency_ms: Dict[str, float] = {}
+    timed = lambda name, fn, *args: _timed(latency_ms, name, fn, *args)
+
+    futures = {
+        "games": _POOL.submit(timed, "games", _fetch_games, year, week, season_type),
+        "venues": _POOL.submit(timed, "venues", load_or_fetch, "cfbd_venues", _fetch_venues, VENUES_TTL),
+        "spplus": _POOL.submit(timed, "spplus", cfb_extended.spplus_index, year),
+        "ppa": _POOL.submit(timed, "ppa", cfb_extended.ppa_index, year),
+        "odds": _POOL.submit(timed, "odds", odds_totals.get_odds_snapshot, year, week),
+        "injuries": _POOL.submit(timed, "injuries", injuries_scraper.get_league_injuries),
+        "tempo": _POOL.submit(timed, "tempo", tempo_plays.get_tempo_table, year),
+    }
+
+    games = [g for g in futures["games"].result(timeout=SLATE_TIMEOUTS["games"])
+             if _pick(g, "homeTeam", "home_team") and _pick(g, "awayTeam", "away_team")]
+
+    def weather_for_slate():
+        venues = futures["venues"].result(timeout=SLATE_TIMEOUTS["venues"])
+        venues = venues if isinstance(venues, dict) and "error" not in venues else {}
+        points = [{**venues.get(str(_pick(g, "venueId", "venue_id")), {"lat": 0, "lon": 0}),
+                   "kickoff": _pick(g, "startDate", "start_date")} for g in games]
+        return timed("weather", weather_openmeteo.get_weather_batch, points)
+
+    futures["weather"] = _POOL.submit(weather_for_slate)
+    fetched = _collect(futures, SLATE_TIMEOUTS, started, latency_ms)
+    shared = fetched["results"]
+
+    odds_snap = shared["odds"] or {"games": [], "by_pair": {}, "by_id": {}}
+    injuries = _as_dict(shared["injuries"])
+    tempo = _as_dict(shared["tempo"])
+    weather = shared["weather"] if isinstance(shared["weather"], list) else [{}] * len(games)
+
+    out = []
+    for g, wx in zip(games, weather):
+        home, away = _pick(g, "homeTeam", "home_team"), _pick(g, "awayTeam", "away_team")
+        k_home, k_away = team_key(home), team_key(away)
+        src = {
+            "matchup": {"venue": {"neutral": bool(_pick(g, "neutralSite", "neutral_site", default=False))}},
+            "spplus": shared["spplus"],
+            "ppa": shared["ppa"],
+            "odds": odds_totals.lookup_game_odds(odds_snap, home, away),
+            "injuries_home": injuries.get(k_home, {}),
+            "injuries_away": injuries.get(k_away, {}),
+            "weather": _as_dict(wx),
+            "tempo_home": tempo.get(k_home) or {},
+            "tempo_away": tempo.get(k_away) or {},
+        }
+        out.append({
+            "id": g.get("id"),
+            "home_team": home,
+            "away_team": away,
+            "start_date": _pick(g, "startDate", "start_date"),
+            "cfg": _assemble(home, away, src),
+        })
+
+    return {"year": year, "week": week, "games": out, "meta": fetched["meta"]}
+
+
+def price_slate(year: int, week: int, offload: bool = False) -> Dict[str, Any]:
+    """build_slate_inputs + one vectorized model pass over every game of the week."""
+    slate = build_slate_inputs(year, week)
+    reports = model_service.run_slate([g["cfg"] for g in slate["games"]], offload=offload)
+    games = [
+        {k: g[k] for k in ("id", "home_team", "away_team", "start_date")} | {"model_output": r}
+        for g, r in zip(slate["games"], reports)
+    ]
+    return {"year": year, "week": week, "count": len(games), "games": games, "meta": slate["meta"]}
+
+
 # ------------------------------------------------------------
 # Validation Wrapper
 # ------------------------------------------------------------
 def validate_inputs(data: Dict[str, Any]) -> bool:
-    """Run validator and print result clearly."""
-    try:
-        tmp = Path("temp_input.json")
-        tmp.write_text(json.dumps(data, indent=2))
-        print("[INFO] Running validation...")
-        ok = validate_input.main(str(tmp))  # expects validate_input.py to have a main()
-        if ok:
-            print("[SUCCESS] Validation passed ✅")
-            return True
-        else:
-            print("[FAIL] Validation failed ❌ — see above.")
-            return False
-    except Exception:
-        traceback.print_exc()
+    """Check every model input / market field is present and a finite number; print the result."""
+    problems = []
+    for section, fields in (("inputs", INPUT_FIELDS), ("market", MARKET_FIELDS)):
+        block = data.get(section) if isinstance(data, dict) else None
+        if not isinstance(block, dict):
+            problems.append(f"missing '{section}'")
+            continue
+        for field in fields:
+            value = block.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                problems.append(f"{section}.{field} = {value!r}")
+
+    if problems:
+        print("[FAIL] Validation failed ❌ — " + "; ".join(problems))
         return False
+    print("[SUCCESS] Validation passed ✅")
+    return True
 
 
 # ------------------------------------------------------------
@@ -9,21 +9,67 @@ Deterministic (no-ML) CFB spread model with an expanded, reproducible stack:
 3) Confidence intervals for predicted margin
 4) Reliability score (R^2-like, deterministic heuristic)
 5) Lambda-weighted recency scalar (configurable)
-6) Fixed-seed Monte Carlo (reproducible) for sanity-check probabilities
+6) Seeded NumPy Monte Carlo (reproducible; pseudo / antithetic / Sobol) for
+   sanity-check probabilities — see modules/monte_carlo.py
+7) Slate-wide batch API (NumPy) that prices every game in one vectorized pass
 
 CLI:
   python cfb_spread_model_v2.py --input input.json --out report.json
+  (if input.json holds a list of game configs, the whole slate is priced at once)
 
 This file is API-compatible with the v1 JSON schema used by your bridge:
   - cfg['inputs'] ... fields
   - cfg['market'] ... spread, odds_home, odds_away
 """
 
-import json, math, argparse, sys, random
-from typing import Dict, Any
+import json, math, argparse
+from typing import Dict, Any, List
+
+import numpy as np
+
+from modules.monte_carlo import cover_probability, MC_SAMPLES, MC_METHOD, MC_SEED
 
 RECENCY_LAMBDA = 0.834421  # user-specified
 
+# Defaults (tunable)
+DEFAULT_COEFFICIENTS = {
+    "b0": 0.0,
+    "b_matchup": 7.0,
+    "b_hfa": 1.2,
+    "b_rest": 0.15,
+    "b_travel": -0.10,
+    "b_qb": 3.0,
+    "b_injury": 0.35,
+    "b_weather_margin": 0.03,
+    "sigma_spread": 14.0,
+    # extra v2 knobs
+    "r2_prior": 0.65,
+    "wind_sigma_step": 0.01,   # +1% sigma per mph above 10
+    "inj_sigma_step": 0.03,    # +3% sigma per non-QB starter out (sum both sides)
+}
+
+# Per-game input fields and the defaults compute_expected_margin falls back to
+INPUT_DEFAULTS = {
+    "offense_home": 0.0,
+    "defense_home": 0.0,
+    "offense_away": 0.0,
+    "defense_away": 0.0,
+    "home_field_points": 0.0,
+    "rest_diff_days": 0.0,
+    "away_travel_miles": 0.0,
+    "qb_home_delta": 0.0,
+    "qb_away_delta": 0.0,
+    "key_injuries_home": 0.0,
+    "key_injuries_away": 0.0,
+    "wind_mph": 0.0,
+    "pass_rate_home": 0.5,
+    "pass_rate_away": 0.5,
+}
+
+MARKET_DEFAULTS = {"spread": 0.0, "odds_home": -110.0, "odds_away": -110.0}
+
+EDGE_THRESHOLD_EV = 0.03
+
 def phi(z: float) -> float:
     return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
 
@@ -52,23 +98,7 @@ def compute_expected_margin(cfg: Dict[str, Any]) -> Dict[str, Any]:
     I = cfg.get("inputs", {})
     C = cfg.get("coefficients", {})
 
-    # Defaults (tunable)
-    defaults = {
-        "b0": 0.0,
-        "b_matchup": 7.0,
-        "b_hfa": 1.2,
-        "b_rest": 0.15,
-        "b_travel": -0.10,
-        "b_qb": 3.0,
-        "b_injury": 0.35,
-        "b_weather_margin": 0.03,
-        "sigma_spread": 14.0,
-        # extra v2 knobs
-        "r2_prior": 0.65,
-        "wind_sigma_step": 0.01,   # +1% sigma per mph above 10
-        "inj_sigma_step": 0.03,    # +3% sigma per non-QB starter out (sum both sides)
-    }
-    for k,v in defaults.items():
+    for k,v in DEFAULT_COEFFICIENTS.items():
         C.setdefault(k, v)
 
     off_home = float(I.get("offense_home", 0.0))
@@ -131,7 +161,8 @@ def compute_expected_margin(cfg: Dict[str, Any]) -> Dict[str, Any]:
         "coefficients_used": C
     }
 
-def evaluate_market_v2(em_report: Dict[str, Any], market: Dict[str, Any]) -> Dict[str, Any]:
+def evaluate_market_v2(em_report: Dict[str, Any], market: Dict[str, Any],
+                       mc_samples: int = None, mc_method: str = None, mc_seed: int = None) -> Dict[str, Any]:
     em = em_report["expected_margin_home_minus_away"]
     sigma = em_report["sigma_spread"]
     C = em_report["coefficients_used"]
@@ -179,23 +210,18 @@ def evaluate_market_v2(em_report: Dict[str, Any], market: Dict[str, Any]) -> Dic
     k_away = kelly_fraction(p_away_cover, odds_away)
 
     # Fixed-seed Monte Carlo to sanity-check cover prob
-    random.seed(42)
-    N = 10000
-    cnt_home = 0
-    for _ in range(N):
-        # normal draw via Box-Muller (deterministic with fixed seed)
-        u1 = max(1e-12, random.random())
-        u2 = random.random()
-        g = math.sqrt(-2.0*math.log(u1)) * math.cos(2.0*math.pi*u2)  # ~N(0,1)
-        margin = em + sigma * g
-        if (margin - S) > 0:
-            cnt_home += 1
-    mc_p_home_cover = cnt_home / float(N)
+    mc_samples = int(mc_samples or MC_SAMPLES)
+    mc_method = mc_method or MC_METHOD
+    mc_p_home_cover = float(cover_probability(
+        em, sigma, S, n=mc_samples, method=mc_method, seeds=MC_SEED if mc_seed is None else mc_seed
+    ))
 
     return {
         "market_spread": S,
         "prob_home_cover_analytic": p_home_cover,
         "prob_home_cover_mc": mc_p_home_cover,
+        "mc_samples": mc_samples,
+        "mc_method": mc_method,
         "prob_away_cover_analytic": p_away_cover,
         "win_prob_home": p_home_win,
         "win_prob_away": p_away_win,
@@ -210,7 +236,7 @@ def evaluate_market_v2(em_report: Dict[str, Any], market: Dict[str, Any]) -> Dic
     }
 
 def decide_pick_v2(market_report: Dict[str, Any]) -> Dict[str, Any]:
-    edge_threshold_ev = 0.03
+    edge_threshold_ev = EDGE_THRESHOLD_EV
     ev_home = market_report["ev_home_per_$1"]
     ev_away = market_report["ev_away_per_$1"]
     name = "home" if ev_home > ev_away else "away"
@@ -226,26 +252,230 @@ def decide_pick_v2(market_report: Dict[str, Any]) -> Dict[str, Any]:
         "note": "No bet if EV < 0.03 to avoid thin edges."
     }
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--input", required=True, help="Path to input JSON")
-    ap.add_argument("--out", required=True, help="Path to write report JSON")
-    args = ap.parse_args()
+# ------------------------------------------------------------
+# Slate-wide (vectorized) API
+# ------------------------------------------------------------
+# Every *_batch function mirrors its per-game counterpart operation for
+# operation, so element i of the batch output is bit-identical to calling the
+# scalar function on game i.
 
-    with open(args.input, "r") as f:
-        cfg = json.load(f)
+# elementwise math.erf (exact, float output); erf is a tiny share of a slate pass
+_erf = np.vectorize(math.erf, otypes=[float])
+
+def phi_batch(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + _erf(np.asarray(z, dtype=float) / math.sqrt(2.0)))
+
+def american_to_decimal_batch(american: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        return np.where(american <= 0, 1 + 100.0/np.abs(american), 1 + american/100.0)
+
+def kelly_fraction_batch(p: np.ndarray, american: np.ndarray) -> np.ndarray:
+    b = american_to_decimal_batch(american) - 1.0
+    q = 1.0 - p
+    k = np.where(b != 0, (b*p - q) / np.where(b != 0, b, 1.0), 0.0)
+    return np.maximum(0.0, k)
+
+def slate_arrays(cfgs: List[Dict[str, Any]]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Stack per-game configs (the same JSON the CLI takes) into column arrays:
+      {"inputs": {...}, "market": {...}, "coefficients": {...}}
+    """
+    def column(section: str, key: str, default: float) -> np.ndarray:
+        return np.array([float((c.get(section) or {}).get(key, default)) for c in cfgs], dtype=float)
+
+    return {
+        "inputs": {k: column("inputs", k, d) for k, d in INPUT_DEFAULTS.items()},
+        "market": {k: column("market", k, d) for k, d in MARKET_DEFAULTS.items()},
+        "coefficients": {k: column("coefficients", k, d) for k, d in DEFAULT_COEFFICIENTS.items()},
+    }
+
+def compute_expected_margin_batch(inputs: Dict[str, np.ndarray],
+                                  coefficients: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Vectorized compute_expected_margin. `inputs` maps INPUT_DEFAULTS keys to
+    arrays (one entry per game); `coefficients` values may be scalars or arrays.
+    """
+    n = len(next(iter(inputs.values()))) if inputs else 0
+    C = dict(DEFAULT_COEFFICIENTS)
+    C.update(coefficients or {})
+    C = {k: np.broadcast_to(np.asarray(v, dtype=float), (n,)) for k, v in C.items()}
+
+    def col(key: str) -> np.ndarray:
+        return np.broadcast_to(np.asarray(inputs.get(key, INPUT_DEFAULTS[key]), dtype=float), (n,))
+
+    off_home, def_home = col("offense_home"), col("defense_home")
+    off_away, def_away = col("offense_away"), col("defense_away")
+
+    matchup_gap = (off_home - def_away) - (off_away - def_home)
+
+    hfa = col("home_field_points")
+    rest_diff_days = col("rest_diff_days")
+    away_travel_miles = col("away_travel_miles")
+    qb_home_delta = col("qb_home_delta")
+    qb_away_delta = col("qb_away_delta")
+    key_inj_home = col("key_injuries_home")
+    key_inj_away = col("key_injuries_away")
+
+    wind_mph = col("wind_mph")
+    pass_rate_home = np.clip(col("pass_rate_home"), 0.0, 1.0)
+    pass_rate_away = np.clip(col("pass_rate_away"), 0.0, 1.0)
+    pass_rate_diff = (pass_rate_home - pass_rate_away)
+
+    hfa_used = np.where(hfa == 0.0, C["b_hfa"], hfa)
+    rest_points = C["b_rest"] * rest_diff_days
+    travel_points = C["b_travel"] * (away_travel_miles / 500.0)
+    qb_points = C["b_qb"] * (qb_home_delta - qb_away_delta)
+    injury_points = C["b_injury"] * ((-key_inj_home) - (-key_inj_away))
+    weather_points = C["b_weather_margin"] * (wind_mph * pass_rate_diff)
+
+    em = (
+        C["b0"]
+        + C["b_matchup"] * matchup_gap
+        + hfa_used
+        + rest_points
+        + travel_points
+        + qb_points
+        + injury_points
+        + weather_points
+    )
+
+    sigma = C["sigma_spread"].copy()
+    sigma *= (1.0 + C["wind_sigma_step"] * np.maximum(0.0, wind_mph - 10.0))
+    inj_total = np.maximum(0.0, key_inj_home) + np.maximum(0.0, key_inj_away)
+    sigma *= (1.0 + C["inj_sigma_step"] * inj_total)
+
+    n_eff = min(12.0, 1.0 / max(1e-6, (1.0 - RECENCY_LAMBDA)))
+    sigma /= math.sqrt(n_eff/4.0)
+
+    return {
+        "expected_margin_home_minus_away": em,
+        "sigma_spread": sigma,
+        "components": {
+            "matchup_gap": matchup_gap,
+            "hfa_used": hfa_used,
+            "rest_points": rest_points,
+            "travel_points": travel_points,
+            "qb_points": qb_points,
+            "injury_points": injury_points,
+            "weather_points": weather_points,
+        },
+        "coefficients_used": C,
+    }
+
+def evaluate_market_batch(em_batch: Dict[str, Any], market: Dict[str, np.ndarray],
+                          mc_samples: int = None, mc_method: str = None, mc_seeds=None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized evaluate_market_v2 over the arrays from compute_expected_margin_batch.
+    mc_seeds: one seed for the slate or one per game (default MC_SEED, as per game).
+    """
+    em = em_batch["expected_margin_home_minus_away"]
+    sigma = em_batch["sigma_spread"]
+    C = em_batch["coefficients_used"]
+    n = len(em)
+
+    def col(key: str) -> np.ndarray:
+        return np.broadcast_to(np.asarray(market.get(key, MARKET_DEFAULTS[key]), dtype=float), (n,))
+
+    S = col("spread")
+    odds_home = col("odds_home")
+    odds_away = col("odds_away")
+
+    z_home = (em - S) / np.maximum(1e-9, sigma)
+    p_home_cover = phi_batch(z_home)
+    p_away_cover = 1.0 - p_home_cover
+
+    z_home_ml = em / np.maximum(1e-9, sigma)
+    p_home_win = phi_batch(z_home_ml)
+    p_away_win = 1.0 - p_home_win
 
+    ci68 = np.stack([em - 1.0 * sigma, em + 1.0 * sigma], axis=1)
+    ci95 = np.stack([em - 1.96 * sigma, em + 1.96 * sigma], axis=1)
+
+    r2 = np.broadcast_to(np.asarray(C.get("r2_prior", 0.65), dtype=float), (n,))
+    edge_pts = np.abs(em - S)
+    r2 = r2 * (1.0 - np.minimum(0.35, sigma/20.0))
+    r2 = r2 * (0.85 + 0.15 * np.minimum(1.0, edge_pts / 7.0))
+    r2 = np.maximum(0.0, np.minimum(0.95, r2))
+
+    ev_home = p_home_cover * (american_to_decimal_batch(odds_home) - 1.0) - (1.0 - p_home_cover)
+    ev_away = p_away_cover * (american_to_decimal_batch(odds_away) - 1.0) - (1.0 - p_away_cover)
+
+    edge_confidence = np.maximum(0.0, np.minimum(1.0, (np.abs(z_home) / 2.5) * r2))
+
+    k_home = kelly_fraction_batch(p_home_cover, odds_home)
+    k_away = kelly_fraction_batch(p_away_cover, odds_away)
+
+    mc_samples = int(mc_samples or MC_SAMPLES)
+    mc_method = mc_method or MC_METHOD
+    mc_p_home_cover = cover_probability(
+        em, sigma, S, n=mc_samples, method=mc_method, seeds=MC_SEED if mc_seeds is None else mc_seeds
+    )
+
+    return {
+        "market_spread": S,
+        "prob_home_cover_analytic": p_home_cover,
+        "prob_home_cover_mc": mc_p_home_cover,
+        "mc_samples": np.full(n, mc_samples),
+        "mc_method": np.full(n, mc_method),
+        "prob_away_cover_analytic": p_away_cover,
+        "win_prob_home": p_home_win,
+        "win_prob_away": p_away_win,
+        "ev_home_per_$1": ev_home,
+        "ev_away_per_$1": ev_away,
+        "kelly_home": k_home,
+        "kelly_away": k_away,
+        "ci68_margin": ci68,
+        "ci95_margin": ci95,
+        "r2_reliability": r2,
+        "edge_confidence": edge_confidence
+    }
+
+def decide_pick_batch(market_batch: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    ev_home = market_batch["ev_home_per_$1"]
+    ev_away = market_batch["ev_away_per_$1"]
+    home = ev_home > ev_away
+    ev = np.where(home, ev_home, ev_away)
+    prob = np.where(home, market_batch["prob_home_cover_analytic"], market_batch["prob_away_cover_analytic"])
+    kelly = np.where(home, market_batch["kelly_home"], market_batch["kelly_away"])
+    bet = ev >= EDGE_THRESHOLD_EV
+    return {
+        "side": np.where(bet, np.where(home, "home", "away"), "no_bet"),
+        "edge_ev_per_$1": ev,
+        "prob_cover": prob,
+        "recommended_fraction_bankroll_quarter_kelly": np.where(bet, 0.25*kelly, 0.0),
+    }
+
+def _row(batch: Dict[str, Any], i: int) -> Dict[str, Any]:
+    out = {}
+    for k, v in batch.items():
+        if isinstance(v, dict):
+            out[k] = _row(v, i)
+        elif v.ndim > 1:
+            out[k] = [float(x) for x in v[i]]
+        elif v.dtype.kind in "US":
+            out[k] = str(v[i])
+        elif v.dtype.kind in "iu":
+            out[k] = int(v[i])
+        else:
+            out[k] = float(v[i])
+    return out
+
+def _metadata() -> Dict[str, Any]:
+    return {
+        "model": "cfb_spread_model_v2",
+        "version": "2.0.0",
+        "generated_at_utc": __import__("datetime").datetime.utcnow().isoformat() + "Z",
+        "recency_lambda": RECENCY_LAMBDA,
+    }
+
+def build_report(cfg: Dict[str, Any], mc_samples: int = None, mc_method: str = None) -> Dict[str, Any]:
+    """Full single-game report (what the CLI writes). cfg may carry an optional "mc_seed"."""
     em_report = compute_expected_margin(cfg)
     market = cfg.get("market", {})
-    market_report = evaluate_market_v2(em_report, market)
-
-    report = {
-        "metadata": {
-            "model": "cfb_spread_model_v2",
-            "version": "2.0.0",
-            "generated_at_utc": __import__("datetime").datetime.utcnow().isoformat() + "Z",
-            "recency_lambda": RECENCY_LAMBDA,
-        },
+    market_report = evaluate_market_v2(em_report, market, mc_samples, mc_method, cfg.get("mc_seed"))
+
+    return {
+        "metadata": _metadata(),
         "inputs": cfg.get("inputs", {}),
         "coefficients_used": em_report["coefficients_used"],
         "components": em_report["components"],
@@ -255,6 +485,56 @@ def main():
         "recommendation": decide_pick_v2(market_report)
     }
 
+def build_slate_report(cfgs: List[Dict[str, Any]], mc_samples: int = None,
+                       mc_method: str = None) -> List[Dict[str, Any]]:
+    """
+    Price a whole slate in one vectorized pass. Returns one report per game,
+    identical in shape and values to build_report(cfg).
+    """
+    if not cfgs:
+        return []
+    cols = slate_arrays(cfgs)
+    em_batch = compute_expected_margin_batch(cols["inputs"], cols["coefficients"])
+    seeds = np.array([int(c.get("mc_seed", MC_SEED)) for c in cfgs], dtype=np.int64)
+    market_batch = evaluate_market_batch(em_batch, cols["market"], mc_samples, mc_method, seeds)
+    picks = decide_pick_batch(market_batch)
+
+    meta = _metadata()
+    reports = []
+    for i, cfg in enumerate(cfgs):
+        coefficients_used = dict(cfg.get("coefficients") or {})
+        for k, v in DEFAULT_COEFFICIENTS.items():
+            coefficients_used.setdefault(k, v)
+        recommendation = _row(picks, i)
+        recommendation["note"] = "No bet if EV < 0.03 to avoid thin edges."
+        reports.append({
+            "metadata": dict(meta),
+            "inputs": cfg.get("inputs", {}),
+            "coefficients_used": coefficients_used,
+            "components": _row(em_batch["components"], i),
+            "expected_margin_home_minus_away": float(em_batch["expected_margin_home_minus_away"][i]),
+            "sigma_spread": float(em_batch["sigma_spread"][i]),
+            "market_evaluation": _row(market_batch, i),
+            "recommendation": recommendation,
+        })
+    return reports
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", required=True, help="Path to input JSON")
+    ap.add_argument("--out", required=True, help="Path to write report JSON")
+    ap.add_argument("--mc-samples", type=int, default=MC_SAMPLES, help="Monte Carlo draws per game")
+    ap.add_argument("--mc-method", default=MC_METHOD, choices=["pseudo", "antithetic", "sobol"])
+    args = ap.parse_args()
+
+    with open(args.input, "r") as f:
+        cfg = json.load(f)
+
+    if isinstance(cfg, list):
+        report = build_slate_report(cfg, args.mc_samples, args.mc_method)
+    else:
+        report = build_report(cfg, args.mc_samples, args.mc_method)
+
     with open(args.out, "w") as f:
         json.dump(report, f, indent=2)
 
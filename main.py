@@ -1,10 +1,11 @@
 import os
 import time
-from flask import Flask, jsonify, request
+import json
+from flask import Flask, Response, jsonify, request, stream_with_context
 
 # Core modules
 from modules.cfb_data import get_cfbd_team
-from modules.cfb_batch import update_weekly_cache, read_from_cache, get_team_from_cache
+from modules.cfb_batch import update_weekly_cache, read_from_cache, get_team_from_cache, iter_week_records
 
 # New modules
 from modules.weather_openmeteo import get_weather, get_hourly_kickoff_window
@@ -13,14 +14,35 @@ from modules.tempo_plays import get_tempo
 from modules.injuries_scraper import get_injuries
 
 from modules.cfb_matchup import get_team_matchup
-from modules.cfb_lines import get_historical_lines
+from modules.cfb_lines import get_historical_lines, iter_historical_lines
 from modules.cfb_power_ratings import get_massey_ratings
-from modules.odds_history import get_odds_history
+from modules.odds_history import get_odds_history, iter_odds_history
+from modules import odds_store
 
 from modules.massey_scraper import fetch_massey_ratings
+from modules.cache_utils import cache_stats
+from bridges.cfb_to_model import price_slate
+from modules.backtest import BACKTEST_MAX_YEARS, FIRST_SEASON, run_backtest
 
 app = Flask(__name__)
 
+def _flag(name: str) -> bool:
+    return request.args.get(name, "").lower() in ("1", "true", "yes")
+
+def _wants_ndjson() -> bool:
+    return request.args.get("format", "").lower() == "ndjson"
+
+def _ndjson(records):
+    """Stream records as newline-delimited JSON (chunked, one record per line)."""
+    def generate():
+        try:
+            for rec in records:
+                yield json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        except Exception as e:
+            # headers are already out; report the failure in-band as the last line
+            yield json.dumps({"error": f"stream failed: {str(e)}"}) + "\n"
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 # -----------------------------------------------------------
 # ROOT
 # -----------------------------------------------------------
@@ -29,19 +51,24 @@ def home():
     return jsonify({
         "message": "CFB weekly cache service (batch + normalization)",
         "endpoints": {
-            "admin_update": "/admin/cfb/update?year=2025&week=10",
-            "cache_info": "/cfb/cache?year=2025&week=10",
+            "admin_update": "/admin/cfb/update?year=2025&week=10&incremental=1",
+            "cache_info": "/cfb/cache?year=2025&week=10&format=ndjson",
             "team": "/cfb/team?name=Georgia&year=2025&week=10",
             "fetch_team_alias": "/fetch/cfb/team?name=Georgia&year=2025&week=10",
             "weather": "/cfb/weather?lat=33.94&lon=-83.37",
             "weather_hourly": "/cfb/weather/hourly?lat=33.94&lon=-83.37&kickoff=2025-11-01T23:00Z",
-            "odds": "/cfb/odds?year=2025&week=10",
-            "tempo": "/cfb/tempo?team=Georgia",
-            "injuries": "/cfb/injuries?team=georgia",
+            "odds": "/cfb/odds?year=2025&week=10&swr=1",
+            "tempo": "/cfb/tempo?team=Georgia&year=2025&swr=1",
+            "injuries": "/cfb/injuries?team=georgia&swr=1",
             "matchup": "/cfb/matchup?team1=Georgia&team2=Alabama&year=2025",
-            "lines": "/cfb/lines?year=2025&week=10",
+            "lines": "/cfb/lines?year=2025&week=10&format=ndjson",
+            "slate": "/cfb/slate?year=2025&week=10",
+            "backtest": "/cfb/backtest?years=2022,2023,2024",
             "ratings": "/cfb/ratings",
-            "odds_history": "/cfb/odds/history?date=2025-11-01",
+            "odds_history": "/cfb/odds/history?date=2025-11-01&format=ndjson",
+            "odds_movement": "/cfb/odds/movement?home=Ohio State&away=Michigan&market=spreads",
+            "odds_movers": "/cfb/odds/movers?min=2&market=spreads",
+            "cache_stats": "/cache/stats",
             "health": "/health"
         },
         "status": "ok"
@@ -57,7 +84,7 @@ def admin_update():
         week = int(request.args.get("week", 10))
     except ValueError:
         return jsonify({"error": "year/week must be integers"}), 400
-    result = update_weekly_cache(year, week)
+    result = update_weekly_cache(year, week, incremental=_flag("incremental"))
     return jsonify(result)
 
 # -----------------------------------------------------------
@@ -70,6 +97,11 @@ def cache_info():
         week = int(request.args.get("week", 10))
     except ValueError:
         return jsonify({"error": "year/week must be integers"}), 400
+    if _wants_ndjson():
+        records = iter_week_records(year, week)
+        if records is None:
+            return jsonify({"ok": False, "error": "cache_not_found"}), 404
+        return _ndjson(records)
     return jsonify(read_from_cache(year, week))
 
 # -----------------------------------------------------------
@@ -129,7 +161,7 @@ def cfb_odds():
     year = request.args.get("year", 2025)
     week = request.args.get("week", 10)
     try:
-        data = get_odds_totals(week, year)
+        data = get_odds_totals(week, year, swr=_flag("swr"))
         return jsonify(data)
     except Exception as e:
         return jsonify({
@@ -146,7 +178,8 @@ def cfb_tempo():
     if not team:
         return jsonify({"error": "missing ?team="}), 400
     try:
-        data = get_tempo(team)
+        year = int(request.args.get("year", 2025))
+        data = get_tempo(team, year, swr=_flag("swr"))
         return jsonify(data)
     except Exception as e:
         return jsonify({"error": f"tempo fetch failed: {str(e)}"}), 500
@@ -160,7 +193,7 @@ def cfb_injuries():
     if not team:
         return jsonify({"error": "missing ?team="}), 400
     try:
-        data = get_injuries(team)
+        data = get_injuries(team, swr=_flag("swr"))
         return jsonify(data)
     except Exception as e:
         return jsonify({"error": f"injury scrape failed: {str(e)}"}), 500
@@ -188,11 +221,49 @@ def cfb_lines():
     try:
         year = int(request.args.get("year", 2025))
         week = int(request.args.get("week", 10))
+        if _wants_ndjson():
+            return _ndjson(iter_historical_lines(year, week))
         data = get_historical_lines(year, week)
         return jsonify(data)
     except Exception as e:
         return jsonify({"error": f"lines fetch failed: {str(e)}"}), 500
 
+# -----------------------------------------------------------
+# WEEKLY SLATE (inputs for every game + one model pass)
+# -----------------------------------------------------------
+@app.route("/cfb/slate")
+def cfb_slate():
+    try:
+        year = int(request.args.get("year", 2025))
+        week = int(request.args.get("week", 10))
+    except ValueError:
+        return jsonify({"error": "year/week must be integers"}), 400
+    try:
+        return jsonify(price_slate(year, week, offload=_flag("offload")))
+    except Exception as e:
+        return jsonify({"error": f"slate run failed: {str(e)}"}), 500
+
+# -----------------------------------------------------------
+# BACKTEST (past seasons, one pool worker per season)
+# -----------------------------------------------------------
+@app.route("/cfb/backtest")
+def cfb_backtest():
+    try:
+        years = [int(y) for y in request.args.get("years", "2024").split(",") if y.strip()]
+    except ValueError:
+        return jsonify({"error": "years must be a comma-separated list of integers"}), 400
+    if not years:
+        return jsonify({"error": "missing ?years="}), 400
+    last_season = time.gmtime().tm_year
+    if len(set(years)) > BACKTEST_MAX_YEARS:
+        return jsonify({"error": f"at most {BACKTEST_MAX_YEARS} seasons per backtest"}), 400
+    if any(y < FIRST_SEASON or y > last_season for y in years):
+        return jsonify({"error": f"years must be between {FIRST_SEASON} and {last_season}"}), 400
+    try:
+        return jsonify(run_backtest(years, refresh=_flag("refresh")))
+    except Exception as e:
+        return jsonify({"error": f"backtest failed: {str(e)}"}), 500
+
 # -----------------------------------------------------------
 # MASSEY POWER RATINGS (scrape)
 # -----------------------------------------------------------
@@ -210,16 +281,53 @@ def cfb_ratings():
 def cfb_odds_history():
     date = request.args.get("date", "2025-11-01")
     try:
+        if _wants_ndjson():
+            return _ndjson(iter_odds_history(date))
         data = get_odds_history(date)
         return jsonify(data)
     except Exception as e:
         return jsonify({"error": f"odds history fetch failed: {str(e)}"}), 500
 
+# -----------------------------------------------------------
+# LINE MOVEMENT (local odds store, no API calls)
+# -----------------------------------------------------------
+@app.route("/cfb/odds/movement")
+def cfb_odds_movement():
+    game_id = request.args.get("game_id")
+    market = request.args.get("market", "spreads")
+    try:
+        if not game_id:
+            games = odds_store.find_games(request.args.get("home"), request.args.get("away"))
+            if not games:
+                return jsonify({"error": "game_not_in_store"}), 404
+            game_id = max(games, key=lambda g: g.get("commence_time") or "")["game_id"]
+        data = odds_store.line_movement(game_id, market, book=request.args.get("book"))
+        return jsonify(data), (404 if "error" in data else 200)
+    except Exception as e:
+        return jsonify({"error": f"line movement failed: {str(e)}"}), 500
+
+@app.route("/cfb/odds/movers")
+def cfb_odds_movers():
+    market = request.args.get("market", "spreads")
+    since = request.args.get("since")
+    try:
+        rows = odds_store.movers(float(request.args.get("min", 2.0)), market,
+                                 since=odds_store.to_timestamp(since, None))
+        if _wants_ndjson():
+            return _ndjson(rows)
+        return jsonify({"market": market, "count": len(rows), "games": rows})
+    except Exception as e:
+        return jsonify({"error": f"movers query failed: {str(e)}"}), 500
+
 @app.get("/cache/list")
 def list_cache_files():
     files = [f for f in os.listdir("cache") if f.endswith(".json")]
     return {"count": len(files), "files": files}
 
+@app.get("/cache/stats")
+def cache_stats_route():
+    return jsonify(cache_stats())
+
 @app.get("/cache/read")
 def read_cache_file(filename: str):
     path = os.path.join("cache", filename)
@@ -1,7 +1,79 @@
-import httpx, asyncio
+import time
+import asyncio
+import concurrent.futures
+from typing import Any, Dict, List, Optional
+
+from modules.http_client import async_client
 
 async def fetch_async(url, headers=None, params=None):
-    async with httpx.AsyncClient(timeout=10) as client:
+    async with async_client(timeout=10) as client:
         resp = await client.get(url, headers=headers, params=params)
         resp.raise_for_status()
         return resp.json()
+
+# ------------------------------------------------------------
+# Rate limiting
+# ------------------------------------------------------------
+class TokenBucket:
+    """
+    Async token bucket: refills `rate` tokens per second and banks at most
+    `capacity` (the allowed burst). Each request takes one token.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+# ------------------------------------------------------------
+# Concurrent fetch engine
+# ------------------------------------------------------------
+async def fetch_many_async(
+    requests_: List[Dict[str, Any]],
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None,
+    timeout: float = 30,
+) -> List[Any]:
+    """
+    GET every request ({"url", "headers"?, "params"?}) over one pooled client.
+    At most `concurrency` are in flight and, if `rate` is set, no more than
+    `rate` start per second. Results come back in input order; a failed
+    request yields its exception instead of a payload.
+    """
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+    bucket = TokenBucket(rate, burst) if rate else None
+
+    async with async_client(max_connections=max(1, int(concurrency)), timeout=timeout) as client:
+        async def one(req):
+            async with sem:
+                if bucket:
+                    await bucket.acquire()
+                resp = await client.get(req["url"], headers=req.get("headers"), params=req.get("params"))
+                resp.raise_for_status()
+                return resp.json()
+
+        return await asyncio.gather(*(one(r) for r in requests_), return_exceptions=True)
+
+def fetch_many(requests_: List[Dict[str, Any]], **kwargs) -> List[Any]:
+    """Blocking wrapper around fetch_many_async for sync callers (Flask routes, CLI)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_many_async(requests_, **kwargs))
+    # already inside an event loop: run on a helper thread with its own loop
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, fetch_many_async(requests_, **kwargs)).result()
@@ -0,0 +1,361 @@
+# modules/backtest.py
+"""
+Historical backtest of cfb_spread_model_v2.
+
+Ingest: one CFBD /lines call (scores + every book's open/close spread) and one
+/games call (neutral sites) per season, plus that season's SP+ / PPA tables,
+are flattened into a columnar store:
+
+    data/backtest/season_{year}.npy        structured array, one row per game
+    data/backtest/season_{year}.meta.json  year, ts, count, team dictionary
+
+Run: each season is priced in one vectorized model pass on a worker of a
+long-lived (spawned) process pool; the store is memory-mapped there, nothing
+is pickled but the year and the store directory. Bets are placed against the
+consensus opening line, graded against the final score and measured against
+the consensus closing line (CLV).
+
+Inputs follow bridges/cfb_to_model: offense/defense are the median of SP+
+and PPA, home field is 1.2 unless neutral, and sources without history
+(injuries, weather, tempo) take the bridge's defaults. Season-level SP+/PPA
+are end-of-season ratings, so results carry look-ahead and are an upper
+bound on live performance.
+
+CLI:
+    python -m modules.backtest 2022 2023 2024 [--refresh] [--workers 4]
+"""
+import os
+import json
+import time
+import atexit
+import warnings
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import cfb_spread_model_v2 as model
+from modules import cfb_data, cfb_extended
+from modules.cache_utils import atomic_write
+from modules.cfb_lines import get_historical_lines
+from modules.teams import team_key
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STORE_DIR = os.path.join(BASE_DIR, "data", "backtest")
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(os.cpu_count() or 2)))
+BACKTEST_MC_SAMPLES = int(os.getenv("BACKTEST_MC_SAMPLES", "2000"))  # decisions use the analytic prob
+BACKTEST_MAX_YEARS = int(os.getenv("BACKTEST_MAX_YEARS", "12"))  # seasons per request
+FIRST_SEASON = 2000  # oldest season with usable CFBD games and lines
+INGEST_WORKERS = 4  # seasons downloaded at once (each fans out into its own 4 calls)
+CALIBRATION_BINS = 10
+DEFAULT_ODDS = -110.0  # CFBD lines carry spreads, not spread prices
+
+GAME_DTYPE = [
+    ("game_id", "<i8"),
+    ("week", "<i2"),
+    ("home_id", "<i4"),
+    ("away_id", "<i4"),
+    ("home_points", "<f8"),
+    ("away_points", "<f8"),
+    ("neutral", "?"),
+    ("line_open", "<f8"),   # consensus home line at open (-7 = home favoured by 7)
+    ("line_close", "<f8"),  # consensus home line at close
+    ("books", "<i2"),
+    ("offense_home", "<f8"),
+    ("defense_home", "<f8"),
+    ("offense_away", "<f8"),
+    ("defense_away", "<f8"),
+]
+
+
+# ------------------------------------------------------------
+# Store
+# ------------------------------------------------------------
+def _season_path(year: int, store_dir: Optional[str] = None) -> str:
+    return os.path.join(store_dir or STORE_DIR, f"season_{year}.npy")
+
+
+def _meta_path(year: int, store_dir: Optional[str] = None) -> str:
+    return os.path.join(store_dir or STORE_DIR, f"season_{year}.meta.json")
+
+
+def has_season(year: int) -> bool:
+    return os.path.exists(_meta_path(year))
+
+
+def load_season(year: int, store_dir: Optional[str] = None):
+    """(memory-mapped game array, meta) for an ingested season."""
+    with open(_meta_path(year, store_dir), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return np.load(_season_path(year, store_dir), mmap_mode="r"), meta
+
+
+def _field(row: Dict[str, Any], *names, default=None):
+    # CFBD has served both camelCase and snake_case keys
+    for n in names:
+        if row.get(n) is not None:
+            return row[n]
+    return default
+
+
+def _num(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _fetch_neutral(year: int) -> Dict[int, bool]:
+    games = cfb_data.fetch_cfbd("games", {"year": year, "seasonType": "regular"})
+    if isinstance(games, dict):
+        return {}
+    return {int(g["id"]): bool(_field(g, "neutralSite", "neutral_site", default=False))
+            for g in games if g.get("id") is not None}
+
+
+def ingest_season(year: int) -> Dict[str, Any]:
+    """Download one season's games, lines and ratings and write its columnar store."""
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_lines = ex.submit(get_historical_lines, year)
+        f_neutral = ex.submit(_fetch_neutral, year)
+        f_sp = ex.submit(cfb_extended.spplus_index, year)
+        f_ppa = ex.submit(cfb_extended.ppa_index, year)
+        lines, neutral, sp, ppa = f_lines.result(), f_neutral.result(), f_sp.result(), f_ppa.result()
+    if isinstance(lines, dict):
+        raise RuntimeError(f"lines fetch failed for {year}: {lines.get('error')}")
+
+    # only games with a final score and at least one quoted spread
+    games = []
+    for g in lines:
+        hp = _num(_field(g, "homeScore", "home_score"))
+        ap = _num(_field(g, "awayScore", "away_score"))
+        books = g.get("lines") or []
+        if np.isnan(hp) or np.isnan(ap) or not books or g.get("id") is None:
+            continue
+        games.append((g, hp, ap, books))
+
+    n = len(games)
+    width = max([len(b) for *_, b in games] + [1])
+    open_grid = np.full((n, width), np.nan)
+    close_grid = np.full((n, width), np.nan)
+    teams: Dict[str, int] = {}
+    arr = np.zeros(n, dtype=GAME_DTYPE)
+
+    for i, (*_, books) in enumerate(games):
+        for j, b in enumerate(books):
+            close_grid[i, j] = _num(b.get("spread"))
+            open_grid[i, j] = _num(_field(b, "spreadOpen", "spread_open"))
+    arr["game_id"] = [int(g["id"]) for g, *_ in games]
+    arr["week"] = [int(np.nan_to_num(_num(g.get("week")))) for g, *_ in games]
+    arr["home_id"] = [teams.setdefault(_field(g, "homeTeam", "home_team"), len(teams)) for g, *_ in games]
+    arr["away_id"] = [teams.setdefault(_field(g, "awayTeam", "away_team"), len(teams)) for g, *_ in games]
+    arr["home_points"] = [hp for _, hp, _, _ in games]
+    arr["away_points"] = [ap for _, _, ap, _ in games]
+    arr["neutral"] = [neutral.get(int(g["id"]), False) for g, *_ in games]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # games without any open quote
+        arr["line_close"] = np.nanmedian(close_grid, axis=1)
+        line_open = np.nanmedian(open_grid, axis=1)
+    arr["line_open"] = np.where(np.isnan(line_open), arr["line_close"], line_open)
+    arr["books"] = (~np.isnan(close_grid)).sum(axis=1)
+
+    # offense/defense as in the bridge: median of SP+ and PPA (0.0 when neither is known)
+    keys = [team_key(t) for t in teams]
+
+    def team_col(index, field):
+        return np.array([_num(index.get(k, {}).get(field)) for k in keys], dtype=float)
+
+    for unit, col in (("off", "offense"), ("def", "defense")):
+        both = np.stack([team_col(sp, f"sp_{unit}"), team_col(ppa, f"ppa_{unit}")], axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            per_team = np.nan_to_num(np.nanmean(both, axis=1)) if len(keys) else np.zeros(0)
+        arr[f"{col}_home"] = per_team[arr["home_id"]]
+        arr[f"{col}_away"] = per_team[arr["away_id"]]
+
+    arr = arr[~np.isnan(arr["line_close"])]
+    os.makedirs(STORE_DIR, exist_ok=True)
+    with atomic_write(_season_path(year), "wb") as f:
+        np.save(f, arr)
+    meta = {"year": year, "generated_ts": int(time.time()), "count": int(len(arr)), "teams": list(teams)}
+    with atomic_write(_meta_path(year), encoding="utf-8") as f:  # meta last: marks a complete season
+        json.dump(meta, f, ensure_ascii=False)
+    return {"year": year, "count": meta["count"]}
+
+
+# ------------------------------------------------------------
+# Process pool (one per process, reused across runs)
+# ------------------------------------------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server is threaded (see model_service.get_pool)
+            _pool = ProcessPoolExecutor(max_workers=BACKTEST_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+# ------------------------------------------------------------
+# Run (one season per worker)
+# ------------------------------------------------------------
+def _season_results(year: int, mc_samples: int = BACKTEST_MC_SAMPLES,
+                    store_dir: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Price and grade every game of an ingested season in one vectorized pass."""
+    arr, _ = load_season(year, store_dir)
+    n = len(arr)
+    if n == 0:
+        return {"year": np.zeros(0, dtype=np.int32)}
+
+    inputs = {
+        "offense_home": arr["offense_home"],
+        "defense_home": arr["defense_home"],
+        "offense_away": arr["offense_away"],
+        "defense_away": arr["defense_away"],
+        "home_field_points": np.where(arr["neutral"], 0.0, 1.2),
+        "pass_rate_home": np.full(n, 0.52),
+        "pass_rate_away": np.full(n, 0.48),
+    }
+    # the model's spread is the margin the home side must beat: minus the home line
+    s_bet, s_close = -np.asarray(arr["line_open"]), -np.asarray(arr["line_close"])
+    em = model.compute_expected_margin_batch(inputs)
+    market = model.evaluate_market_batch(em, {"spread": s_bet, "odds_home": DEFAULT_ODDS,
+                                              "odds_away": DEFAULT_ODDS}, mc_samples=mc_samples)
+    picks = model.decide_pick_batch(market)
+
+    margin = np.asarray(arr["home_points"]) - np.asarray(arr["away_points"])
+    side = picks["side"]
+    home_bet, away_bet = side == "home", side == "away"
+    home_cover = np.sign(margin - s_bet)  # +1 home covers, -1 away covers, 0 push
+    result = np.where(home_bet, home_cover, np.where(away_bet, -home_cover, 0.0))
+    payout = model.american_to_decimal_batch(np.full(n, DEFAULT_ODDS)) - 1.0
+    profit = np.where(result > 0, payout, np.where(result < 0, -1.0, 0.0)) * (home_bet | away_bet)
+    stake = picks["recommended_fraction_bankroll_quarter_kelly"]
+
+    return {
+        "year": np.full(n, year, dtype=np.int32),
+        "bet": home_bet | away_bet,
+        "result": result,
+        "profit": profit,
+        "stake_kelly": stake,
+        "profit_kelly": profit * stake,
+        "clv": np.where(home_bet, s_close - s_bet, np.where(away_bet, s_bet - s_close, 0.0)),
+        "prob_home_cover": market["prob_home_cover_analytic"],
+        "home_cover": home_cover,
+        "edge_ev": picks["edge_ev_per_$1"],
+    }
+
+
+def _summary(r: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    bet = r["bet"]
+    wins = int(((r["result"] > 0) & bet).sum())
+    losses = int(((r["result"] < 0) & bet).sum())
+    pushes = int(((r["result"] == 0) & bet).sum())
+    bets = int(bet.sum())
+    stake_k = float(r["stake_kelly"][bet].sum())
+
+    # calibration of P(home covers) over every non-push game
+    graded = r["home_cover"] != 0
+    p, y = r["prob_home_cover"][graded], (r["home_cover"][graded] > 0).astype(float)
+    bins = np.minimum((p * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    counts = np.bincount(bins, minlength=CALIBRATION_BINS)
+    pred = np.bincount(bins, weights=p, minlength=CALIBRATION_BINS)
+    obs = np.bincount(bins, weights=y, minlength=CALIBRATION_BINS)
+    calibration = [
+        {"bin": [k / CALIBRATION_BINS, (k + 1) / CALIBRATION_BINS], "games": int(c),
+         "predicted": round(float(pred[k] / c), 4), "observed": round(float(obs[k] / c), 4)}
+        for k, c in enumerate(counts) if c
+    ]
+
+    def ratio(a, b):
+        return round(a / b, 4) if b else None
+
+    return {
+        "games": int(len(bet)),
+        "bets": bets,
+        "wins": wins,
+        "losses": losses,
+        "pushes": pushes,
+        "ats_hit_rate": ratio(wins, wins + losses),
+        "units": round(float(r["profit"].sum()), 3),
+        "roi": ratio(float(r["profit"].sum()), bets),
+        "roi_kelly": ratio(float(r["profit_kelly"].sum()), stake_k),
+        "avg_clv_points": round(float(r["clv"][bet].mean()), 3) if bets else None,
+        "clv_positive_rate": ratio(int((r["clv"][bet] > 0).sum()), bets),
+        "brier": round(float(((p - y) ** 2).mean()), 4) if len(p) else None,
+        "calibration": calibration,
+    }
+
+
+def run_backtest(years: List[int], refresh: bool = False, workers: Optional[int] = None,
+                 mc_samples: int = BACKTEST_MC_SAMPLES) -> Dict[str, Any]:
+    """
+    Backtest several seasons: ingest the missing ones (or all with `refresh`),
+    price each season on its own pool worker, and report ATS hit rate, ROI,
+    CLV and calibration per season and overall.
+    """
+    started = time.perf_counter()
+    years = sorted(set(int(y) for y in years))
+    todo = [y for y in years if refresh or not has_season(y)]
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(len(todo), INGEST_WORKERS)) as ex:
+            list(ex.map(ingest_season, todo))
+    ingest_ms = round((time.perf_counter() - started) * 1000.0, 1)
+
+    workers = max(1, min(len(years), workers or BACKTEST_WORKERS, BACKTEST_WORKERS))
+    if workers == 1:
+        per_season = [_season_results(y, mc_samples) for y in years]
+    else:
+        # at most `workers` seasons in flight on the shared pool
+        pool, results, running = get_pool(), {}, {}
+        for y in years:
+            if len(running) >= workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done:
+                    results[running.pop(f)] = f.result()
+            running[pool.submit(_season_results, y, mc_samples, STORE_DIR)] = y
+        for f in running:
+            results[running[f]] = f.result()
+        per_season = [results[y] for y in years]
+
+    played = [r for r in per_season if len(r["year"])]
+    overall = {k: np.concatenate([r[k] for r in played]) for k in played[0]} if played else {}
+    return {
+        "years": years,
+        "seasons": {str(y): _summary(r) for y, r in zip(years, per_season) if len(r["year"])},
+        "overall": _summary(overall) if overall else {},
+        "meta": {"ingested": todo, "workers": workers, "ingest_ms": ingest_ms,
+                 "total_ms": round((time.perf_counter() - started) * 1000.0, 1)},
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backtest cfb_spread_model_v2 over past seasons.")
+    parser.add_argument("years", type=int, nargs="+")
+    parser.add_argument("--refresh", action="store_true", help="Re-ingest seasons already in the store")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mc-samples", type=int, default=BACKTEST_MC_SAMPLES)
+    args = parser.parse_args()
+
+    print(json.dumps(run_backtest(args.years, args.refresh, args.workers, args.mc_samples), indent=2))
@@ -1,30 +1,249 @@
 import os
 import json
 import time
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: cross-process coalescing falls back to per-process only
+    fcntl = None
 
 CACHE_DIR = "cache"
 CACHE_TTL = 6 * 3600  # 6 hours
+MEMORY_MAX_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "512"))
+# stale-while-revalidate: entries older than the soft TTL are still served (and
+# refreshed in the background) until they reach the hard TTL
+SWR_HARD_TTL = float(os.getenv("CACHE_SWR_HARD_TTL", str(48 * 3600)))
+
+log = logging.getLogger(__name__)
+
+# Tier 1: bounded in-process LRU  name -> (saved_ts, payload)
+# Tier 2: cache/<name>.json on disk (shared between workers, survives restarts)
+_memory: "OrderedDict[str, tuple]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "file_hits": 0, "misses": 0, "evictions": 0, "writes": 0, "write_errors": 0}
 
 def _path(name: str):
     os.makedirs(CACHE_DIR, exist_ok=True)
     return os.path.join(CACHE_DIR, f"{name}.json")
 
-def load_cache(name: str):
+def _bump(counter: str):
+    with _lock:
+        _stats[counter] += 1
+
+def _memory_get(name: str, ttl: float):
+    with _lock:
+        item = _memory.get(name)
+        if item is None:
+            return None
+        if time.time() - item[0] >= ttl:
+            return None
+        _memory.move_to_end(name)
+        _stats["memory_hits"] += 1
+        return item
+
+def _memory_put(name: str, ts: float, payload):
+    with _lock:
+        _memory[name] = (ts, payload)
+        _memory.move_to_end(name)
+        while len(_memory) > MEMORY_MAX_ITEMS:
+            _memory.popitem(last=False)
+            _stats["evictions"] += 1
+
+def load_cache(name: str, ttl: float = CACHE_TTL):
+    item = load_cache_entry(name, ttl)
+    return item[1] if item is not None else None
+
+def load_cache_entry(name: str, ttl: float = CACHE_TTL):
+    """(saved_ts, payload) if the entry is younger than ttl, else None."""
+    item = _memory_get(name, ttl)
+    if item is not None:
+        return item
+
     path = _path(name)
     if not os.path.exists(path):
+        _bump("misses")
         return None
     try:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        if time.time() - data.get("_ts", 0) < CACHE_TTL:
-            return data.get("payload")
-    except Exception:
-        pass
+        ts = data.get("_ts", 0)
+        if time.time() - ts < ttl:
+            # keep the original timestamp so both tiers expire together
+            _memory_put(name, ts, data.get("payload"))
+            _bump("file_hits")
+            return ts, data.get("payload")
+    except Exception as e:
+        log.warning("cache read failed for %s: %s", name, e)
+    _bump("misses")
     return None
 
-def save_cache(name: str, payload):
+@contextmanager
+def atomic_write(path: str, mode: str = "w", **kwargs):
+    """
+    Open a uniquely named temp file next to `path`; it replaces `path` only
+    when the block succeeds. Concurrent writers never share a temp file and
+    readers never see a partial one.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                               prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def save_cache(name: str, payload) -> bool:
+    """Write both tiers. The file is replaced atomically; returns False on I/O failure."""
+    ts = time.time()
+    _memory_put(name, ts, payload)
+
+    try:
+        with atomic_write(_path(name), encoding="utf-8") as f:
+            json.dump({"_ts": ts, "payload": payload}, f, ensure_ascii=False, separators=(",", ":"))
+    except Exception as e:
+        log.warning("cache write failed for %s: %s", name, e)
+        _bump("write_errors")
+        return False
+    _bump("writes")
+    return True
+
+def cache_stats():
+    with _lock:
+        return {**_stats, "memory_items": len(_memory), "memory_max_items": MEMORY_MAX_ITEMS}
+
+def clear_memory_cache():
+    with _lock:
+        _memory.clear()
+
+# ------------------------------------------------------------
+# Single-flight: one upstream fetch per cache key
+# ------------------------------------------------------------
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_inflight = {}
+
+def single_flight(key: str, fn):
+    """
+    Run fn() once per key at a time. Threads that arrive while a call for the
+    same key is running wait for it and share its result (or exception).
+    """
+    with _lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
     try:
-        with open(_path(name), "w", encoding="utf-8") as f:
-            json.dump({"_ts": time.time(), "payload": payload}, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+        flight.result = fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
+@contextmanager
+def _file_lock(name: str):
+    """Exclusive lock on cache/.<name>.lock, shared by every gunicorn worker."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, f".{name}.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+def _is_error(payload) -> bool:
+    return isinstance(payload, dict) and "error" in payload
+
+def _fetch_and_store(name: str, fetch, ttl: float):
+    with _file_lock(name):
+        # another worker may have filled the file while we waited for the lock
+        cached = load_cache(name, ttl)
+        if cached is not None:
+            return cached
+        payload = fetch()
+        if not _is_error(payload):
+            save_cache(name, payload)
+        return payload
+
+def load_or_fetch(name: str, fetch, ttl: float = CACHE_TTL):
+    """
+    Cache-aside read. On a miss only one caller per key (across threads, and
+    across worker processes via a lock file) runs fetch(); the rest wait and
+    reuse its result. Payloads shaped like {"error": ...} are returned but
+    never cached.
+    """
+    cached = load_cache(name, ttl)
+    if cached is not None:
+        return cached
+    return single_flight(name, lambda: _fetch_and_store(name, fetch, ttl))
+
+# ------------------------------------------------------------
+# Stale-while-revalidate
+# ------------------------------------------------------------
+_refresher = ThreadPoolExecutor(max_workers=int(os.getenv("CACHE_REFRESH_WORKERS", "2")),
+                                thread_name_prefix="cache-refresh")
+_refreshing = set()
+
+def refresh_in_background(key: str, fn) -> bool:
+    """Run fn() on the refresh pool unless a refresh for key is already queued."""
+    with _lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+
+    def job():
+        try:
+            single_flight(key, fn)
+        except Exception as e:
+            log.warning("background refresh failed for %s: %s", key, e)
+        finally:
+            with _lock:
+                _refreshing.discard(key)
+
+    _refresher.submit(job)
+    return True
+
+def load_or_fetch_swr(name: str, fetch, soft_ttl: float = CACHE_TTL, hard_ttl: float = SWR_HARD_TTL):
+    """
+    Like load_or_fetch, but an entry past soft_ttl (and under hard_ttl) is
+    served immediately while a background worker refreshes it.
+    Returns (payload, {"age_seconds": ..., "stale": ..., "revalidating": ...}).
+    """
+    item = load_cache_entry(name, max(soft_ttl, hard_ttl))
+    if item is not None:
+        age = time.time() - item[0]
+        if age < soft_ttl:
+            return item[1], {"age_seconds": round(age, 1), "stale": False, "revalidating": False}
+        refresh_in_background(name, lambda: _fetch_and_store(name, fetch, soft_ttl))
+        return item[1], {"age_seconds": round(age, 1), "stale": True, "revalidating": True}
+
+    payload = single_flight(name, lambda: _fetch_and_store(name, fetch, soft_ttl))
+    return payload, {"age_seconds": 0.0, "stale": False, "revalidating": False}
@@ -1,13 +1,26 @@
 # modules/cfb_batch.py
-import os, json, time
-from typing import Dict, Any, List
-import requests
+import os, json, time, hashlib, threading
+from typing import Dict, Any, List, Optional
+from modules import http_client
+import numpy as np
 import pandas as pd
-from modules.normalization import normalize_frame
+from modules.normalization import LeagueBaseline, cfbd_metrics
+from modules.async_adapter import fetch_many
+from modules.cache_utils import atomic_write
+from modules.teams import team_key
 
 CFBD_API_KEY = os.getenv("CFBD_API_KEY", "")
 CFBD_BASE = "https://api.collegefootballdata.com"
 
+# concurrent fetch tuning (stay under the CFBD per-key rate limit)
+CFBD_CONCURRENCY = int(os.getenv("CFBD_CONCURRENCY", "16"))
+CFBD_RATE_PER_SEC = float(os.getenv("CFBD_RATE_PER_SEC", "12"))
+CFBD_BURST = float(os.getenv("CFBD_BURST", "12"))
+# pull the whole season's advanced stats in one call (team omitted)
+CFBD_BULK = os.getenv("CFBD_BULK", "1") not in ("0", "false", "no")
+# incremental updates refetch per-team rows older than this (bulk rows use ETags)
+CFBD_STALE_AFTER = float(os.getenv("CFBD_STALE_AFTER", str(6 * 3600)))
+
 DATA_DIR = os.path.join(os.getcwd(), "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
@@ -20,87 +33,463 @@ def _cfbd_headers():
 def _cache_path(year: int, week: int) -> str:
     return os.path.join(DATA_DIR, f"cfb_{year}_week{week}.json")
 
-def fetch_all_teams_metrics(year: int, week: int) -> pd.DataFrame:
+def _baseline_path(year: int, week: int) -> str:
+    return os.path.join(DATA_DIR, f"cfb_{year}_week{week}.baseline.json")
+
+def _state_path(year: int, week: int) -> str:
+    return os.path.join(DATA_DIR, f"cfb_{year}_week{week}.state.json")
+
+def _metrics_row(team: str, advj) -> Dict[str, Any]:
+    # advj[0] is the season aggregate row
+    return {"team": team, **cfbd_metrics(advj[0] if advj else None)}
+
+def _partition_advanced(data) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split a bulk /stats/season/advanced payload by team in response order
+    (so [0] is the same season row a per-team call returns).
+    """
+    by_team: Dict[str, List[Dict[str, Any]]] = {}
+    for row in data if isinstance(data, list) else []:
+        team = row.get("team")
+        if team:
+            by_team.setdefault(team, []).append(row)
+    return by_team
+
+# a failed per-team call; never hashed or written, so the team stays stale and is retried
+FETCH_FAILED = None
+
+def _fetch_advanced_per_team(year: int, teams: List[str], concurrency: int,
+                             rate_per_sec: float) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+    """{team: advanced rows}; FETCH_FAILED for teams whose call failed (429/5xx/timeout)."""
+    results = fetch_many(
+        [{"url": f"{CFBD_BASE}/stats/season/advanced",
+          "headers": _cfbd_headers(),
+          "params": {"year": year, "team": team}} for team in teams],
+        concurrency=concurrency, rate=rate_per_sec, burst=CFBD_BURST, timeout=30,
+    )
+    return {team: (FETCH_FAILED if isinstance(advj, Exception) else advj) for team, advj in zip(teams, results)}
+
+def _fetch_team_list(year: int, validators: Optional[Dict[str, Any]] = None):
+    data, validators = _conditional_get(f"{CFBD_BASE}/teams/fbs", {"year": year}, validators or {})
+    return (None if data is None else [t["school"] for t in data]), validators
+
+def _fetch_raw(year: int, concurrency: int = CFBD_CONCURRENCY,
+               rate_per_sec: float = CFBD_RATE_PER_SEC, bulk: bool = CFBD_BULK):
+    """
+    (teams, {team: advanced rows}, {team: "bulk" | "team"}, validators).
+    Teams whose per-team call failed are in neither dict.
+    """
+    teams, teams_v = _fetch_team_list(year)
+
+    # offense EPA (proxy using CFBD advanced stats endpoint)
+    by_team, bulk_v = {}, {}
+    if bulk:
+        try:
+            data, bulk_v = _conditional_get(f"{CFBD_BASE}/stats/season/advanced", {"year": year}, {})
+            by_team = _partition_advanced(data)
+        except Exception:
+            by_team = {}
+    source = {team: "bulk" for team in by_team}
+    missing = [team for team in teams if team not in by_team]
+    if missing:
+        fetched = _fetch_advanced_per_team(year, missing, concurrency, rate_per_sec)
+        ok = {team: rows for team, rows in fetched.items() if rows is not FETCH_FAILED}
+        by_team.update(ok)
+        source.update({team: "team" for team in ok})
+    return teams, by_team, source, {"teams": teams_v, "advanced": bulk_v}
+
+def fetch_all_teams_metrics(year: int, week: int,
+                            concurrency: int = CFBD_CONCURRENCY,
+                            rate_per_sec: float = CFBD_RATE_PER_SEC,
+                            bulk: bool = CFBD_BULK) -> pd.DataFrame:
     """
     Example aggregator:
     - pulls team season stats & derives a few simple metrics.
     Replace/extend with the exact CFBD endpoints you prefer.
+    With `bulk`, the season's advanced stats come from a single call and only
+    teams missing from it are fetched one by one. Per-team calls run
+    concurrently (`concurrency` in flight, token-bucket limited to `rate_per_sec`).
     """
-    # 1) Offense/Defense EPA per play (by game or season-to-date)
-    # Here we use /stats/season?year=YYYY&team=... in a batched manner:
-    # Simpler: /teams/fbs?year=YYYY -> list all teams, then per-team calls.
-    # To keep rate-light, we hit team season stats aggregate endpoints.
+    teams, by_team, source, _ = _fetch_raw(year, concurrency, rate_per_sec, bulk)
+    return _metrics_frame([t for t in teams if t in source], by_team)
 
-    # List teams
-    r = requests.get(f"{CFBD_BASE}/teams/fbs?year={year}", headers=_cfbd_headers(), timeout=30)
-    r.raise_for_status()
-    teams = [t["school"] for t in r.json()]
+def _metrics_frame(teams: List[str], by_team: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    rows: List[Dict[str, Any]] = [_metrics_row(team, by_team.get(team, [])) for team in teams]
+    return pd.DataFrame(rows)
 
-    rows: List[Dict[str, Any]] = []
-    for team in teams:
-        # offense EPA (proxy using CFBD advanced stats endpoint)
-        try:
-            adv = requests.get(
-                f"{CFBD_BASE}/stats/season/advanced?year={year}&team={requests.utils.quote(team)}",
-                headers=_cfbd_headers(), timeout=30
-            )
-            adv.raise_for_status()
-            advj = adv.json()
-        except Exception:
-            advj = []
-
-        # pull a single season row if present
-        epa_off = epa_def = sr_off = sr_def = expl = 0.0
-        if advj:
-            row = advj[0]  # season aggregate row
-            # these keys vary by endpoint version; adjust as needed:
-            epa_off = float(row.get("offense", {}).get("successRate", 0))  # as example
-            epa_def = float(row.get("defense", {}).get("successRate", 0))
-            sr_off  = float(row.get("offense", {}).get("successRate", 0))
-            sr_def  = float(row.get("defense", {}).get("successRate", 0))
-            expl    = float(row.get("offense", {}).get("explosiveness", 0))
-
-        rows.append({
-            "team": team,
-            "epa_off": epa_off,
-            "epa_def": epa_def,
-            "success_rate_off": sr_off,
-            "success_rate_def": sr_def,
-            "explosiveness": expl
-        })
-
-        # light throttle for free tier
-        time.sleep(0.08)
-
-    df = pd.DataFrame(rows)
-    return df
-
-def update_weekly_cache(year: int, week: int) -> Dict[str, Any]:
-    df = fetch_all_teams_metrics(year, week)
-    norm = normalize_frame(df)
+def _write_week(year: int, week: int, df: pd.DataFrame,
+                baseline: Optional[LeagueBaseline] = None) -> Dict[str, Any]:
+    # z-scores come from the week's league baseline, which is saved next to the
+    # week file so single-team lookups can score against it without the league
+    if baseline is None:
+        baseline = LeagueBaseline.from_frame(df, year, week)
+    norm = baseline.score_frame(df)
     blob = {
         "year": year,
         "week": week,
         "generated_ts": int(time.time()),
         "count": int(len(norm)),
-        "metrics": norm.to_dict(orient="records")
+        "metrics": norm.astype(object).where(norm.notna(), None).to_dict(orient="records")
     }
-    with open(_cache_path(year, week), "w", encoding="utf-8") as f:
+    path = _cache_path(year, week)
+    with atomic_write(path, encoding="utf-8") as f:  # readers never see a half-written week file
         json.dump(blob, f, ensure_ascii=False)
+    write_week_columns(year, week, norm, blob["generated_ts"])
+    baseline.save(_baseline_path(year, week))
     return {"ok": True, "count": blob["count"], "year": year, "week": week}
 
+def update_weekly_cache(year: int, week: int, incremental: bool = False) -> Dict[str, Any]:
+    """
+    Rebuild the week file. With `incremental`, only stale or changed teams are
+    refetched (see _update_incremental); the first run for a week is always full.
+    """
+    state = _load_state(year, week) if incremental else None
+    if state:
+        return _update_incremental(year, week, state)
+
+    teams, by_team, source, validators = _fetch_raw(year)
+    # teams whose fetch failed are left out of the week and the state, so the
+    # next incremental run sees them as missing and retries them
+    ok = [team for team in teams if team in source]
+    result = _write_week(year, week, _metrics_frame(ok, by_team))
+    now = time.time()
+    _save_state(year, week, {
+        "team_list": teams,
+        "validators": validators,
+        "teams": {team: _team_state(by_team[team], source[team], now) for team in ok},
+    })
+    return {**result, "incremental": False}
+
+# ------------------------------------------------------------
+# Incremental updates
+#   cfb_{year}_week{week}.state.json keeps, per team, the raw advanced rows,
+#   their content hash, when they were fetched and where from (bulk/team),
+#   plus the ETag / Last-Modified validators of the list and bulk calls.
+# ------------------------------------------------------------
+def _content_hash(rows) -> str:
+    return hashlib.sha1(json.dumps(rows, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def _team_state(rows, source: str, fetched_ts: float) -> Dict[str, Any]:
+    return {"hash": _content_hash(rows), "fetched_ts": fetched_ts, "source": source, "raw": rows}
+
+def _load_state(year: int, week: int) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_state_path(year, week), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _save_state(year: int, week: int, state: Dict[str, Any]):
+    with atomic_write(_state_path(year, week), encoding="utf-8") as f:
+        json.dump({"year": year, "week": week, "updated_ts": time.time(), **state},
+                  f, ensure_ascii=False, separators=(",", ":"))
+
+def _conditional_get(url: str, params: Optional[Dict[str, Any]], validators: Dict[str, Any]):
+    """
+    GET with If-None-Match / If-Modified-Since from `validators`.
+    Returns (json, new_validators), or (None, validators) on 304 Not Modified.
+    """
+    headers = dict(_cfbd_headers())
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    r = http_client.get(url, params=params, headers=headers, timeout=60)
+    if r.status_code == 304:
+        return None, validators
+    r.raise_for_status()
+    return r.json(), {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+
+def _update_incremental(year: int, week: int, state: Dict[str, Any],
+                        bulk: bool = CFBD_BULK) -> Dict[str, Any]:
+    now = time.time()
+    prev = state.get("teams", {})
+    validators = dict(state.get("validators") or {})
+
+    fetched_teams, validators["teams"] = _fetch_team_list(year, validators.get("teams"))
+    teams = state.get("team_list", []) if fetched_teams is None else fetched_teams
+
+    # bulk rows: a 304 means every team previously served from bulk is current
+    fresh: Dict[str, List[Dict[str, Any]]] = {}
+    if bulk:
+        try:
+            data, validators["advanced"] = _conditional_get(
+                f"{CFBD_BASE}/stats/season/advanced", {"year": year}, validators.get("advanced") or {})
+            if data is None:
+                fresh = {t: prev[t]["raw"] for t in teams if prev.get(t, {}).get("source") == "bulk"}
+            else:
+                fresh = _partition_advanced(data)
+        except Exception:
+            fresh = {}
+    source = {team: "bulk" for team in fresh}
+
+    # teams outside the bulk payload: refetch only what is missing or stale
+    stale = [t for t in teams if t not in fresh
+             and (t not in prev or prev[t].get("source") == "bulk"
+                  or now - prev[t].get("fetched_ts", 0) > CFBD_STALE_AFTER)]
+    if stale:
+        fetched = _fetch_advanced_per_team(year, stale, CFBD_CONCURRENCY, CFBD_RATE_PER_SEC)
+        ok = {t: rows for t, rows in fetched.items() if rows is not FETCH_FAILED}
+        fresh.update(ok)
+        source.update({t: "team" for t in ok})
+
+    # a failed refetch keeps the team's previous state (and fetched_ts, so it is
+    # still stale next run); a new team that failed is left out until it succeeds
+    team_states, changed = {}, []
+    for team in teams:
+        old = prev.get(team)
+        if team in fresh:
+            ts = _team_state(fresh[team], source[team], now)
+            if old is None or old["hash"] != ts["hash"]:
+                changed.append(team)
+        elif old is not None:
+            ts = old
+        else:
+            continue
+        team_states[team] = ts
+
+    removed = [t for t in prev if t not in team_states]
+    written = bool(changed or removed) or not os.path.exists(_cache_path(year, week))
+    if written:
+        by_team = {team: ts["raw"] for team, ts in team_states.items()}
+        df = _metrics_frame([t for t in teams if t in team_states], by_team)
+        baseline = get_league_baseline(year, week)
+        if baseline is None:
+            baseline = LeagueBaseline.from_frame(df, year, week)
+        else:
+            # move the running league stats by the changed teams only
+            baseline = LeagueBaseline.from_dict(baseline.to_dict())
+            for team in removed:
+                baseline.remove(team)
+            for team in changed:
+                baseline.update(team, _metrics_row(team, by_team[team]))
+        result = _write_week(year, week, df, baseline)
+    else:
+        result = {"ok": True, "count": len(team_states), "year": year, "week": week}
+
+    _save_state(year, week, {"team_list": teams, "validators": validators, "teams": team_states})
+    return {**result, "incremental": True, "written": written,
+            "refetched": len(stale), "changed": changed, "removed": removed}
+
+# ------------------------------------------------------------
+# League baselines (running per-week stats, see normalization.LeagueBaseline)
+# ------------------------------------------------------------
+_BASELINES: Dict[tuple, tuple] = {}  # (year, week) -> (mtime_ns, LeagueBaseline)
+
+def get_league_baseline(year: int, week: Optional[int] = None) -> Optional[LeagueBaseline]:
+    """
+    The saved league baseline for a week (default: the latest cached week of
+    the season), loaded once per file version. None if no week is cached.
+    """
+    if week is None:
+        week = _latest_baseline_week(year)
+        if week is None:
+            return None
+    path = _baseline_path(year, week)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    hit = _BASELINES.get((year, week))
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    try:
+        baseline = LeagueBaseline.load(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    _BASELINES[(year, week)] = (mtime, baseline)
+    return baseline
+
+def _latest_baseline_week(year: int) -> Optional[int]:
+    prefix, suffix = f"cfb_{year}_week", ".baseline.json"
+    weeks = [int(f[len(prefix):-len(suffix)]) for f in os.listdir(DATA_DIR)
+             if f.startswith(prefix) and f.endswith(suffix) and f[len(prefix):-len(suffix)].isdigit()]
+    return max(weeks) if weeks else None
+
+# ------------------------------------------------------------
+# Columnar week files
+#   cfb_{year}_week{week}.{version}.npy  structured array: team_id plus one
+#                                        float64 field per metric (memory-mappable)
+#   cfb_{year}_week{week}.meta.json      year/week/ts, column order, the
+#                                        team_id -> team name dictionary and
+#                                        the name of its .npy
+# Every write gets a new .npy and the .meta.json is replaced last, so a reader
+# always pairs a meta with the array it describes. Missing metrics are NaN in
+# the array and None in rows, as in the JSON week file.
+# ------------------------------------------------------------
+def _columns_path(year: int, week: int, version: Optional[str] = None) -> str:
+    suffix = f".{version}.npy" if version else ".npy"  # unversioned: weeks written before versioning
+    return os.path.join(DATA_DIR, f"cfb_{year}_week{week}{suffix}")
+
+def _meta_path(year: int, week: int) -> str:
+    return os.path.join(DATA_DIR, f"cfb_{year}_week{week}.meta.json")
+
+def write_week_columns(year: int, week: int, norm: pd.DataFrame, generated_ts: int):
+    columns = [c for c in norm.columns if c != "team"]
+    teams = [str(t) for t in norm["team"]]
+    arr = np.empty(len(norm), dtype=[("team_id", "<i4")] + [(c, "<f8") for c in columns])
+    arr["team_id"] = np.arange(len(norm), dtype=np.int32)
+    for c in columns:
+        arr[c] = norm[c].to_numpy(dtype=float)
+
+    meta_path = _meta_path(year, week)
+    old = _read_meta(meta_path)
+    npy = _columns_path(year, week, str(time.time_ns()))
+    with atomic_write(npy, "wb") as f:
+        np.save(f, arr)
+
+    meta = {"year": year, "week": week, "generated_ts": generated_ts,
+            "count": len(teams), "columns": columns, "teams": teams,
+            "data": os.path.basename(npy)}
+    with atomic_write(meta_path, encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # drop the array the previous meta pointed at; readers that already
+    # mapped it keep their view, later ones get the new pair
+    if old is not None:
+        stale = os.path.join(DATA_DIR, old["data"]) if old.get("data") else _columns_path(year, week)
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+def _read_meta(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _cell(v) -> Optional[float]:
+    v = float(v)
+    return None if v != v else v
+
+def read_week_columns(year: int, week: int, columns: Optional[List[str]] = None,
+                      teams: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load selected metric columns (default: all) for a cached week.
+    Without `teams` every column is a zero-copy view into the memory-mapped
+    file; with `teams` (any registry spelling) only those rows are gathered.
+    Returns {"meta": {...}, "team": [...], <column>: np.ndarray, ...}, or None
+    if the week has no columnar pair or the array does not match its meta.
+    """
+    meta_path = _meta_path(year, week)
+    for _ in range(2):  # a concurrent rewrite may remove the array between reads
+        meta = _read_meta(meta_path)
+        if meta is None:
+            return None
+        try:
+            arr = np.load(_columns_path(year, week) if not meta.get("data")
+                          else os.path.join(DATA_DIR, meta["data"]), mmap_mode="r")
+            break
+        except (FileNotFoundError, ValueError):
+            continue
+    else:
+        return None
+    names = meta["teams"]
+    if arr.shape != (len(names),) or not set(meta["columns"]) <= set(arr.dtype.names or ()):
+        return None
+
+    rows = None
+    if teams is not None:
+        wanted = {team_key(t) for t in teams}
+        rows = np.array([i for i, t in enumerate(names) if team_key(t) in wanted], dtype=np.intp)
+
+    out: Dict[str, Any] = {"meta": {k: v for k, v in meta.items() if k not in ("teams", "data")}}
+    ids = arr["team_id"] if rows is None else arr["team_id"][rows]
+    out["team"] = [names[i] for i in ids]
+    for c in columns or meta["columns"]:
+        out[c] = arr[c] if rows is None else arr[c][rows]
+    return out
+
+# ------------------------------------------------------------
+# In-memory weekly store: each week is loaded once per version (keyed on
+# the mtime of its .meta.json, or of the JSON for older weeks) and indexed
+# by teams.team_key.
+# ------------------------------------------------------------
+_WEEK_STORE: Dict[tuple, Dict[str, Any]] = {}
+_WEEK_LOCK = threading.Lock()
+
+def _week_from_columns(year: int, week: int) -> Optional[Dict[str, Any]]:
+    cols = read_week_columns(year, week)
+    if cols is None:
+        return None
+    meta = cols.pop("meta")
+    names = cols.pop("team")
+    fields = meta["columns"]
+    metrics = [
+        {"team": name, **{c: _cell(cols[c][i]) for c in fields}}
+        for i, name in enumerate(names)
+    ]
+    return {"year": meta["year"], "week": meta["week"], "generated_ts": meta["generated_ts"],
+            "count": meta["count"], "metrics": metrics}
+
+def _load_week(year: int, week: int) -> Optional[Dict[str, Any]]:
+    # prefer the columnar pair; fall back to JSON-only weeks written earlier
+    path = _meta_path(year, week)
+    columnar = os.path.exists(path)
+    if not columnar:
+        path = _cache_path(year, week)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _WEEK_STORE.pop((year, week), None)
+        return None
+
+    entry = _WEEK_STORE.get((year, week))
+    if entry is not None and entry["mtime"] == mtime and entry["path"] == path:
+        return entry
+
+    with _WEEK_LOCK:
+        entry = _WEEK_STORE.get((year, week))
+        if entry is not None and entry["mtime"] == mtime and entry["path"] == path:
+            return entry
+        blob = _week_from_columns(year, week) if columnar else None
+        pinned = blob is not None or not columnar
+        if blob is None:
+            # no columnar pair, or one that failed validation: read the JSON
+            # (written before the pair), without pinning it to the meta version
+            try:
+                with open(_cache_path(year, week), "r", encoding="utf-8") as f:
+                    blob = json.load(f)
+            except FileNotFoundError:
+                return None
+        index: Dict[str, Dict[str, Any]] = {}
+        for m in blob.get("metrics") or []:
+            index.setdefault(team_key(m.get("team", "")), m)
+        entry = {"path": path, "mtime": mtime, "blob": blob, "index": index}
+        if pinned:
+            _WEEK_STORE[(year, week)] = entry
+        return entry
+
 def read_from_cache(year: int, week: int) -> Dict[str, Any]:
-    path = _cache_path(year, week)
-    if not os.path.exists(path):
+    entry = _load_week(year, week)
+    if entry is None:
         return {"ok": False, "error": "cache_not_found"}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return entry["blob"]
+
+def iter_week_records(year: int, week: int):
+    """
+    Yield a cached week's team rows one by one. Columnar weeks are read row by
+    row from the memory-mapped file, so no full metrics list is built.
+    Returns None (instead of a generator) when the week is not cached.
+    """
+    cols = read_week_columns(year, week)
+    if cols is not None:
+        meta = cols.pop("meta")
+        names = cols.pop("team")
+        fields = meta["columns"]
+        return ({"team": name, **{c: _cell(cols[c][i]) for c in fields}} for i, name in enumerate(names))
+    entry = _load_week(year, week)
+    if entry is None:
+        return None
+    return iter(entry["blob"].get("metrics", []))
 
 def get_team_from_cache(year: int, week: int, team: str) -> Dict[str, Any]:
-    data = read_from_cache(year, week)
-    if not data or not data.get("metrics"):
+    entry = _load_week(year, week)
+    if entry is None or not entry["blob"].get("metrics"):
         return {"ok": False, "error": "cache_not_found"}
-    team_row = next((m for m in data["metrics"] if m["team"].lower() == team.lower()), None)
+    team_row = entry["index"].get(team_key(team))
     if not team_row:
         return {"ok": False, "error": "team_not_in_cache"}
     return {"ok": True, "team": team_row, "meta": {"year": year, "week": week}}
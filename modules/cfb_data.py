@@ -1,7 +1,9 @@
 import os
-import requests
+from modules import http_client
 import time
-from modules.normalization import preprocess_team_metrics
+from modules.normalization import cfbd_metrics, preprocess_team_metrics
+from modules.cfb_batch import get_league_baseline
+from modules.teams import team_info
 
 CFBD_API_KEY = os.getenv("CFBD_API_KEY")
 
@@ -11,7 +13,7 @@ CFBD_API_KEY = os.getenv("CFBD_API_KEY")
 def fetch_cfbd(endpoint, params=None):
     headers = {"Authorization": f"Bearer {CFBD_API_KEY}"}
     url = f"https://api.collegefootballdata.com/{endpoint}"
-    resp = requests.get(url, headers=headers, params=params or {})
+    resp = http_client.get(url, headers=headers, params=params or {}, timeout=20)
     if resp.status_code != 200:
         return {"error": f"CFBD API error {resp.status_code}", "content": resp.text}
     return resp.json()
@@ -23,37 +25,28 @@ def get_cfbd_team(name, year=2024):
     """
     Fetch team info + basic performance stats from CollegeFootballData API.
     """
-    team_info = fetch_cfbd("teams", {"year": year})
-    if isinstance(team_info, dict) and "error" in team_info:
-        return team_info
-
-    team = next((t for t in team_info if t["school"].lower() == name.lower()), None)
+    # the shared registry resolves any spelling to its CFBD school (no /teams call)
+    team = team_info(name)
     if not team:
         return {"error": "Team not found", "match": None}
 
-    # Get advanced stats
-    adv_stats = fetch_cfbd("stats/season", {"year": year, "team": name})
+    # Get advanced stats (same endpoint and field mapping as the league weeks)
+    adv_stats = fetch_cfbd("stats/season/advanced", {"year": year, "team": team["school"]})
     if isinstance(adv_stats, dict) and "error" in adv_stats:
         return adv_stats
 
     # Simplify and normalize
-    simplified = []
-    for stat in adv_stats:
-        simplified.append({
-            "team": name,
-            "epa_off": stat.get("offense", {}).get("epaPerPlay", 0),
-            "epa_def": stat.get("defense", {}).get("epaPerPlay", 0),
-            "success_rate_off": stat.get("offense", {}).get("successRate", 0),
-            "success_rate_def": stat.get("defense", {}).get("successRate", 0),
-            "explosiveness": stat.get("offense", {}).get("explosiveness", 0),
-        })
+    simplified = [{"team": name, **cfbd_metrics(stat)} for stat in adv_stats]
 
-    normalized = preprocess_team_metrics(simplified)
+    # score against the latest cached league week (no league-wide refetch)
+    baseline = get_league_baseline(year)
+    normalized = preprocess_team_metrics(simplified, baseline)
     return {
         "source": "collegefootballdata",
         "team": name,
         "year": year,
         "timestamp": int(time.time()),
+        "baseline_week": baseline.week if baseline is not None else None,
         "metrics": normalized,
     }
 
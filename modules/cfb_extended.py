@@ -1,28 +1,33 @@
 # modules/cfb_extended.py
 import os
-import requests
+import time
+import threading
+from typing import Any, Dict, List, Tuple
+from modules import http_client
+from modules.cache_utils import single_flight
+from modules.teams import team_key
 import pandas as pd
 
 CFB_API = "https://api.collegefootballdata.com"
 CFB_KEY = os.getenv("CFBD_API_KEY", "")
 
+# season tables are re-downloaded at most once per interval
+RATINGS_TTL = float(os.getenv("RATINGS_TTL", str(6 * 3600)))
+
+SPPLUS_COLUMNS = ["team", "sp_overall", "sp_off", "sp_def"]
+PPA_COLUMNS = ["team", "ppa_off", "ppa_def"]
+
 def _headers():
     return {"Authorization": f"Bearer {CFB_KEY}"} if CFB_KEY else {}
 
-def get_spplus(year: int = 2025) -> pd.DataFrame:
-    """
-    CFBD: /ratings/spplus
-    Returns columns: team, sp_overall, sp_off, sp_def
-    """
+def _fetch_spplus_rows(year: int) -> List[Dict[str, Any]]:
     url = f"{CFB_API}/ratings/spplus"
-    r = requests.get(url, headers=_headers(), params={"year": year}, timeout=20)
+    r = http_client.get(url, headers=_headers(), params={"year": year}, timeout=20)
     r.raise_for_status()
     data = r.json()
-    if not data:
-        return pd.DataFrame(columns=["team", "sp_overall", "sp_off", "sp_def"])
 
     rows = []
-    for row in data:
+    for row in data or []:
         team = row.get("team")
         off = row.get("offense", {})
         deff = row.get("defense", {})
@@ -32,23 +37,16 @@ def get_spplus(year: int = 2025) -> pd.DataFrame:
             "sp_off": off.get("rating", None),
             "sp_def": deff.get("rating", None),
         })
-    df = pd.DataFrame(rows)
-    return df
+    return rows
 
-def get_ppa(year: int = 2025) -> pd.DataFrame:
-    """
-    CFBD: /ppa/teams
-    Returns columns: team, ppa_off, ppa_def
-    """
+def _fetch_ppa_rows(year: int) -> List[Dict[str, Any]]:
     url = f"{CFB_API}/ppa/teams"
-    r = requests.get(url, headers=_headers(), params={"year": year}, timeout=20)
+    r = http_client.get(url, headers=_headers(), params={"year": year}, timeout=20)
     r.raise_for_status()
     data = r.json()
-    if not data:
-        return pd.DataFrame(columns=["team", "ppa_off", "ppa_def"])
 
     rows = []
-    for row in data:
+    for row in data or []:
         team = row.get("team")
         o = row.get("offense", {}) or {}
         d = row.get("defense", {}) or {}
@@ -57,8 +55,75 @@ def get_ppa(year: int = 2025) -> pd.DataFrame:
             "ppa_off": o.get("overall", None),
             "ppa_def": d.get("overall", None),
         })
-    df = pd.DataFrame(rows)
-    return df
+    return rows
+
+# ------------------------------------------------------------
+# Season ratings store: (table, year) -> rows + team-key index
+# ------------------------------------------------------------
+_FETCHERS = {"spplus": _fetch_spplus_rows, "ppa": _fetch_ppa_rows}
+_RATINGS: Dict[Tuple[str, int], Dict[str, Any]] = {}
+_RATINGS_LOCK = threading.Lock()
+
+def _ratings_table(table: str, year: int) -> Dict[str, Any]:
+    key = (table, int(year))
+    entry = _RATINGS.get(key)
+    if entry is not None and time.time() - entry["fetched_at"] < RATINGS_TTL:
+        return entry
+
+    def load():
+        rows = _FETCHERS[table](year)
+        index: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            index.setdefault(team_key(row.get("team")), row)
+        fresh = {"fetched_at": time.time(), "rows": rows, "index": index}
+        with _RATINGS_LOCK:
+            _RATINGS[key] = fresh
+        return fresh
+
+    # concurrent callers (e.g. a whole slate) share one download
+    return single_flight(f"ratings_{table}_{year}", load)
+
+def spplus_index(year: int = 2025) -> Dict[str, Dict[str, Any]]:
+    """SP+ rows keyed by team_key(team)."""
+    return _ratings_table("spplus", year)["index"]
+
+def ppa_index(year: int = 2025) -> Dict[str, Dict[str, Any]]:
+    """PPA rows keyed by team_key(team)."""
+    return _ratings_table("ppa", year)["index"]
+
+def get_team_ratings(team: str, year: int = 2025) -> Dict[str, Any]:
+    """O(1) SP+ / PPA offense-defense lookup for one team (None where missing)."""
+    k = team_key(team)
+    sp = spplus_index(year).get(k, {})
+    ppa = ppa_index(year).get(k, {})
+    return {
+        "team": team,
+        "sp_overall": sp.get("sp_overall"),
+        "sp_off": sp.get("sp_off"),
+        "sp_def": sp.get("sp_def"),
+        "ppa_off": ppa.get("ppa_off"),
+        "ppa_def": ppa.get("ppa_def"),
+    }
+
+def get_spplus(year: int = 2025) -> pd.DataFrame:
+    """
+    CFBD: /ratings/spplus
+    Returns columns: team, sp_overall, sp_off, sp_def
+    """
+    rows = _ratings_table("spplus", year)["rows"]
+    if not rows:
+        return pd.DataFrame(columns=SPPLUS_COLUMNS)
+    return pd.DataFrame(rows)
+
+def get_ppa(year: int = 2025) -> pd.DataFrame:
+    """
+    CFBD: /ppa/teams
+    Returns columns: team, ppa_off, ppa_def
+    """
+    rows = _ratings_table("ppa", year)["rows"]
+    if not rows:
+        return pd.DataFrame(columns=PPA_COLUMNS)
+    return pd.DataFrame(rows)
 
 def merge_extended_metrics(base_df: pd.DataFrame, year: int = 2025) -> pd.DataFrame:
     """
@@ -73,10 +138,10 @@ def merge_extended_metrics(base_df: pd.DataFrame, year: int = 2025) -> pd.DataFr
     ppa = get_ppa(year)
 
     out = base_df.copy()
-    # normalize team keys just once for robust merges
-    out["_k"] = out["team"].str.lower().str.strip()
-    sp["_k"] = sp["team"].str.lower().str.strip()
-    ppa["_k"] = ppa["team"].str.lower().str.strip()
+    # resolve every spelling to the canonical team once for robust merges
+    out["_k"] = out["team"].map(team_key)
+    sp["_k"] = sp["team"].map(team_key)
+    ppa["_k"] = ppa["team"].map(team_key)
 
     out = out.merge(sp.drop(columns=["team"]), on="_k", how="left")
     out = out.merge(ppa.drop(columns=["team"]), on="_k", how="left")
@@ -1,10 +1,22 @@
-import requests, os
+import os
+from modules import http_client
 
 CFBD_API_KEY = os.getenv("CFBD_API_KEY")
 BASE_URL = "https://api.collegefootballdata.com"
 
-def get_historical_lines(year: int, week: int):
-    url = f"{BASE_URL}/lines?year={year}&week={week}"
+def get_historical_lines(year: int, week: int = None):
+    """CFBD /lines for one week, or for the whole season when week is None."""
+    url = f"{BASE_URL}/lines?year={year}" + (f"&week={week}" if week is not None else "")
     headers = {"Authorization": f"Bearer {CFBD_API_KEY}"}
-    resp = requests.get(url, headers=headers, timeout=10)
+    resp = http_client.get(url, headers=headers, timeout=10 if week is not None else 60)
     return resp.json() if resp.ok else {"error": resp.text}
+
+def iter_historical_lines(year: int, week: int):
+    """Stream /lines game by game (no full-body parse); yields {"error": ...} on a bad status."""
+    url = f"{BASE_URL}/lines?year={year}&week={week}"
+    headers = {"Authorization": f"Bearer {CFBD_API_KEY}"}
+    with http_client.get(url, headers=headers, timeout=10, stream=True) as resp:
+        if not resp.ok:
+            yield {"error": resp.text}
+            return
+        yield from http_client.iter_json_array(resp)
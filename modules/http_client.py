@@ -0,0 +1,238 @@
+# modules/http_client.py
+"""
+Shared upstream HTTP layer used by every scraper module.
+
+- sync: one requests.Session per upstream host, with a keep-alive connection
+  pool, retry + exponential backoff on 429/5xx (honouring Retry-After) and a
+  default timeout, so no call can hang forever.
+- streaming: iter_json_array() yields the elements of a JSON array response
+  one at a time while the body is still downloading.
+- async: async_client() builds an httpx.AsyncClient with the same defaults
+  (including the 429/5xx retry schedule) and HTTP/2 turned on when the
+  optional `h2` package is installed.
+- override: with UPSTREAM_OVERRIDE=http://127.0.0.1:8765 every upstream URL
+  is rewritten to <override>/<original host><path>, so one local server
+  (bench/fake_upstream.py) can stand in for every upstream.
+"""
+import os
+import json
+import time
+import codecs
+import asyncio
+import threading
+import importlib.util
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "15"))
+POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "32"))
+RETRIES = int(os.getenv("UPSTREAM_RETRIES", "3"))
+BACKOFF = float(os.getenv("UPSTREAM_BACKOFF", "0.5"))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+BACKOFF_MAX = 120.0  # urllib3 Retry's cap on a single backoff sleep
+UPSTREAM_OVERRIDE = os.getenv("UPSTREAM_OVERRIDE", "").rstrip("/")
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _new_session() -> requests.Session:
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def rewrite_url(url: str) -> str:
+    """`url` routed through UPSTREAM_OVERRIDE (unchanged when no override is set)."""
+    if not UPSTREAM_OVERRIDE or url.startswith(UPSTREAM_OVERRIDE):
+        return url
+    parts = urlsplit(url)
+    rest = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{UPSTREAM_OVERRIDE}/{parts.netloc}{rest}"
+
+
+def session_for(url: str) -> requests.Session:
+    """Keep-alive session for the URL's host (created on first use)."""
+    host = urlsplit(url).netloc
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = _sessions[host] = _new_session()
+        return s
+
+
+def get(url: str, params=None, headers=None, timeout=None, **kwargs) -> requests.Response:
+    """Drop-in for requests.get over the pooled per-host session."""
+    url = rewrite_url(url)
+    return session_for(url).get(
+        url, params=params, headers=headers,
+        timeout=DEFAULT_TIMEOUT if timeout is None else timeout, **kwargs
+    )
+
+
+def iter_json_array(resp: requests.Response, key: str = None, chunk_size: int = 64 * 1024):
+    """
+    Yield the elements of a top-level JSON array (or of the array under
+    top-level `key`) from a stream=True response, decoding each element as
+    soon as its bytes have arrived. Memory stays bounded by one element plus
+    one chunk.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    chunks = resp.iter_content(chunk_size=chunk_size)
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        try:
+            buf = buf[pos:] + text.decode(next(chunks))
+        except StopIteration:
+            buf, eof = buf[pos:] + text.decode(b"", final=True), True
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    # advance to the opening bracket
+    marker = "[" if key is None else f'"{key}"'
+    while True:
+        i = buf.find(marker, pos)
+        if i >= 0:
+            pos = i + len(marker)
+            break
+        if eof:
+            return
+        pos = max(pos, len(buf) - len(marker))
+        fill()
+    if key is not None:
+        while True:
+            skip_ws()
+            if pos >= len(buf):
+                return
+            if buf[pos] in ":[":
+                pos += 1
+                if buf[pos - 1] == "[":
+                    break
+            else:
+                return
+
+    while True:
+        skip_ws()
+        if pos >= len(buf) or buf[pos] == "]":
+            return
+        if buf[pos] == ",":
+            pos += 1
+            continue
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        # a bare number/literal cut at the buffer edge would decode short
+        if end >= len(buf) and not eof:
+            fill()
+            continue
+        pos = end
+        yield value
+
+
+class _RewriteTransport(httpx.AsyncBaseTransport):
+    """Sends every request to rewrite_url(request.url)."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = httpx.URL(rewrite_url(str(request.url)))
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def _retry_after(resp: httpx.Response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), else None."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _StatusRetryTransport(httpx.AsyncBaseTransport):
+    """
+    Retries GET/HEAD answered with RETRY_STATUS, like the sync sessions'
+    urllib3 Retry: up to RETRIES times, sleeping for Retry-After when the
+    upstream sends one, else BACKOFF * 2 ** (n - 1) (none before the first retry).
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(RETRIES + 1):
+            resp = await self.inner.handle_async_request(request)
+            if (attempt == RETRIES or resp.status_code not in RETRY_STATUS
+                    or request.method not in ("GET", "HEAD")):
+                return resp
+            delay = _retry_after(resp)
+            if delay is None:
+                delay = 0.0 if attempt == 0 else min(BACKOFF_MAX, BACKOFF * 2 ** attempt)
+            await resp.aclose()
+            await asyncio.sleep(delay)
+        return resp
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def async_client(max_connections: int = POOL_SIZE, timeout: float = None) -> httpx.AsyncClient:
+    """Pooled async client (HTTP/2 when available); retries connection failures and 429/5xx."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    transport = httpx.AsyncHTTPTransport(retries=RETRIES, http2=HTTP2, limits=limits)
+    if UPSTREAM_OVERRIDE:
+        transport = _RewriteTransport(transport)
+    transport = _StatusRetryTransport(transport)
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=DEFAULT_TIMEOUT if timeout is None else timeout,
+    )
+
+
+def close_all():
+    with _lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
@@ -1,24 +1,77 @@
 import os
-import requests
+import time
+from modules import http_client
 from bs4 import BeautifulSoup
-from modules.cache_utils import load_cache, save_cache  # new shared cache utility
+from modules.cache_utils import load_or_fetch, load_or_fetch_swr, CACHE_TTL  # shared cache + single-flight
+from modules.teams import team_key, espn_slug
 
 CFB_API = "https://api.collegefootballdata.com"
 CFB_KEY = os.getenv("CFBD_API_KEY", "")
 
+INJURIES_SOFT_TTL = CACHE_TTL
+INJURIES_HARD_TTL = 24 * 3600  # injury news goes stale fast; never serve older than a day
 
-def get_injuries(team_name: str):
+# CFBD's /injuries is league-wide: one download, partitioned by team, cached as one entry
+LEAGUE_CACHE_KEY = "injuries_league"
+# after an ESPN 403, skip ESPN and answer from the league index for this long
+ESPN_BLOCK_TTL = 3600
+_espn_blocked_until = 0.0
+
+
+def _fetch_league_index():
+    # failures come back as {"error": ...} (never cached) so every caller,
+    # including the ESPN-blocked path, degrades to an error payload
+    try:
+        cfb_headers = {"Authorization": f"Bearer {CFB_KEY}"} if CFB_KEY else {}
+        r = http_client.get(f"{CFB_API}/injuries", headers=cfb_headers, timeout=10)
+        r.raise_for_status()
+
+        index = {}
+        for inj in r.json():
+            index.setdefault(team_key(inj.get("team", "")), []).append(inj)
+        return index
+    except Exception as e:
+        return {"error": f"injury fetch failed: {str(e)}"}
+
+
+def get_league_injuries():
+    """All CFBD injuries keyed by teams.team_key (one fetch per cache TTL)."""
+    return load_or_fetch(LEAGUE_CACHE_KEY, _fetch_league_index)
+
+
+def _league_entry(index, team_name: str):
+    if "error" in index:
+        return index
+    filtered = index.get(team_key(team_name))
+    return filtered if filtered else {"message": f"no injuries found for {team_name}"}
+
+
+def get_injuries(team_name: str, swr: bool = False):
     """
     Attempt ESPN scrape; if forbidden or fails, fallback to CFBD injuries API.
-    Uses 6-hour caching to minimize redundant fetches.
+    Uses 6-hour caching to minimize redundant fetches; concurrent misses for
+    the same team share a single upstream fetch.
+    With swr=True a stale entry is served at once and refreshed in the
+    background; the result is wrapped as {"data", "age_seconds", "stale", ...}.
+    While ESPN is blocking us, answers come straight from the league index.
     """
+    if time.time() < _espn_blocked_until:
+        if swr:
+            index, meta = load_or_fetch_swr(LEAGUE_CACHE_KEY, _fetch_league_index,
+                                            INJURIES_SOFT_TTL, INJURIES_HARD_TTL)
+            return {"data": _league_entry(index, team_name), **meta}
+        return _league_entry(get_league_injuries(), team_name)
+
+    cache_key = f"injuries_{team_key(team_name)}"
+    if swr:
+        data, meta = load_or_fetch_swr(cache_key, lambda: _fetch_injuries(team_name),
+                                       INJURIES_SOFT_TTL, INJURIES_HARD_TTL)
+        return {"data": data, **meta}
+    return load_or_fetch(cache_key, lambda: _fetch_injuries(team_name))
 
-    cache_key = f"injuries_{team_name.lower()}"
-    cached = load_cache(cache_key)
-    if cached:
-        return cached
 
-    team_url = team_name.lower().replace(" ", "-")
+def _fetch_injuries(team_name: str):
+    team_url = espn_slug(team_name)
     headers = {
         "User-Agent": (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -30,18 +83,12 @@ def get_injuries(team_name: str):
     espn_url = f"https://www.espn.com/college-football/team/injuries/_/name/{team_url}"
 
     try:
-        resp = requests.get(espn_url, headers=headers, timeout=10)
+        resp = http_client.get(espn_url, headers=headers, timeout=10)
         # --- fallback if blocked or 403 forbidden
         if resp.status_code == 403:
-            cfb_headers = {"Authorization": f"Bearer {CFB_KEY}"} if CFB_KEY else {}
-            r2 = requests.get(f"{CFB_API}/injuries", headers=cfb_headers, timeout=10)
-            r2.raise_for_status()
-            data = r2.json()
-
-            filtered = [inj for inj in data if inj.get("team", "").lower() == team_name.lower()]
-            result = filtered if filtered else {"message": f"no injuries found for {team_name}"}
-            save_cache(cache_key, result)
-            return result
+            global _espn_blocked_until
+            _espn_blocked_until = time.time() + ESPN_BLOCK_TTL
+            return _league_entry(get_league_injuries(), team_name)
 
         resp.raise_for_status()
         soup = BeautifulSoup(resp.text, "lxml")
@@ -58,11 +105,8 @@ def get_injuries(team_name: str):
                     injuries.append({"player": player, "status": status})
 
         if not injuries:
-            result = {"message": f"no active injuries found for {team_name}"}
-            save_cache(cache_key, result)
-            return result
+            return {"message": f"no active injuries found for {team_name}"}
 
-        save_cache(cache_key, injuries)
         return injuries
 
     except Exception as e:
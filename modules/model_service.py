@@ -0,0 +1,87 @@
+# modules/model_service.py
+"""
+In-process execution of cfb_spread_model_v2.
+
+The model is imported once per process and called directly
+(compute_expected_margin -> evaluate_market_v2 -> decide_pick_v2), so there is
+no interpreter start-up and no temp-file round trip. Every call works on its
+own deep copy of the input, which keeps concurrent requests independent.
+
+CPU-heavy work (big slates, large Monte Carlo sample counts) can be sent to a
+warm process pool with offload=True.
+"""
+import os
+import copy
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List
+
+import cfb_spread_model_v2 as model
+
+POOL_WORKERS = int(os.getenv("MODEL_POOL_WORKERS", "2"))
+POOL_TIMEOUT = float(os.getenv("MODEL_POOL_TIMEOUT", "60"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# ------------------------------------------------------------
+# Process pool
+# ------------------------------------------------------------
+def _warm_worker():
+    """Pool initializer: import the model and build the default MC draws once."""
+    model.build_report({"inputs": {}, "market": {}})
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: forking a threaded server copies held locks and
+            # live connections into the workers
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, initializer=_warm_worker,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+# ------------------------------------------------------------
+# Execution
+# ------------------------------------------------------------
+def _run(cfg: Dict[str, Any], mc_samples: int = None, mc_method: str = None) -> Dict[str, Any]:
+    return model.build_report(copy.deepcopy(cfg), mc_samples, mc_method)
+
+
+def _run_slate(cfgs: List[Dict[str, Any]], mc_samples: int = None, mc_method: str = None) -> List[Dict[str, Any]]:
+    return model.build_slate_report(copy.deepcopy(cfgs), mc_samples, mc_method)
+
+
+def run_model(cfg: Dict[str, Any], mc_samples: int = None, mc_method: str = None,
+              offload: bool = False) -> Dict[str, Any]:
+    """
+    Price one game. `cfg` is the bridge output ({"inputs": ..., "market": ...}).
+    Returns the same report the CLI writes.
+    """
+    if offload:
+        return get_pool().submit(_run, cfg, mc_samples, mc_method).result(timeout=POOL_TIMEOUT)
+    return _run(cfg, mc_samples, mc_method)
+
+
+def run_slate(cfgs: List[Dict[str, Any]], mc_samples: int = None, mc_method: str = None,
+              offload: bool = False) -> List[Dict[str, Any]]:
+    """Price a list of games in one vectorized pass (see build_slate_report)."""
+    if offload:
+        return get_pool().submit(_run_slate, cfgs, mc_samples, mc_method).result(timeout=POOL_TIMEOUT)
+    return _run_slate(cfgs, mc_samples, mc_method)
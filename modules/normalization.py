@@ -1,7 +1,13 @@
 # modules/normalization.py
+import json
+from typing import Dict, List, Optional
+
 import numpy as np
 import pandas as pd
 
+from modules.cache_utils import atomic_write
+from modules.teams import team_key
+
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
@@ -13,54 +19,197 @@ METRIC_COLS = [
     "explosiveness",
 ]
 
+# Where each metric lives in a CFBD /stats/season/advanced row: (side, field).
+# CFBD reports EPA per play as "ppa". Every producer of METRIC_COLS rows
+# (cfb_batch league weeks, cfb_data single-team lookups) maps through this, so
+# single teams are z-scored against a baseline of the same quantities.
+CFBD_METRIC_FIELDS = {
+    "epa_off": ("offense", "ppa"),
+    "epa_def": ("defense", "ppa"),
+    "success_rate_off": ("offense", "successRate"),
+    "success_rate_def": ("defense", "successRate"),
+    "explosiveness": ("offense", "explosiveness"),
+}
+
+# Composite score weights (tune as needed)
+# Offense ↑ good, defense ↓ good (inverted)
+COMPOSITE_WEIGHTS = {
+    "epa_off": 0.30,
+    "success_rate_off": 0.30,
+    "explosiveness": 0.10,
+    "epa_def": -0.20,
+    "success_rate_def": -0.10,
+}
+
 # ------------------------------------------------------------
 # CORE NORMALIZATION FUNCTIONS
 # ------------------------------------------------------------
 
-def _zscore(series: pd.Series) -> pd.Series:
-    """Safe z-score computation avoiding divide-by-zero errors."""
-    mu = series.mean()
-    sd = series.std(ddof=0)
-    return (series - mu) / (sd if sd and sd > 0 else 1.0)
+def cfbd_metrics(row: Optional[Dict]) -> Dict[str, float]:
+    """METRIC_COLS values from one CFBD advanced season row (0.0 where missing)."""
+    out = {}
+    for col, (side, field) in CFBD_METRIC_FIELDS.items():
+        value = ((row or {}).get(side) or {}).get(field)
+        try:
+            out[col] = float(value) if value is not None else 0.0
+        except (TypeError, ValueError):
+            out[col] = 0.0
+    return out
+
+
+def _numeric(df: pd.DataFrame) -> pd.DataFrame:
+    # Ensure numeric + fill missing with 0 for weekly consistency
+    df = df.copy()
+    for col in METRIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0) if col in df else 0.0
+    return df
 
 
 def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
     """
     Input: df with columns ['team', METRIC_COLS...]
     Output: DataFrame with *_z columns (z-scores) and composite_score.
+    Z-scores are across all teams in df (see LeagueBaseline.from_frame).
     """
-    df = df.copy()
+    return LeagueBaseline.from_frame(df).score_frame(df)
 
-    # Ensure numeric + fill missing with 0 for weekly consistency
-    for col in METRIC_COLS:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
 
-    # Z-scores across all teams
-    for col in METRIC_COLS:
-        df[f"{col}_z"] = _zscore(df[col])
-
-    # Composite score weights (tune as needed)
-    # Offense ↑ good, defense ↓ good (inverted)
-    df["composite_score"] = (
-        0.30 * df["epa_off_z"]
-        + 0.30 * df["success_rate_off_z"]
-        + 0.10 * df["explosiveness_z"]
-        + 0.20 * (-df["epa_def_z"])
-        + 0.10 * (-df["success_rate_def_z"])
-    )
-
-    # Keep clean, sorted structure
-    keep = ["team", "composite_score"] + [f"{c}_z" for c in METRIC_COLS]
-    return df[keep].sort_values("composite_score", ascending=False).reset_index(drop=True)
+# ------------------------------------------------------------
+# LEAGUE BASELINE (running per-week statistics)
+# ------------------------------------------------------------
+class LeagueBaseline:
+    """
+    Running league mean / variance of METRIC_COLS (Welford), plus each team's
+    current row so a team can be replaced or removed in O(1) without
+    rescanning the league. z-scores use the population std (ddof=0), the same
+    as normalize_frame.
+    """
+
+    def __init__(self, year: Optional[int] = None, week: Optional[int] = None):
+        self.year = year
+        self.week = week
+        self.n = 0
+        self.mean = np.zeros(len(METRIC_COLS))
+        self.m2 = np.zeros(len(METRIC_COLS))
+        self.rows: Dict[str, np.ndarray] = {}
+
+    # --- construction -------------------------------------------------
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, year: Optional[int] = None,
+                   week: Optional[int] = None) -> "LeagueBaseline":
+        """Seed from a full league frame in one vectorized pass."""
+        base = cls(year, week)
+        df = _numeric(df)
+        values = df[METRIC_COLS].to_numpy(dtype=float)
+        if len(values):
+            base.n = len(values)
+            base.mean = values.mean(axis=0)
+            base.m2 = ((values - base.mean) ** 2).sum(axis=0)
+        if "team" in df:
+            base.rows = {_key(t): v.copy() for t, v in zip(df["team"], values)}
+        return base
+
+    # --- incremental updates -----------------------------------------
+    def add(self, team: str, row: Dict) -> None:
+        x = _vector(row)
+        self.remove(team)
+        self.n += 1
+        delta = x - self.mean
+        self.mean = self.mean + delta / self.n
+        self.m2 = self.m2 + delta * (x - self.mean)
+        self.rows[_key(team)] = x
+
+    update = add  # replacing a team's row is remove + add
+
+    def remove(self, team: str) -> None:
+        x = self.rows.pop(_key(team), None)
+        if x is None:
+            return
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, np.zeros(len(METRIC_COLS)), np.zeros(len(METRIC_COLS))
+            return
+        delta = x - self.mean
+        self.n -= 1
+        self.mean = self.mean - delta / self.n
+        self.m2 = np.maximum(self.m2 - delta * (x - self.mean), 0.0)
+
+    # --- scoring -------------------------------------------------------
+    @property
+    def std(self) -> np.ndarray:
+        sd = np.sqrt(self.m2 / self.n) if self.n else np.zeros(len(METRIC_COLS))
+        return np.where(sd > 0, sd, 1.0)
+
+    def score_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """normalize_frame's output for the rows of df, scored against this baseline."""
+        df = _numeric(df)
+        z = (df[METRIC_COLS].to_numpy(dtype=float) - self.mean) / self.std
+        for i, col in enumerate(METRIC_COLS):
+            df[f"{col}_z"] = z[:, i]
+        weights = np.array([COMPOSITE_WEIGHTS.get(c, 0.0) for c in METRIC_COLS])
+        df["composite_score"] = z @ weights
+
+        # Keep clean, sorted structure
+        keep = ["team", "composite_score"] + [f"{c}_z" for c in METRIC_COLS]
+        return df[keep].sort_values("composite_score", ascending=False).reset_index(drop=True)
+
+    def score(self, rows: List[Dict]) -> List[Dict]:
+        """z-score a few teams' raw rows against the league (no league rescan)."""
+        if not rows:
+            return []
+        return self.score_frame(pd.DataFrame(rows)).to_dict(orient="records")
+
+    def team(self, team: str) -> Optional[Dict]:
+        """Stored league row for one team, scored (None if not in the baseline)."""
+        x = self.rows.get(_key(team))
+        if x is None:
+            return None
+        return self.score([{"team": team, **dict(zip(METRIC_COLS, x))}])[0]
+
+    # --- persistence ---------------------------------------------------
+    def to_dict(self) -> Dict:
+        return {"year": self.year, "week": self.week, "columns": METRIC_COLS, "n": self.n,
+                "mean": self.mean.tolist(), "m2": self.m2.tolist(),
+                "rows": {k: v.tolist() for k, v in self.rows.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "LeagueBaseline":
+        if d.get("columns") != METRIC_COLS:
+            raise ValueError("baseline columns do not match METRIC_COLS")
+        base = cls(d.get("year"), d.get("week"))
+        base.n = int(d["n"])
+        base.mean = np.asarray(d["mean"], dtype=float)
+        base.m2 = np.asarray(d["m2"], dtype=float)
+        base.rows = {k: np.asarray(v, dtype=float) for k, v in d.get("rows", {}).items()}
+        return base
+
+    def save(self, path: str) -> None:
+        with atomic_write(path, encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "LeagueBaseline":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def _key(team: str) -> str:
+    return team_key(team)
+
+
+def _vector(row: Dict) -> np.ndarray:
+    x = pd.to_numeric(pd.Series([row.get(c) for c in METRIC_COLS], dtype=object), errors="coerce")
+    return x.fillna(0.0).to_numpy(dtype=float)
 
 # ------------------------------------------------------------
 # COMPATIBILITY WRAPPER
 # ------------------------------------------------------------
 
-def preprocess_team_metrics(rows: list[dict]) -> list[dict]:
+def preprocess_team_metrics(rows: list[dict], baseline: Optional[LeagueBaseline] = None) -> list[dict]:
     """
     Compatibility wrapper for systems expecting preprocess_team_metrics().
     Converts list[dict] -> DataFrame -> normalized list[dict].
+    With a league `baseline` the rows are z-scored against the league;
+    without one they can only be scored against each other.
     """
     if not rows:
         return []
@@ -69,6 +218,8 @@ def preprocess_team_metrics(rows: list[dict]) -> list[dict]:
     if "team" not in df.columns:
         raise ValueError("Input must contain a 'team' field")
 
+    if baseline is not None and baseline.n:
+        return baseline.score_frame(df).to_dict(orient="records")
     return normalize_frame(df).to_dict(orient="records")
 
 # ------------------------------------------------------------
@@ -1,9 +1,41 @@
-import requests, os
+import os
+from modules import http_client, odds_store
 
 ODDS_API_KEY = os.getenv("ODDS_API_KEY")
 BASE_URL = "https://api.the-odds-api.com/v4/sports/americanfootball_ncaaf/odds-history"
 
+RECORD_BATCH = 50  # streamed games appended to the odds store per gzip member
+
+def _record(games, timestamp):
+    try:
+        odds_store.record_board(games, ts=odds_store.to_timestamp(timestamp, None))
+    except OSError:
+        pass  # the time series is best-effort; never fail a history fetch over it
+
 def get_odds_history(date: str):
     params = {"apiKey": ODDS_API_KEY, "regions": "us", "date": date}
-    r = requests.get(BASE_URL, params=params, timeout=10)
-    return r.json() if r.ok else {"error": r.text}
+    r = http_client.get(BASE_URL, params=params, timeout=10)
+    if not r.ok:
+        return {"error": r.text}
+    snap = r.json()
+    if isinstance(snap, dict):
+        _record(snap.get("data"), snap.get("timestamp"))
+    return snap
+
+def iter_odds_history(date: str):
+    """Stream the snapshot's "data" games one at a time; yields {"error": ...} on a bad status."""
+    params = {"apiKey": ODDS_API_KEY, "regions": "us", "date": date}
+    with http_client.get(BASE_URL, params=params, timeout=10, stream=True) as r:
+        if not r.ok:
+            yield {"error": r.text}
+            return
+        # games arrive before the snapshot's "timestamp" key, so stamp them with
+        # the requested date (bookmaker last_update still wins per quote)
+        batch = []
+        for game in http_client.iter_json_array(r, key="data"):
+            batch.append(game)
+            if len(batch) >= RECORD_BATCH:
+                _record(batch, date)
+                batch = []
+            yield game
+        _record(batch, date)
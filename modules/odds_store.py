@@ -0,0 +1,416 @@
+# modules/odds_store.py
+"""
+Append-only odds time series.
+
+Every Odds API board we download (odds_totals live boards, odds_history
+snapshots) is appended here, so line history is answered locally instead of
+spending API quota.
+
+Storage: data/odds_store/odds_{YYYYMMDD}.ndjson.gz, one file per UTC day of
+recording. Each append is its own gzip member (concatenated members are a
+valid gzip file), holding NDJSON lines of two kinds:
+
+    {"g": game_id, "h": home, "a": away, "c": commence_time}    game, once
+    [ts, game_id, book, market, outcome, price, point]         one quote
+
+Only quotes that differ from the last recorded value of their series
+(game, book, market, outcome) are written, so the files hold change points.
+outcome is "home" / "away" / "over" / "under" / "draw".
+
+Readers keep an in-memory index {(game, book, market, outcome): [(ts, price,
+point), ...]} (time-ordered, with a game -> series keys map so per-game queries
+touch only that game's series) and pick up members appended by other processes by reading
+each file from the last byte offset they consumed. A corrupt member is logged
+and skipped (reading resumes at the next gzip header); an unfinished member in
+a past day's segment, which nobody will ever complete, is skipped the same way.
+
+The index is bounded to the last INDEX_DAYS of recording: older segments are
+not read, and games not recorded since (in any segment) are evicted, so
+line_movement reports them as not in the store. Quote timestamps do not
+matter here, so backfilled history stays queryable for the whole window. The
+files on disk keep everything.
+"""
+import os
+import json
+import time
+import zlib
+import logging
+import threading
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.teams import team_key
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: appends are only serialized within the process
+    fcntl = None
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+STORE_DIR = os.path.join(BASE_DIR, "data", "odds_store")
+
+MARKETS = ("spreads", "totals", "h2h")
+INDEX_DAYS = float(os.getenv("ODDS_STORE_INDEX_DAYS", "45"))  # in-memory window
+PRUNE_EVERY = 3600  # seconds between evictions of games that left the window
+
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+
+log = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_offsets: Dict[str, int] = {}  # segment file -> bytes already indexed
+_series: Dict[Tuple[str, str, str, str], List[tuple]] = {}
+_by_game: Dict[str, List[tuple]] = {}  # game -> its keys in _series, in creation order
+_games: Dict[str, Dict[str, Any]] = {}
+_recorded: Dict[str, float] = {}  # game -> latest recording day (segment date / append time)
+_pruned_at = 0.0
+
+
+# ------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------
+def to_timestamp(value, default: Optional[float]) -> Optional[float]:
+    """
+    Epoch seconds from a number or an ISO-8601 string ("...Z" ok), else
+    `default`. Strings without an offset (including bare dates) are UTC.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return default
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return default
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _outcome(name: str, market: str, home: str, away: str) -> Optional[str]:
+    if market == "totals":
+        return str(name or "").lower() or None
+    if name == home:
+        return "home"
+    if name == away:
+        return "away"
+    return "draw" if str(name).lower() == "draw" else None
+
+
+def _segment_path(ts: float) -> str:
+    return os.path.join(STORE_DIR, f"odds_{datetime.fromtimestamp(ts, tz=timezone.utc):%Y%m%d}.ndjson.gz")
+
+
+@contextmanager
+def _append_lock():
+    os.makedirs(STORE_DIR, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(STORE_DIR, ".append.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+# ------------------------------------------------------------
+# Index
+# ------------------------------------------------------------
+def _apply(line: str, recorded: float):
+    rec = json.loads(line)
+    if isinstance(rec, dict):
+        _games.setdefault(rec["g"], {"home_team": rec.get("h"), "away_team": rec.get("a"),
+                                     "commence_time": rec.get("c")})
+        _recorded[rec["g"]] = max(recorded, _recorded.get(rec["g"], recorded))
+        return
+    ts, game, book, market, outcome, price, point = rec
+    _recorded[game] = max(recorded, _recorded.get(game, recorded))
+    key = (game, book, market, outcome)
+    series = _series.get(key)
+    if series is None:
+        series = _series[key] = []
+        _by_game.setdefault(game, []).append(key)
+    series.append((ts, price, point))
+    if len(series) > 1 and series[-2][0] > ts:  # late history backfill
+        series.sort(key=lambda q: q[0])
+
+
+def _standing(series: Optional[List[tuple]], ts: float) -> Optional[tuple]:
+    """The quote in effect at `ts` (last one at or before it), else None."""
+    for q in reversed(series or ()):  # backfill is rare: usually the last quote
+        if q[0] <= ts:
+            return q
+    return None
+
+
+def _read_members(path: str, offset: int, recorded: float, live: bool = True) -> int:
+    """
+    Index every complete gzip member of `path` (recorded on day `recorded`)
+    from `offset`; returns the new offset. `live` marks the segment still
+    being appended to: only there is an unfinished trailing member waited for
+    rather than skipped.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    pos = 0
+    while pos < len(data):
+        d = zlib.decompressobj(wbits=31)
+        try:
+            text = d.decompress(data[pos:])
+        except zlib.error as e:
+            nxt = data.find(_GZIP_MAGIC, pos + 1)
+            nxt = len(data) if nxt < 0 else nxt
+            log.warning("odds_store: skipping corrupt member in %s at byte %d (%d bytes): %s",
+                        path, offset + pos, nxt - pos, e)
+            pos = nxt
+            continue
+        if not d.eof:
+            if live:  # member still being written
+                break
+            log.warning("odds_store: skipping truncated member in %s at byte %d", path, offset + pos)
+            pos = len(data)
+            break
+        for line in text.decode("utf-8", "replace").splitlines():
+            if not line:
+                continue
+            try:
+                _apply(line, recorded)
+            except (ValueError, KeyError, TypeError) as e:
+                log.warning("odds_store: skipping bad line in %s: %s", path, e)
+        pos = len(data) - len(d.unused_data)
+    return offset + pos
+
+
+def _segment_day(name: str) -> Optional[float]:
+    try:
+        return datetime.strptime(name[5:13], "%Y%m%d").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def _prune(cutoff: float):
+    """Evict games last recorded before `cutoff`."""
+    gone = {g for g, day in _recorded.items() if day < cutoff}
+    if not gone:
+        return
+    for g in gone:
+        for key in _by_game.pop(g, ()):
+            del _series[key]
+        _games.pop(g, None)
+        del _recorded[g]
+
+
+def refresh_index():
+    """Fold segments (or their tails) written since the last call into the index."""
+    global _pruned_at
+    if not os.path.isdir(STORE_DIR):
+        return
+    now = time.time()
+    cutoff = now - INDEX_DAYS * 86400
+    today = os.path.basename(_segment_path(now))
+    with _lock:
+        for name in sorted(os.listdir(STORE_DIR)):
+            if not name.endswith(".ndjson.gz"):
+                continue
+            day = _segment_day(name)
+            if day is not None and day + 86400 < cutoff:
+                continue  # whole segment is older than the window
+            path = os.path.join(STORE_DIR, name)
+            size = os.path.getsize(path)
+            if size > _offsets.get(path, 0):
+                _offsets[path] = _read_members(path, _offsets.get(path, 0),
+                                               now if day is None else day + 86400, live=name >= today)
+        if now - _pruned_at >= PRUNE_EVERY:
+            _pruned_at = now
+            _prune(cutoff)
+
+
+# ------------------------------------------------------------
+# Ingest
+# ------------------------------------------------------------
+def record_board(data: List[Dict[str, Any]], ts: Optional[float] = None) -> int:
+    """
+    Append an Odds API board (list of games with bookmakers -> markets ->
+    outcomes). Each quote is stamped with its bookmaker's last_update (else
+    `ts`, else now). Returns the number of quotes written.
+    """
+    if not isinstance(data, list) or not data:
+        return 0
+    now = time.time()
+    ts = now if ts is None else ts
+
+    with _append_lock(), _lock:
+        refresh_index()
+        lines: List[str] = []
+        for g in data:
+            game = g.get("id")
+            home, away = g.get("home_team"), g.get("away_team")
+            if not game:
+                continue
+            _recorded[game] = now  # still on the board, even if no quote changed
+            if game not in _games:
+                lines.append(json.dumps({"g": game, "h": home, "a": away, "c": g.get("commence_time")}))
+                _apply(lines[-1], now)
+            for b in g.get("bookmakers") or []:
+                book = b.get("key") or b.get("title")
+                q_ts = to_timestamp(b.get("last_update"), ts)
+                for m in b.get("markets") or []:
+                    market = m.get("key")
+                    if market not in MARKETS:
+                        continue
+                    for o in m.get("outcomes") or []:
+                        outcome = _outcome(o.get("name"), market, home, away)
+                        if outcome is None:
+                            continue
+                        price, point = o.get("price"), o.get("point")
+                        # compare with the quote standing at q_ts, so backfilled
+                        # history keeps its change points
+                        prev = _standing(_series.get((game, book, market, outcome)), q_ts)
+                        if prev and prev[1:] == (price, point):
+                            continue  # unchanged at that time
+                        lines.append(json.dumps([q_ts, game, book, market, outcome, price, point]))
+                        _apply(lines[-1], now)
+
+        if not lines:
+            return 0
+        path = _segment_path(now)
+        member = zlib.compressobj(wbits=31)
+        blob = member.compress(("\n".join(lines) + "\n").encode("utf-8")) + member.flush()
+        with open(path, "ab") as f:
+            start = f.tell()
+            f.write(blob)
+        # our own member is already indexed; skip over it (unless others appended before us)
+        if _offsets.get(path, 0) == start:
+            _offsets[path] = start + len(blob)
+        return sum(1 for line in lines if line.startswith("["))
+
+
+# ------------------------------------------------------------
+# Queries
+# ------------------------------------------------------------
+def find_games(home: Optional[str] = None, away: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Stored games matching either / both teams (any spelling the registry knows)."""
+    refresh_index()
+    kh = team_key(home) if home else None
+    ka = team_key(away) if away else None
+    with _lock:
+        games = list(_games.items())
+    out = []
+    for game, g in games:
+        h, a = team_key(g["home_team"]), team_key(g["away_team"])
+        if (kh is None or kh in (h, a)) and (ka is None or ka in (h, a)):
+            out.append({"game_id": game, **g})
+    return out
+
+
+def line_movement(game_id: str, market: str = "spreads", book: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Every recorded change for one game and market, per book and outcome,
+    plus the consensus (median across books) of the home / over point at each
+    change time.
+    """
+    refresh_index()
+    with _lock:
+        if game_id not in _games:
+            return {"error": "game_not_in_store", "game_id": game_id}
+        info = dict(_games[game_id])
+        series = _game_series(game_id, market, book)
+    books: Dict[str, Dict[str, list]] = {}
+    for (_, b, _, outcome), s in series.items():
+        books.setdefault(b, {})[outcome] = [
+            {"ts": _iso(ts), "price": price, "point": point} for ts, price, point in s
+        ]
+    return {"game_id": game_id, **info, "market": market, "books": books,
+            "consensus": _consensus_path(series, market)}
+
+
+def _game_series(game_id: str, market: str, book: Optional[str] = None) -> Dict[tuple, List[tuple]]:
+    """Copies of one game's series for `market` (and `book`). Call with _lock held."""
+    return {k: list(_series[k]) for k in _by_game.get(game_id, ())
+            if k[2] == market and (not book or k[1] == book)}
+
+
+def _lead_outcome(market: str) -> str:
+    return "over" if market == "totals" else "home"
+
+
+def _consensus_path(series: Dict[tuple, List[tuple]], market: str) -> List[Dict[str, Any]]:
+    """Consensus path over one game's series (from _game_series)."""
+    field = 1 if market == "h2h" else 2  # price for moneylines, point otherwise
+    lead = _lead_outcome(market)
+    per_book = [s for (_, _, _, o), s in series.items() if o == lead]
+    if not per_book:
+        return []
+    # (books x change times) grid of each book's standing quote, NaN before its first one
+    book_times = [np.array([q[0] for q in s], dtype=float) for s in per_book]
+    times = np.unique(np.concatenate(book_times))
+    grid = np.full((len(per_book), len(times)), np.nan)
+    for k, (s, t) in enumerate(zip(per_book, book_times)):
+        vals = np.array([np.nan if q[field] is None else q[field] for q in s], dtype=float)
+        i = np.searchsorted(t, times, side="right") - 1
+        grid[k] = np.where(i >= 0, vals[np.maximum(i, 0)], np.nan)
+
+    counts = (~np.isnan(grid)).sum(axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # times where no book has a value
+        medians = np.nanmedian(grid, axis=0)
+    return [{"ts": _iso(t), "median": float(m), "books": int(c)}
+            for t, m, c in zip(times, medians, counts) if c]
+
+
+def movers(min_move: float = 2.0, market: str = "spreads", since: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Games whose consensus (median across books) home / over point moved at
+    least `min_move` between open (first quote per book, or the last quote
+    before `since`) and now. Sorted by the size of the move.
+    """
+    refresh_index()
+    field = 1 if market == "h2h" else 2
+    lead = _lead_outcome(market)
+    opens: Dict[str, list] = {}
+    currents: Dict[str, list] = {}
+    with _lock:
+        for (game, book, m, outcome), s in _series.items():
+            if m != market or outcome != lead:
+                continue
+            start = (_standing(s, since) or s[0]) if since is not None else s[0]
+            if start[field] is None or s[-1][field] is None:
+                continue
+            opens.setdefault(game, []).append(start[field])
+            currents.setdefault(game, []).append(s[-1][field])
+        games = {g: dict(_games.get(g, {})) for g in opens}
+
+    out = []
+    for game in opens:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            o, c = float(np.median(opens[game])), float(np.median(currents[game]))
+        if abs(c - o) >= min_move:
+            out.append({"game_id": game, **games[game], "market": market,
+                        "open": o, "current": c, "move": round(c - o, 3), "books": len(opens[game])})
+    return sorted(out, key=lambda r: -abs(r["move"]))
+
+
+def store_stats() -> Dict[str, Any]:
+    refresh_index()
+    files = [f for f in os.listdir(STORE_DIR)] if os.path.isdir(STORE_DIR) else []
+    with _lock:
+        games, series, quotes = len(_games), len(_series), sum(len(s) for s in _series.values())
+    return {
+        "games": games,
+        "series": series,
+        "quotes": quotes,
+        "segments": len([f for f in files if f.endswith(".ndjson.gz")]),
+        "bytes": sum(os.path.getsize(os.path.join(STORE_DIR, f)) for f in files if f.endswith(".ndjson.gz")),
+    }
@@ -1,12 +1,33 @@
 import os
 import json
-import requests
+import time
+import threading
+import warnings
+from typing import Any, Dict, List, Optional
+import numpy as np
+from modules import http_client, odds_store
+from modules.cache_utils import atomic_write, refresh_in_background, single_flight
+from modules.teams import team_key
 
 CACHE_FILE = "data/odds_cache.json"
+LIVE_KEY = "odds_totals"  # single-flight key for live board downloads
 API_KEY = os.getenv("ODDS_API_KEY")
 
-def get_odds_totals(week=10, year=2025):
-    """Fetch odds and totals from TheOddsAPI, with fallback to cached data."""
+# stale-while-revalidate windows for the odds board (lines move, keep it short)
+ODDS_SOFT_TTL = 15 * 60
+ODDS_HARD_TTL = 12 * 3600
+
+# slate snapshot: one board download per TTL serves every per-game lookup
+SNAPSHOT_TTL = float(os.getenv("ODDS_SNAPSHOT_TTL", "600"))
+SNAPSHOT_ERROR_TTL = 60  # a failed board download with nothing to fall back on is retried after this
+
+def _read_cache():
+    if not os.path.exists(CACHE_FILE):
+        return None
+    with open(CACHE_FILE) as f:
+        return json.load(f)
+
+def _fetch_board():
     url = f"https://api.the-odds-api.com/v4/sports/americanfootball_ncaaf/odds/"
     params = {
         "apiKey": API_KEY,
@@ -15,58 +36,240 @@ def get_odds_totals(week=10, year=2025):
         "oddsFormat": "american"
     }
 
+    resp = http_client.get(url, params=params, timeout=10)
+    resp.raise_for_status()
+    data = resp.json()
+    try:
+        odds_store.record_board(data)
+    except OSError:
+        pass  # the time series is best-effort; never fail a board fetch over it
+    return data
+
+def _fetch_live(week, year):
+    data = _fetch_board()
+    _store_snapshot(year, week, data)
+
+    # normalize and structure
+    games = []
+    for g in data:
+        home = g.get("home_team", "")
+        away = g.get("away_team", "")
+        bookmakers = g.get("bookmakers", [])
+        if not bookmakers:
+            continue
+
+        lines = bookmakers[0].get("markets", [])
+        spread, total = None, None
+        for market in lines:
+            if market["key"] == "spreads":
+                spread = market["outcomes"][0]["point"]
+            elif market["key"] == "totals":
+                total = market["outcomes"][0]["point"]
+
+        games.append({
+            "home_team": home,
+            "away_team": away,
+            "spread": spread,
+            "total": total
+        })
+
+    if not games:
+        raise ValueError("no_games_parsed")
+
+    # ✅ write cache (atomically: a background refresh may race readers)
+    os.makedirs("data", exist_ok=True)
+    with atomic_write(CACHE_FILE) as f:
+        json.dump({"cached_at": week, "ts": time.time(), "games": games}, f)
+
+    return {"source": "live", "games": games}
+
+def get_odds_totals(week=10, year=2025, swr=False):
+    """
+    Fetch odds and totals from TheOddsAPI, with fallback to cached data.
+    With swr=True a cached board younger than ODDS_HARD_TTL is served at once
+    (refreshed in the background once past ODDS_SOFT_TTL) and the response
+    carries age_seconds / stale.
+    """
+    if swr:
+        cached = _read_cache()
+        ts = (cached or {}).get("ts")
+        if ts is not None and time.time() - ts < ODDS_HARD_TTL:
+            age = time.time() - ts
+            stale = age >= ODDS_SOFT_TTL
+            if stale:
+                refresh_in_background(LIVE_KEY, lambda: _fetch_live(week, year))
+            return {
+                "source": "cache",
+                "games": cached.get("games", []),
+                "age_seconds": round(age, 1),
+                "stale": stale,
+                "revalidating": stale,
+            }
+
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-
-        # normalize and structure
-        games = []
-        for g in data:
-            home = g.get("home_team", "")
-            away = g.get("away_team", "")
-            bookmakers = g.get("bookmakers", [])
-            if not bookmakers:
-                continue
-
-            lines = bookmakers[0].get("markets", [])
-            spread, total = None, None
-            for market in lines:
-                if market["key"] == "spreads":
-                    spread = market["outcomes"][0]["point"]
-                elif market["key"] == "totals":
-                    total = market["outcomes"][0]["point"]
-
-            games.append({
-                "home_team": home,
-                "away_team": away,
-                "spread": spread,
-                "total": total
-            })
-
-        if not games:
-            raise ValueError("no_games_parsed")
-
-        # ✅ write cache
-        os.makedirs("data", exist_ok=True)
-        with open(CACHE_FILE, "w") as f:
-            json.dump({"cached_at": week, "games": games}, f)
-
-        return {"source": "live", "games": games}
+        # one board download at a time; concurrent callers (and a background
+        # refresh already in flight) share its result
+        result = dict(single_flight(LIVE_KEY, lambda: _fetch_live(week, year)))
+        if swr:
+            result.update({"age_seconds": 0.0, "stale": False, "revalidating": False})
+        return result
 
     except Exception as e:
         # 🩵 fallback path
         if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE) as f:
-                cached = json.load(f)
-            return {
+            cached = _read_cache()
+            result = {
                 "source": "cache",
                 "note": f"Live fetch failed ({str(e)}), serving cached data.",
                 "games": cached.get("games", [])
             }
+            if swr and cached.get("ts") is not None:
+                result.update({"age_seconds": round(time.time() - cached["ts"], 1), "stale": True, "revalidating": False})
+            return result
 
         # ❌ if no cache exists yet
         return {
             "error": f"Failed to fetch odds: {str(e)}",
             "note": "No cached data available yet."
         }
+
+# ------------------------------------------------------------
+# Slate odds snapshot with multi-book consensus
+# ------------------------------------------------------------
+# The Odds API only serves the upcoming board, so (year, week) just keys the
+# snapshot; it does not filter games.
+_SNAPSHOTS: Dict[tuple, Dict[str, Any]] = {}
+_SNAPSHOT_LOCK = threading.Lock()
+_snapshot_failed: Dict[tuple, tuple] = {}  # (year, week) -> (retry_after, error payload)
+
+CONSENSUS_FIELDS = ("spread_home", "odds_home", "odds_away", "total", "ml_home", "ml_away")
+
+_FIELD_INDEX = {f: k for k, f in enumerate(CONSENSUS_FIELDS)}
+# (market, side) -> [(index into CONSENSUS_FIELDS, outcome attribute), ...]
+_QUOTE_FIELDS = {
+    ("spreads", "home"): [(_FIELD_INDEX["spread_home"], "point"), (_FIELD_INDEX["odds_home"], "price")],
+    ("spreads", "away"): [(_FIELD_INDEX["odds_away"], "price")],
+    ("totals", "over"): [(_FIELD_INDEX["total"], "point")],
+    ("h2h", "home"): [(_FIELD_INDEX["ml_home"], "price")],
+    ("h2h", "away"): [(_FIELD_INDEX["ml_away"], "price")],
+}
+
+def _consensus(data: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Lay every bookmaker's quotes out as a (fields x games x books) array (NaN
+    where a book has no quote) and take the median across books in one pass.
+    Quotes are flattened to (cell, value) lists in a single walk of the board
+    and scattered into the array with one fancy-indexed assignment.
+    """
+    n = len(data)
+    width = max([len(g.get("bookmakers") or []) for g in data] + [1])
+    cells, vals = [], []  # flat index into the grid, quote value
+
+    for i, g in enumerate(data):
+        sides = {g.get("home_team"): "home", g.get("away_team"): "away", "Over": "over"}
+        for j, book in enumerate(g.get("bookmakers") or []):
+            cell = i * width + j
+            for market in book.get("markets", []):
+                key = market.get("key")
+                for o in market.get("outcomes", []):
+                    for k, attr in _QUOTE_FIELDS.get((key, sides.get(o.get("name"))), ()):
+                        cells.append(k * n * width + cell)
+                        vals.append(o.get(attr))
+
+    grid = np.full((len(CONSENSUS_FIELDS), n, width), np.nan)
+    grid.reshape(-1)[np.array(cells, dtype=np.intp)] = np.array(vals, dtype=float)  # None -> NaN
+
+    books = (~np.isnan(grid[_FIELD_INDEX["spread_home"]])).sum(axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows -> NaN median
+        medians = np.nanmedian(grid, axis=2)
+    return {"books": books, **{f"median_{f}": medians[k] for k, f in enumerate(CONSENSUS_FIELDS)}}
+
+def _store_snapshot(year: int, week: int, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    cons = _consensus(data)
+    games, by_pair, by_id = [], {}, {}
+    for i, g in enumerate(data):
+        row = {
+            "id": g.get("id"),
+            "home_team": g.get("home_team", ""),
+            "away_team": g.get("away_team", ""),
+            "commence_time": g.get("commence_time"),
+            "books": int(cons["books"][i]),
+        }
+        for f in CONSENSUS_FIELDS:
+            v = cons[f"median_{f}"][i]
+            row[f"median_{f}"] = None if np.isnan(v) else float(v)
+        by_pair.setdefault((team_key(row["home_team"]), team_key(row["away_team"])), len(games))
+        if row["id"]:
+            by_id[row["id"]] = len(games)
+        games.append(row)
+
+    snap = {"year": year, "week": week, "fetched_at": time.time(),
+            "games": games, "by_pair": by_pair, "by_id": by_id}
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOTS[(year, week)] = snap
+    return snap
+
+def get_odds_snapshot(year: int = 2025, week: int = 10) -> Dict[str, Any]:
+    """
+    Slate-wide odds with consensus medians, fetched at most once per
+    SNAPSHOT_TTL and indexed by (home, away) and by Odds API game id.
+    On a failed refresh the previous snapshot (if any) is kept; with none to
+    keep, the error is served for SNAPSHOT_ERROR_TTL before trying again.
+    """
+    snap = _SNAPSHOTS.get((year, week))
+    if snap is not None and time.time() - snap["fetched_at"] < SNAPSHOT_TTL:
+        return snap
+    failed = _snapshot_failed.get((year, week))
+    if snap is None and failed and time.time() < failed[0]:
+        return failed[1]
+
+    def load():
+        try:
+            fresh = _store_snapshot(year, week, _fetch_board())
+            _snapshot_failed.pop((year, week), None)
+            return fresh
+        except Exception as e:
+            if snap is not None:
+                return snap
+            err = {"year": year, "week": week, "fetched_at": 0.0, "games": [],
+                   "by_pair": {}, "by_id": {}, "error": f"Failed to fetch odds: {str(e)}"}
+            _snapshot_failed[(year, week)] = (time.time() + SNAPSHOT_ERROR_TTL, err)
+            return err
+
+    return single_flight(f"odds_snapshot_{year}_{week}", load)
+
+def get_game_odds(home: str, away: str, year: int = 2025, week: int = 10,
+                  game_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Consensus odds for one game from the slate snapshot. Looks up by game id,
+    then (home, away); a game listed the other way round is flipped to the
+    caller's home/away orientation.
+    """
+    return lookup_game_odds(get_odds_snapshot(year, week), home, away, game_id)
+
+def lookup_game_odds(snap: Dict[str, Any], home: str, away: str,
+                     game_id: Optional[str] = None) -> Dict[str, Any]:
+    """get_game_odds against a snapshot the caller already holds (no refresh)."""
+    if game_id and game_id in snap["by_id"]:
+        return snap["games"][snap["by_id"][game_id]]
+
+    idx = snap["by_pair"].get((team_key(home), team_key(away)))
+    if idx is not None:
+        return snap["games"][idx]
+
+    idx = snap["by_pair"].get((team_key(away), team_key(home)))
+    if idx is None:
+        return {"error": "game_not_in_snapshot", "home_team": home, "away_team": away}
+    g = snap["games"][idx]
+    spread = g["median_spread_home"]
+    return {
+        **g,
+        "home_team": g["away_team"],
+        "away_team": g["home_team"],
+        "median_spread_home": None if spread is None else -spread,
+        "median_odds_home": g["median_odds_away"],
+        "median_odds_away": g["median_odds_home"],
+        "median_ml_home": g["median_ml_away"],
+        "median_ml_away": g["median_ml_home"],
+    }
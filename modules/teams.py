@@ -0,0 +1,306 @@
+# modules/teams.py
+"""
+Canonical team registry.
+
+Every team is identified by its CFBD school name ("Ohio State"). A single
+alias index maps the normalized spelling of every known name to that school:
+
+- CFBD school, abbreviation and alternate names (from /teams, one call)
+- Odds API full names (school + mascot, "Ohio State Buckeyes")
+- ESPN slugs ("ohio-state")
+- Massey names (data/massey_snapshot.csv)
+- common abbreviations / nicknames (COMMON_ALIASES)
+
+Use team_key(name) as the dict key for any per-team table and canonical(name)
+for display / upstream calls; both are O(1) lookups.
+Unknown names fall back to their normalized spelling, so nothing breaks when
+the registry is offline.
+
+The seed registry (cached /teams list if on disk, Massey names, aliases) is
+built at import without network access. The full /teams list is fetched by a
+background refresh that the first lookup schedules; lookups never wait for it.
+"""
+import os
+import re
+import time
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from modules import http_client
+from modules.cache_utils import load_cache, load_or_fetch, refresh_in_background
+
+CFB_API = "https://api.collegefootballdata.com"
+CFB_KEY = os.getenv("CFBD_API_KEY", "")
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MASSEY_CSV = os.path.join(BASE_DIR, "data", "massey_snapshot.csv")
+
+REGISTRY_TTL = 7 * 24 * 3600  # the team list changes a few times a year
+REGISTRY_RETRY = 300  # after a /teams fetch attempt, run on the seed registry this long
+
+# alias -> CFBD school, for names no upstream spells out
+COMMON_ALIASES = {
+    "ole miss": "Ole Miss",
+    "mississippi": "Ole Miss",
+    "miami fl": "Miami",
+    "miami (fl)": "Miami",
+    "miami florida": "Miami",
+    "miami oh": "Miami (OH)",
+    "miami ohio": "Miami (OH)",
+    "usc": "USC",
+    "southern california": "USC",
+    "lsu": "LSU",
+    "louisiana state": "LSU",
+    "byu": "BYU",
+    "brigham young": "BYU",
+    "tcu": "TCU",
+    "texas christian": "TCU",
+    "smu": "SMU",
+    "southern methodist": "SMU",
+    "ucf": "UCF",
+    "central florida": "UCF",
+    "uab": "UAB",
+    "utsa": "UTSA",
+    "utep": "UTEP",
+    "unlv": "UNLV",
+    "fiu": "Florida International",
+    "fau": "Florida Atlantic",
+    "uconn": "UConn",
+    "connecticut": "UConn",
+    "umass": "Massachusetts",
+    "pitt": "Pittsburgh",
+    "nc state": "NC State",
+    "north carolina state": "NC State",
+    "unc": "North Carolina",
+    "app state": "App State",
+    "appalachian state": "App State",
+    "southern miss": "Southern Miss",
+    "southern mississippi": "Southern Miss",
+    "ul monroe": "UL Monroe",
+    "louisiana monroe": "UL Monroe",
+    "louisiana lafayette": "Louisiana",
+    "ul lafayette": "Louisiana",
+    "hawaii": "Hawai'i",
+    "san jose state": "San José State",
+    "texas a&m": "Texas A&M",
+    "tamu": "Texas A&M",
+    "psu": "Penn State",
+    "uga": "Georgia",
+    "bama": "Alabama",
+    "ou": "Oklahoma",
+    "fsu": "Florida State",
+    "vt": "Virginia Tech",
+    "gt": "Georgia Tech",
+    "wku": "Western Kentucky",
+    "niu": "Northern Illinois",
+    "army west point": "Army",
+    "sam houston state": "Sam Houston",
+}
+
+# school-name words that make "<prefix> <word> ..." a different school
+# ("Texas State Bobcats" is not Texas); guards the prefix match on the seed registry
+_QUALIFIERS = {"state", "st", "tech", "a&m", "am", "international", "christian", "methodist",
+               "north", "south", "east", "west", "northern", "southern", "eastern", "western", "central"}
+
+_lock = threading.Lock()
+_index: Dict[str, str] = {}  # normalized alias -> school
+_teams: Dict[str, Dict[str, Any]] = {}  # school -> CFBD record (+ "aliases")
+_schools: set = set()  # normalized school names
+_generation = 0  # bumped on every swap; part of the _resolve cache key
+_attempted_at = 0.0  # last /teams fetch attempt (success or not)
+_complete = False
+
+
+# ------------------------------------------------------------
+# Normalization
+# ------------------------------------------------------------
+def normalize(name: str) -> str:
+    """Lower-case, accent-free, punctuation-light spelling used as the alias key."""
+    s = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii")
+    s = s.lower().replace("-", " ").replace("_", " ")
+    s = re.sub(r"['.`]", "", s)
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def _variants(alias: str) -> Iterable[str]:
+    n = normalize(alias)
+    if not n:
+        return
+    yield n
+    # "Ohio State" <-> "Ohio St"
+    if n.endswith(" state"):
+        yield n[: -len("state")] + "st"
+    elif n.endswith(" st"):
+        yield n + "ate"
+
+
+# ------------------------------------------------------------
+# Registry build
+# ------------------------------------------------------------
+def _fetch_cfbd_teams() -> List[Dict[str, Any]]:
+    headers = {"Authorization": f"Bearer {CFB_KEY}"} if CFB_KEY else {}
+    r = http_client.get(f"{CFB_API}/teams", headers=headers, timeout=20)
+    r.raise_for_status()
+    keep = ("school", "mascot", "abbreviation", "conference", "classification",
+            "alternateNames", "alt_name1", "alt_name2", "alt_name3")
+    return [{k: t.get(k) for k in keep if t.get(k) is not None} for t in r.json() if t.get("school")]
+
+
+def _massey_names() -> List[str]:
+    try:
+        df = pd.read_csv(MASSEY_CSV)
+    except (OSError, ValueError):
+        return []
+    df.columns = [c.lower() for c in df.columns]
+    return [str(t) for t in df.get("team", pd.Series(dtype=str)).dropna()]
+
+
+def _cfbd_aliases(t: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Aliases of one CFBD team, grouped by priority tier."""
+    school = t["school"]
+    alternates = list(t.get("alternateNames") or [])
+    alternates += [t[k] for k in ("alt_name1", "alt_name2", "alt_name3") if t.get(k)]
+    return {
+        "full": [f"{school} {t['mascot']}"] if t.get("mascot") else [],
+        "alt": alternates,
+        "abbr": [t["abbreviation"]] if t.get("abbreviation") else [],
+    }
+
+
+def _build(cfbd: Optional[List[Dict[str, Any]]]):
+    index: Dict[str, str] = {}
+    teams: Dict[str, Dict[str, Any]] = {}
+
+    def add(alias: str, school: str):
+        for v in _variants(alias):
+            index.setdefault(v, school)  # earlier tiers win collisions
+            teams[school]["aliases"].add(v)
+
+    records = cfbd or []
+    for t in records:
+        teams[t["school"]] = {**t, "aliases": set()}
+    for name in _massey_names():
+        teams.setdefault(name, {"school": name, "aliases": set()})
+    for school in set(COMMON_ALIASES.values()):
+        teams.setdefault(school, {"school": school, "aliases": set()})
+
+    # tier order: exact schools, curated aliases, Odds API names, CFBD alternates, abbreviations
+    for school in teams:
+        add(school, school)
+        add(espn_slug_of(school), school)
+    for alias, school in COMMON_ALIASES.items():
+        add(alias, school)
+    tiers = [_cfbd_aliases(t) for t in records]
+    for tier in ("full", "alt", "abbr"):
+        for t, aliases in zip(records, tiers):
+            for alias in aliases[tier]:
+                add(alias, t["school"])
+
+    for rec in teams.values():
+        rec["aliases"] = sorted(rec["aliases"])
+    return index, teams
+
+
+def _install(cfbd: Optional[List[Dict[str, Any]]]):
+    """Build a registry (no I/O beyond the Massey CSV) and swap it in."""
+    global _index, _teams, _schools, _generation, _complete
+    index, teams = _build(cfbd)
+    schools = {normalize(school) for school in teams}
+    with _lock:
+        _index, _teams, _schools, _complete = index, teams, schools, bool(cfbd)
+        _generation += 1
+        _resolve.cache_clear()
+
+
+def _seed():
+    cached = load_cache("cfbd_teams", REGISTRY_TTL)  # disk / memory only
+    _install(cached if isinstance(cached, list) and cached else None)
+
+
+def refresh():
+    """Fetch /teams (through the shared cache) and install the full registry. Blocks; raises on failure."""
+    global _attempted_at
+    _attempted_at = time.time()
+    cfbd = load_or_fetch("cfbd_teams", _fetch_cfbd_teams, ttl=REGISTRY_TTL)
+    if not (isinstance(cfbd, list) and cfbd):
+        raise ValueError(f"unusable /teams payload: {str(cfbd)[:200]}")
+    _install(cfbd)
+
+
+def _ensure():
+    """Schedule a background /teams refresh while running on the seed registry."""
+    global _attempted_at
+    if _complete or time.time() - _attempted_at < REGISTRY_RETRY:
+        return
+    _attempted_at = time.time()  # a failed fetch is retried after REGISTRY_RETRY, never inline
+    refresh_in_background("teams_registry", refresh)
+
+
+def reload():
+    """Fall back to the seed registry; the next lookup schedules a fresh /teams fetch."""
+    global _attempted_at
+    _attempted_at = 0.0
+    _seed()
+
+
+# ------------------------------------------------------------
+# Lookups
+# ------------------------------------------------------------
+@lru_cache(maxsize=8192)
+def _resolve(name: str, generation: int) -> Optional[str]:
+    for v in _variants(name):
+        school = _index.get(v)
+        if school is not None:
+            return school
+    # Odds API style "<school> <mascot>" with a mascot we don't know: longest known
+    # prefix. On the seed registry the prefix must be a school name itself and
+    # the rest must not start like a longer school the seed may lack
+    # ("Texas State Bobcats" must not fall through to "Texas").
+    words = normalize(name).split(" ")
+    for cut in range(len(words) - 1, 0, -1):
+        prefix = " ".join(words[:cut])
+        school = _index.get(prefix)
+        if school is None or len(words) - cut > 2:
+            continue
+        if _complete or (prefix in _schools and words[cut] not in _QUALIFIERS):
+            return school
+        return None
+    return None
+
+
+def resolve(name: str) -> Optional[str]:
+    """CFBD school for any known spelling, else None."""
+    _ensure()
+    return _resolve(str(name or ""), _generation)
+
+
+def canonical(name: str) -> str:
+    """CFBD school for any known spelling; unknown names come back stripped."""
+    return resolve(name) or str(name or "").strip()
+
+
+def team_key(name: str) -> str:
+    """Join key for per-team tables: the normalized canonical school."""
+    return normalize(canonical(name))
+
+
+def espn_slug_of(school: str) -> str:
+    return normalize(school).replace(" ", "-")
+
+
+def espn_slug(name: str) -> str:
+    """ESPN URL slug ("ohio-state") for any known spelling."""
+    return espn_slug_of(canonical(name))
+
+
+def team_info(name: str) -> Optional[Dict[str, Any]]:
+    """Registry record (CFBD fields + aliases) for any known spelling."""
+    school = resolve(name)
+    return _teams.get(school) if school else None
+
+
+_seed()
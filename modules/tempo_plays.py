@@ -1,31 +1,172 @@
 import os
-import requests
+import time
+import numpy as np
+import pandas as pd
+from modules import http_client
 from statistics import mean
-from modules.cache_utils import load_cache, save_cache  # new shared cache utilities
+from modules.cache_utils import load_or_fetch, load_or_fetch_swr, CACHE_TTL  # shared cache + single-flight
+from modules.teams import team_key, canonical
 
 CFB_API = "https://api.collegefootballdata.com"
 CFB_KEY = os.getenv("CFBD_API_KEY", "")
 
+TEMPO_SOFT_TTL = CACHE_TTL
+TEMPO_HARD_TTL = 7 * 24 * 3600  # drive data barely moves mid-week
 
-def get_tempo(team: str):
+DRIVES_PER_GAME = 12  # ~12 drives per game estimate
+DEFAULT_DRIVE_MINUTES = 2.5  # fallback 2.5 min per drive
+
+# after a failed season-table build, skip rebuilding it (and answer from the
+# per-team fallback) for this long; error payloads are never cached
+TABLE_ERROR_TTL = 300
+_table_failed: dict = {}  # year -> (retry_after, error payload)
+
+
+def _headers():
+    return {"Authorization": f"Bearer {CFB_KEY}"} if CFB_KEY else {}
+
+
+def get_tempo(team: str, year: int = 2025, swr: bool = False):
     """
     Returns team tempo metrics derived from drive-level stats:
     - plays_per_game: estimated from average plays × ~12 drives/game
     - plays_per_minute: normalized per minute of drive time
-    Includes 6-hour cache to avoid redundant CFBD API calls.
+    - pass_rate: pass attempts / (pass + rush attempts), when available
+    Reads from the season tempo table (see build_tempo_table); teams missing
+    from it fall back to a per-team /drives call. Includes 6-hour cache;
+    concurrent misses share a single upstream fetch.
+    With swr=True a stale entry is served at once and refreshed in the
+    background; the result is wrapped as {"data", "age_seconds", "stale", ...}.
+    """
+    if swr:
+        table, meta = load_or_fetch_swr(f"tempo_table_{year}", lambda: _build_table(year),
+                                        TEMPO_SOFT_TTL, TEMPO_HARD_TTL)
+    else:
+        table, meta = get_tempo_table(year), None
+
+    row = table.get(team_key(team)) if isinstance(table, dict) and "error" not in table else None
+    if row is None:
+        # the age reported is that of the per-team entry actually served
+        cache_key = f"tempo_{year}_{team_key(team)}"
+        fetch = lambda: _fetch_tempo(canonical(team), year)
+        if swr:
+            row, meta = load_or_fetch_swr(cache_key, fetch, TEMPO_SOFT_TTL, TEMPO_HARD_TTL)
+        else:
+            row = load_or_fetch(cache_key, fetch)
+
+    return {"data": row, **meta} if swr else row
+
+
+def get_tempo_table(year: int = 2025):
+    """The cached season table {team_key: row} (one bulk build per cache TTL)."""
+    return load_or_fetch(f"tempo_table_{year}", lambda: _build_table(year))
+
+
+def _build_table(year: int):
+    """build_tempo_table, unless a build for `year` failed less than TABLE_ERROR_TTL ago."""
+    failed = _table_failed.get(year)
+    if failed and time.time() < failed[0]:
+        return failed[1]
+    table = build_tempo_table(year)
+    if isinstance(table, dict) and "error" in table:
+        _table_failed[year] = (time.time() + TABLE_ERROR_TTL, table)
+    else:
+        _table_failed.pop(year, None)
+    return table
+
+
+# ------------------------------------------------------------
+# Bulk season table
+# ------------------------------------------------------------
+def _drive_minutes(drives: pd.DataFrame) -> pd.Series:
+    """Drive duration in minutes from "mm:ss" driveTime strings or elapsed.{minutes,seconds}."""
+    minutes = pd.Series(np.nan, index=drives.index)
+    if "driveTime" in drives:
+        mmss = drives["driveTime"].astype("string").str.extract(r"^\s*(\d+):(\d+)\s*$")
+        minutes = pd.to_numeric(mmss[0], errors="coerce") + pd.to_numeric(mmss[1], errors="coerce") / 60
+    if "elapsed.minutes" in drives:
+        elapsed = (pd.to_numeric(drives["elapsed.minutes"], errors="coerce")
+                   + pd.to_numeric(drives.get("elapsed.seconds", pd.Series(0, index=drives.index)), errors="coerce").fillna(0) / 60)
+        minutes = minutes.fillna(elapsed)
+    return minutes
+
+
+def _pass_rates(year: int) -> pd.Series:
+    """pass_rate per team key from /stats/season (one call for every team)."""
+    r = http_client.get(f"{CFB_API}/stats/season", headers=_headers(), params={"year": year}, timeout=30)
+    r.raise_for_status()
+    stats = pd.DataFrame(r.json())
+    if stats.empty or not {"team", "statName", "statValue"} <= set(stats.columns):
+        return pd.Series(dtype=float)
+
+    stats = stats[stats["statName"].isin(["passAttempts", "rushingAttempts"])]
+    wide = (stats.assign(k=stats["team"].map(team_key),
+                         v=pd.to_numeric(stats["statValue"], errors="coerce"))
+                 .pivot_table(index="k", columns="statName", values="v", aggfunc="sum"))
+    if not {"passAttempts", "rushingAttempts"} <= set(wide.columns):
+        return pd.Series(dtype=float)
+    total = wide["passAttempts"] + wide["rushingAttempts"]
+    return (wide["passAttempts"] / total.where(total > 0)).round(3)
+
+
+def build_tempo_table(year: int = 2025):
+    """
+    Pull every drive of the season in one /drives call and compute tempo for
+    all teams with a single groupby on the offense. Returns
+    {team_key: {"team", "plays_per_game", "plays_per_minute", "pass_rate"}}.
     """
+    try:
+        r = http_client.get(f"{CFB_API}/drives", headers=_headers(), params={"year": year}, timeout=60)
+        r.raise_for_status()
+        data = r.json()
+        if not data:
+            return {"error": f"no drive data found for {year}"}
+
+        drives = pd.json_normalize(data)
+        if "offense" not in drives or "plays" not in drives:
+            return {"error": f"no tempo data found for {year}"}
+
+        # group on the team key, so offense names that resolve to the same team
+        # (aliases, spelling variants) pool their drives into one row
+        drives = drives.assign(
+            k=drives["offense"].map(team_key),
+            plays=pd.to_numeric(drives["plays"], errors="coerce"),
+            minutes=_drive_minutes(drives),
+        )
+        g = drives.groupby("k").agg(team=("offense", "first"), avg_plays=("plays", "mean"),
+                                    avg_minutes=("minutes", "mean"))
+        g = g[g["avg_plays"].notna()]
+        g["avg_minutes"] = g["avg_minutes"].fillna(DEFAULT_DRIVE_MINUTES)
+
+        plays_per_game = g["avg_plays"] * DRIVES_PER_GAME
+        table = pd.DataFrame({
+            "team": g["team"],
+            "plays_per_game": plays_per_game.round(3),
+            "plays_per_minute": (plays_per_game / (g["avg_minutes"] * DRIVES_PER_GAME)).round(3),
+        })
+
+        try:
+            table["pass_rate"] = _pass_rates(year).reindex(table.index)
+        except Exception:
+            table["pass_rate"] = np.nan
+
+        table = table.astype(object).where(table.notna(), None)
+        return table.to_dict(orient="index")
+
+    except Exception as e:
+        return {"error": f"tempo table build failed: {str(e)}"}
 
-    cache_key = f"tempo_{team.lower()}"
-    cached = load_cache(cache_key)
-    if cached:
-        return cached
 
-    headers = {"Authorization": f"Bearer {CFB_KEY}"} if CFB_KEY else {}
+# ------------------------------------------------------------
+# Per-team fallback
+# ------------------------------------------------------------
+def _fetch_tempo(team: str, year: int = 2025):
+    headers = _headers()
     url = f"{CFB_API}/drives"
-    params = {"year": 2025, "team": team}
+    params = {"year": year, "team": team}
 
     try:
-        r = requests.get(url, headers=headers, params=params, timeout=15)
+        r = http_client.get(url, headers=headers, params=params, timeout=15)
         r.raise_for_status()
         data = r.json()
 
@@ -52,19 +193,15 @@ def get_tempo(team: str):
             return {"error": f"no tempo data found for {team}"}
 
         avg_plays = mean(total_plays)
-        avg_duration = mean(durations) if durations else 2.5  # fallback 2.5 min per drive
+        avg_duration = mean(durations) if durations else DEFAULT_DRIVE_MINUTES
 
-        plays_per_game = avg_plays * 12  # ~12 drives per game estimate
-        plays_per_minute = round(plays_per_game / (avg_duration * 12), 3)
+        plays_per_game = avg_plays * DRIVES_PER_GAME
+        plays_per_minute = round(plays_per_game / (avg_duration * DRIVES_PER_GAME), 3)
 
-        result = {
+        return {
             "plays_per_game": round(plays_per_game, 3),
             "plays_per_minute": plays_per_minute,
         }
 
-        # Save to cache for 6 hours
-        save_cache(cache_key, result)
-        return result
-
     except Exception as e:
         return {"error": f"tempo fetch failed: {str(e)}"}
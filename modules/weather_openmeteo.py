@@ -1,36 +1,196 @@
-import requests
-
-def get_weather(lat, lon):
-    """Fetch simple hourly weather forecast for game location."""
-    url = (
-        "https://api.open-meteo.com/v1/forecast?"
-        f"latitude={lat}&longitude={lon}"
-        "&hourly=temperature_2m,precipitation,windspeed_10m"
-    )
-    r = requests.get(url)
-    data = r.json()
+import os
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from modules import http_client
+from modules.cache_utils import load_cache, save_cache, single_flight
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+HOURLY_FIELDS = "temperature_2m,precipitation,wind_speed_10m"
+
+# Venues are cached on a lat/lon grid: two stadiums inside the same cell (and
+# with the same kickoff hour) share one forecast.
+GRID_DEG = float(os.getenv("WEATHER_GRID_DEG", "0.1"))
+WEATHER_TTL = float(os.getenv("WEATHER_TTL", "1800"))  # forecasts update hourly
+WINDOW_BEFORE_H = int(os.getenv("WEATHER_WINDOW_BEFORE_H", "1"))
+WINDOW_AFTER_H = int(os.getenv("WEATHER_WINDOW_AFTER_H", "4"))  # ~game length
+# hourly data the forecast API serves: 92 past days through 16 days ahead
+FORECAST_PAST_DAYS = 92
+FORECAST_DAYS = 16
+
+
+# ------------------------------------------------------------
+# Grid / time helpers
+# ------------------------------------------------------------
+def _snap(v: float) -> float:
+    return round(round(float(v) / GRID_DEG) * GRID_DEG, 4)
+
+
+def _kickoff_hour(kickoff: Optional[str]) -> Optional[datetime]:
+    """Kickoff as a naive UTC datetime floored to the hour (None when missing/unparseable)."""
+    if not kickoff:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(kickoff).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _now_hour() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+
+
+def _forecast_range() -> tuple:
+    """First and last hour Open-Meteo has hourly data for right now."""
+    today = _now_hour().replace(hour=0)
+    return today - timedelta(days=FORECAST_PAST_DAYS), today + timedelta(days=FORECAST_DAYS) - timedelta(hours=1)
+
+
+def _hour_str(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M")
+
+
+def _cache_key(lat_c: float, lon_c: float, hour: Optional[datetime]) -> str:
+    # "now" lookups share one file per cell (overwritten each hour) rather than
+    # leaving a new file behind every hour
+    return f"weather_{lat_c}_{lon_c}_{hour.strftime('%Y%m%d%H') if hour else 'now'}"
+
+
+def _mean(values):
+    nums = [v for v in values if isinstance(v, (int, float)) and math.isfinite(v)]
+    return sum(nums) / len(nums) if nums else None
+
+
+def _summary(lat_c: float, lon_c: float, hour: datetime, window: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {
-        "avg_temp": sum(data["hourly"]["temperature_2m"]) / len(data["hourly"]["temperature_2m"]),
-        "avg_wind": sum(data["hourly"]["windspeed_10m"]) / len(data["hourly"]["windspeed_10m"]),
-        "rain_prob": sum(data["hourly"]["precipitation"]) / len(data["hourly"]["precipitation"]),
+        "kickoff": _hour_str(hour),
+        "grid": {"lat": lat_c, "lon": lon_c},
+        "avg_temp": _mean([w["temp"] for w in window]),
+        "avg_wind": _mean([w["wind"] for w in window]),
+        "rain_prob": _mean([w["precip"] for w in window]),
+        "weather_window": window,
     }
+
+
+# ------------------------------------------------------------
+# Batched fetch
+# ------------------------------------------------------------
+def _fetch_cells(cells: List[tuple], start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """One Open-Meteo call for every (lat, lon) cell, hourly data for [start, end] only."""
+    params = {
+        "latitude": ",".join(str(c[0]) for c in cells),
+        "longitude": ",".join(str(c[1]) for c in cells),
+        "hourly": HOURLY_FIELDS,
+        "wind_speed_unit": "mph",
+        "timezone": "UTC",
+        "start_hour": _hour_str(start),
+        "end_hour": _hour_str(end),
+    }
+    r = http_client.get(OPEN_METEO_URL, params=params, timeout=10)
+    r.raise_for_status()
+    data = r.json()
+    # a single coordinate comes back as one object, several as a list in request order
+    return data if isinstance(data, list) else [data]
+
+
+def _window(hourly: Dict[str, list], hour: datetime) -> List[Dict[str, Any]]:
+    lo, hi = _hour_str(hour - timedelta(hours=WINDOW_BEFORE_H)), _hour_str(hour + timedelta(hours=WINDOW_AFTER_H))
+    times = hourly.get("time", [])
+    temps = hourly.get("temperature_2m", [])
+    winds = hourly.get("wind_speed_10m", [])
+    precs = hourly.get("precipitation", [])
+    return [
+        {"time": t, "temp": temps[i], "wind": winds[i], "precip": precs[i]}
+        for i, t in enumerate(times)
+        if lo <= t <= hi and i < len(temps) and i < len(winds) and i < len(precs)
+    ]
+
+
+def _load_missing(missing: Dict[str, tuple]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch every uncached (cell, kickoff) in one request and cache the sliced
+    windows. Kickoffs must be inside _forecast_range(); the requested span is
+    clamped to it so a window running past either edge is only cut short.
+    """
+    cells = sorted({(lat_c, lon_c) for lat_c, lon_c, _ in missing.values()})
+    hours = [h for _, _, h in missing.values()]
+    first, last = _forecast_range()
+    start = max(min(hours) - timedelta(hours=WINDOW_BEFORE_H), first)
+    end = min(max(hours) + timedelta(hours=WINDOW_AFTER_H), last)
+
+    hourly_by_cell = {cell: resp.get("hourly", {}) for cell, resp in zip(cells, _fetch_cells(cells, start, end))}
+
+    out = {}
+    for key, (lat_c, lon_c, hour) in missing.items():
+        out[key] = _summary(lat_c, lon_c, hour, _window(hourly_by_cell.get((lat_c, lon_c), {}), hour))
+        save_cache(key, out[key])
+    return out
+
+
+def get_weather_batch(venues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Kickoff-window weather for a whole slate. `venues` is a list of
+    {"lat", "lon", "kickoff"?}; results come back in the same order, each with
+    avg_temp / avg_wind (mph) / rain_prob over the window and the hourly
+    weather_window rows. Cached cells are served from cache; every other
+    venue is fetched in a single Open-Meteo request. A kickoff outside the
+    forecast range gets an error entry of its own and is not requested.
+    """
+    keys, missing, found = [], {}, {}
+    now = _now_hour()
+    first, last = _forecast_range()
+    for v in venues:
+        lat_c, lon_c = _snap(v.get("lat", 0) or 0), _snap(v.get("lon", 0) or 0)
+        hour = _kickoff_hour(v.get("kickoff"))
+        key = _cache_key(lat_c, lon_c, hour)
+        keys.append(key)
+        if key in found or key in missing:
+            continue
+        if hour is not None and not first <= hour <= last:
+            found[key] = {"error": f"kickoff {_hour_str(hour)} is outside the forecast range "
+                                   f"({_hour_str(first)} to {_hour_str(last)} UTC)"}
+            continue
+        cached = load_cache(key, WEATHER_TTL)
+        if cached is not None and (hour is not None or cached.get("kickoff") == _hour_str(now)):
+            found[key] = cached
+        else:
+            missing[key] = (lat_c, lon_c, hour or now)
+
+    if missing:
+        try:
+            found.update(single_flight("weather_batch:" + ",".join(sorted(missing)), lambda: _load_missing(missing)))
+        except Exception as e:
+            err = {"error": f"weather fetch failed: {str(e)}"}
+            found.update({k: err for k in missing})
+
+    return [found[k] for k in keys]
+
+
+# ------------------------------------------------------------
+# Single-venue API
+# ------------------------------------------------------------
+def get_weather(lat, lon, kickoff: Optional[str] = None):
+    """Weather around kickoff (default: the current hour) for one game location."""
+    return get_weather_batch([{"lat": lat, "lon": lon, "kickoff": kickoff}])[0]
+
+
 def get_hourly_kickoff_window(lat: float, lon: float, kickoff_iso: str):
-    url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&hourly=temperature_2m,precipitation,wind_speed_10m&timezone=UTC"
-    data = requests.get(url, timeout=10).json()
-    # Optionally slice around kickoff
-    return {"kickoff": kickoff_iso, "weather_window": data.get("hourly", {})}
+    data = get_weather(lat, lon, kickoff_iso)
+    if "error" in data:
+        return data
+    return {"kickoff": kickoff_iso, "weather_window": data["weather_window"]}
 
 # ---------------------------------------------------------------------
 # Added helper for warmers.py compatibility
 # ---------------------------------------------------------------------
 def get_kickoff_window(lat: float, lon: float, kickoff: str):
-    """
-    Placeholder wrapper to make warmers.py run.
-    You can later replace this with a real hourly forecast slice around kickoff.
-    """
+    """Kickoff-window summary for one venue (used by warmers.py)."""
     try:
-        data = get_weather(lat, lon)
-        # Simplified: just return hourly data subset or empty fallback
+        data = get_weather(lat, lon, kickoff)
         return {
             "kickoff": kickoff,
             "lat": lat,